@@ -0,0 +1,112 @@
+"""
+Compare the NumPy and Numba targeting kernels on batched workloads.
+
+``monte-carlo`` targets ``--scenarios`` random perturbations of one stream set
+with ``thermalysis_pinch.kernels.solve_batch``; ``tmin-sweep`` targets one
+stream set at ``--tmins`` values of ΔTmin with ``SortedStreams.targets``. Each
+workload is run with both backends, after one untimed call that compiles the
+Numba kernels, and the results are checked to be identical.
+
+    python benchmarks/bench_kernels.py --sizes 20 100 500 --scenarios 10000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.generators import GENERATORS
+from thermalysis_pinch import kernels
+
+
+def monte_carlo(tmin, cp, ts, tt, scenarios, seed):
+    # CP varied by 10 % and temperatures by 5 °C around the base case
+    rng = np.random.default_rng(seed)
+    shape = (scenarios, len(cp))
+    cp = cp * rng.normal(1.0, 0.1, shape).clip(0.5)
+    ts = ts + rng.normal(0.0, 5.0, shape)
+    tt = tt + rng.normal(0.0, 5.0, shape)
+
+    def run():
+        result = kernels.solve_batch(cp, ts, tt, tmin)
+        return np.stack([result[name] for name in sorted(result)])
+
+    return run, scenarios
+
+
+def tmin_sweep(tmin, cp, ts, tt, tmins, seed):
+    streams = kernels.SortedStreams(cp, ts, tt)
+    values = np.linspace(1.0, 4.0 * tmin, tmins)
+
+    def run():
+        return np.stack(streams.targets(values))
+
+    return run, tmins
+
+
+WORKLOADS = {"monte-carlo": monte_carlo, "tmin-sweep": tmin_sweep}
+
+
+def _timed(run, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500])
+    parser.add_argument("--kind", choices=sorted(GENERATORS), default="random")
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--tmins", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    backends = ["numpy"]
+    try:
+        kernels.use_backend("numba")
+        backends.append("numba")
+    except ImportError:
+        print("Numba is not installed; timing the NumPy kernels only", file=sys.stderr)
+
+    results = []
+    for n in args.sizes:
+        stream_set = GENERATORS[args.kind](n, seed=args.seed)
+        for name, workload in WORKLOADS.items():
+            count = args.scenarios if name == "monte-carlo" else args.tmins
+            run, count = workload(*stream_set, count, args.seed)
+            record = {"workload": name, "streams": n, "cases": count}
+            outputs = {}
+            for backend in backends:
+                kernels.use_backend(backend)
+                run()
+                seconds, outputs[backend] = _timed(run, args.repeat)
+                record[backend + "Seconds"] = seconds
+                record[backend + "CasesPerSecond"] = count / seconds
+            if "numba" in outputs:
+                record["speedup"] = record["numpySeconds"] / record["numbaSeconds"]
+                record["identical"] = bool(
+                    np.array_equal(outputs["numpy"], outputs["numba"], equal_nan=True)
+                )
+            results.append(record)
+            print(json.dumps(record), file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
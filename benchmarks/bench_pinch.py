@@ -0,0 +1,275 @@
+"""
+Scaling benchmark for the PyPinch solver.
+
+Times every solve stage, the CSV writers and the matplotlib renderers on
+synthetic stream sets and writes the results as JSON.
+
+    python benchmarks/bench_pinch.py --sizes 10 100 1000 --output bench.json
+    python benchmarks/bench_pinch.py --compare old.json --output new.json
+
+Sizes are run in ascending order per generator. When the measured solve time
+predicts that the next size would exceed ``--budget`` seconds, the remaining
+sizes are recorded as skipped instead of run.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.generators import GENERATORS, write_streams_csv
+from thermalysis_pinch.PyPinch import PyPinch
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+SOLVE_STAGES = [
+    "shiftTemperatures",
+    "constructTemperatureInterval",
+    "constructProblemTable",
+    "constructHeatCascade",
+    "constructShiftedCompositeDiagram",
+    "constructCompositeDiagram",
+    "constructGrandCompositeCurve",
+]
+
+CSV_STAGES = [
+    "csvProblemTable",
+    "csvHeatCascade",
+    "csvShiftedCompositeDiagram",
+    "csvCompositeDiagram",
+    "csvGrandCompositeCurve",
+]
+
+RENDER_STAGES = [
+    "drawTemperatureInterval",
+    "drawProblemTable",
+    "drawHeatCascade",
+    "drawShiftedCompositeDiagram",
+    "drawCompositeDiagram",
+    "drawGrandCompositeCurve",
+]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _solve_peak_memory(path):
+    tracemalloc.start()
+    try:
+        pinch = PyPinch(path)
+        for stage in SOLVE_STAGES:
+            getattr(pinch, stage)()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_case(kind, n, seed, workdir, render_limit, memory):
+    """
+    Benchmark one generated stream set and return its result record.
+    """
+    import matplotlib.pyplot as plt
+
+    tmin, cp, ts, tt = GENERATORS[kind](n, seed=seed)
+    path = os.path.join(workdir, "{}_{}.csv".format(kind, n))
+    write_streams_csv(path, tmin, cp, ts, tt)
+
+    record = {"kind": kind, "streams": n, "seed": seed}
+
+    start = time.perf_counter()
+    pinch = PyPinch(path)
+    record["load"] = time.perf_counter() - start
+
+    record["stages"] = {}
+    for stage in SOLVE_STAGES:
+        record["stages"][stage] = _timed(getattr(pinch, stage))
+    record["solve"] = sum(record["stages"].values())
+
+    record["intervals"] = len(pinch.temperatureInterval)
+    record["hotUtility"] = pinch.hotUtility
+    record["coldUtility"] = pinch.coldUtility
+    record["pinchTemperature"] = pinch.pinchTemperature
+
+    record["csv"] = {}
+    for stage in CSV_STAGES:
+        record["csv"][stage] = _timed(getattr(pinch, stage))
+
+    record["render"] = {}
+    if n <= render_limit:
+        for stage in RENDER_STAGES:
+            record["render"][stage] = _timed(getattr(pinch, stage))
+            plt.close("all")
+    else:
+        record["render"] = None
+
+    record["peakMemoryBytes"] = _solve_peak_memory(path) if memory else None
+
+    os.remove(path)
+    return record
+
+
+def run(sizes, kinds, seed, budget, render_limit, memory):
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # The csv* and draw* methods write into the working directory.
+        os.chdir(workdir)
+        try:
+            for kind in kinds:
+                previous = None
+                for n in sorted(sizes):
+                    if previous is not None and budget:
+                        # The interval construction is quadratic in the
+                        # number of streams, so extrapolate accordingly.
+                        predicted = previous["solve"] * (n / previous["streams"]) ** 2
+                        if predicted > budget:
+                            results.append(
+                                {
+                                    "kind": kind,
+                                    "streams": n,
+                                    "seed": seed,
+                                    "skipped": "predicted solve {:.1f} s exceeds budget".format(
+                                        predicted
+                                    ),
+                                }
+                            )
+                            continue
+
+                    record = run_case(kind, n, seed, workdir, render_limit, memory)
+                    print(
+                        "{:>10} {:>8} streams  {:>6} intervals  solve {:.4f} s".format(
+                            kind, n, record["intervals"], record["solve"]
+                        ),
+                        file=sys.stderr,
+                    )
+                    results.append(record)
+                    previous = record
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(old, new, threshold, min_seconds=1e-3):
+    """
+    Return a list of human readable regressions between two result files.
+    Timings below ``min_seconds`` in both runs are treated as noise.
+    """
+
+    def index(doc):
+        return {
+            (r["kind"], r["streams"]): r for r in doc["results"] if "skipped" not in r
+        }
+
+    regressions = []
+    old_index = index(old)
+    for key, record in index(new).items():
+        if key not in old_index:
+            continue
+        before = old_index[key]
+        timings = [("solve", before["solve"], record["solve"])]
+        for group in ("stages", "csv", "render"):
+            for stage, value in (record.get(group) or {}).items():
+                if stage in (before.get(group) or {}):
+                    timings.append((stage, before[group][stage], value))
+        for stage, t_old, t_new in timings:
+            if max(t_old, t_new) < min_seconds:
+                continue
+            if t_old > 0 and t_new / t_old > threshold:
+                regressions.append(
+                    "{} n={} {}: {:.4f} s -> {:.4f} s ({:.2f}x)".format(
+                        key[0], key[1], stage, t_old, t_new, t_new / t_old
+                    )
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--kinds", nargs="+", choices=sorted(GENERATORS), default=sorted(GENERATORS)
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=120.0,
+        help="skip sizes whose predicted solve time exceeds this many seconds (0 disables)",
+    )
+    parser.add_argument(
+        "--render-limit",
+        type=int,
+        default=1000,
+        help="only time the matplotlib renderers up to this many streams",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip the tracemalloc peak memory pass"
+    )
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    parser.add_argument("--compare", help="previous JSON result to check against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="slowdown ratio reported as a regression by --compare",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=1e-3,
+        help="ignore timings shorter than this when comparing",
+    )
+    args = parser.parse_args(argv)
+
+    doc = {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "seed": args.seed,
+        },
+        "results": run(
+            args.sizes,
+            args.kinds,
+            args.seed,
+            args.budget,
+            args.render_limit,
+            not args.no_memory,
+        ),
+    }
+
+    text = json.dumps(doc, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(
+                json.load(f), doc, args.threshold, args.min_seconds
+            )
+        for line in regressions:
+            print("[REGRESSION] " + line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
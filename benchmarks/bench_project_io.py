@@ -0,0 +1,109 @@
+"""
+Compare opening a saved binary project with the CSV round trip.
+
+The CSV round trip parses the stream file, solves and renders the composite
+and grand composite figures again; opening the binary project reads the
+stored results and figures back.
+
+    python benchmarks/bench_project_io.py --sizes 100 1000 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generators import GENERATORS, write_streams_csv
+from thermalysis_pinch.PyPinch import PyPinch
+
+FIGURES = {
+    "drawCompositeDiagram": "CompositeDiagram.png",
+    "drawGrandCompositeCurve": "GrandCompositeCurve.png",
+}
+
+
+def _import_archive():
+    # thermalysis_pinch.project pulls in the Dash project machinery on
+    # import; the archive module itself only needs NumPy.
+    import importlib.util
+
+    path = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "thermalysis_pinch",
+        "project",
+        "archive.py",
+    )
+    spec = importlib.util.spec_from_file_location("pinch_archive", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def csv_round_trip(path):
+    pinch = PyPinch(path)
+    pinch.solve()
+    figures = {}
+    for method, filename in FIGURES.items():
+        getattr(pinch, method)()
+        with open(filename, "rb") as f:
+            figures[filename] = f.read()
+    return pinch, figures
+
+
+def open_binary(archive, path):
+    with archive.load_project(path) as project:
+        tables = project.tables()
+        figures = {name: project.figure(name) for name in project.figure_names()}
+    return tables, figures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 2000])
+    parser.add_argument("--kind", choices=sorted(GENERATORS), default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    archive = _import_archive()
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for n in args.sizes:
+                csv_path = os.path.join(workdir, "streams.csv")
+                write_streams_csv(csv_path, *GENERATORS[args.kind](n, seed=args.seed))
+
+                start = time.perf_counter()
+                pinch, figures = csv_round_trip(csv_path)
+                csv_seconds = time.perf_counter() - start
+
+                project_path = os.path.join(workdir, "project.npz")
+                archive.save_project(project_path, {}, pinch, figures)
+
+                start = time.perf_counter()
+                open_binary(archive, project_path)
+                binary_seconds = time.perf_counter() - start
+
+                results.append(
+                    {
+                        "streams": n,
+                        "csvRoundTrip": csv_seconds,
+                        "binaryOpen": binary_seconds,
+                        "speedup": csv_seconds / binary_seconds,
+                        "projectBytes": os.path.getsize(project_path),
+                    }
+                )
+        finally:
+            os.chdir(cwd)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
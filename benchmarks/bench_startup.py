@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark: import time and resident memory of a fresh process.
+
+Every target is imported in a new interpreter, ``--repeat`` times, and the
+median import time and the resident set size after the import are reported
+as JSON, together with which heavy packages the import pulled in.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --targets solver app --repeat 10
+
+``eager-pages`` imports what every analysis page used to import at module
+level (pandas, matplotlib.pyplot, plotly, dash_ag_grid, Dash and the solver)
+and is the baseline the lazy ``solver`` and ``app`` targets are compared to.
+The ``app`` target builds the whole WSGI app, so every page is registered; it
+needs the full set of app dependencies.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "python": "pass",
+    "solver": "import thermalysis_pinch.PyPinch",
+    "solver-draw": "import thermalysis_pinch.PyPinch\nimport matplotlib.pyplot",
+    "eager-pages": "\n".join(
+        [
+            "import base64",
+            "import pandas",
+            "import matplotlib.pyplot",
+            "import plotly.graph_objects",
+            "import plotly.express",
+            "import dash_ag_grid",
+            "import dash",
+            "import thermalysis_pinch.PyPinch",
+        ]
+    ),
+    "app": "from thermalysis_pinch.wsgi import create_app\ncreate_app()",
+}
+
+HEAVY = ["matplotlib", "pandas", "plotly", "dash", "dash_ag_grid", "flask"]
+
+CHILD = """
+import json, os, sys, time
+start = time.perf_counter()
+exec(compile(sys.argv[1], "<target>", "exec"))
+seconds = time.perf_counter() - start
+try:
+    import psutil
+    rss = psutil.Process().memory_info().rss
+except ImportError:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss *= 1 if sys.platform == "darwin" else 1024
+print(json.dumps({
+    "seconds": seconds,
+    "rss": rss,
+    "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules],
+}))
+"""
+
+
+def measure(code, repeat):
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONDONTWRITEBYTECODE="1")
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-c", CHILD, code, json.dumps(HEAVY)],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "minSeconds": min(run["seconds"] for run in runs),
+        "rssMB": statistics.median(run["rss"] for run in runs) / 2**20,
+        "loaded": runs[-1]["loaded"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS)
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    results = {name: measure(TARGETS[name], args.repeat) for name in args.targets}
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Seeded synthetic stream-set generators for the pinch benchmarks.
+
+Every generator returns ``(tmin, cp, ts, tt)`` where ``cp``, ``ts`` and ``tt``
+are float arrays of length ``n``. The same ``(n, seed)`` pair always gives the
+same stream set so results can be compared between versions.
+"""
+
+import numpy as np
+
+
+def random_streams(n, seed=0, tmin=10.0):
+    """
+    Uniformly spread supply and target temperatures, roughly half hot and
+    half cold streams.
+    """
+    rng = np.random.default_rng(seed)
+    cp = rng.lognormal(mean=1.0, sigma=0.75, size=n).round(3)
+    ts = rng.uniform(20.0, 400.0, size=n).round(2)
+    span = rng.uniform(5.0, 150.0, size=n).round(2)
+    hot = rng.random(n) < 0.5
+    tt = np.where(hot, ts - span, ts + span)
+    return tmin, cp, ts, tt
+
+
+def clustered_streams(n, seed=0, tmin=10.0, clusters=12, jitter=1e-3):
+    """
+    Temperatures drawn from a handful of levels plus a tiny jitter, the way
+    measured plant data repeats ``120.0`` as ``120.0001`` and ``119.9998``.
+    """
+    rng = np.random.default_rng(seed)
+    levels = np.sort(rng.uniform(30.0, 350.0, size=clusters)).round(1)
+    cp = rng.lognormal(mean=1.0, sigma=0.5, size=n).round(3)
+
+    start = rng.integers(0, clusters, size=n)
+    end = rng.integers(0, clusters - 1, size=n)
+    end = np.where(end >= start, end + 1, end)
+
+    ts = levels[start] + rng.normal(0.0, jitter, size=n)
+    tt = levels[end] + rng.normal(0.0, jitter, size=n)
+    return tmin, cp, ts, tt
+
+
+def total_site_streams(n, seed=0, tmin=10.0, streams_per_plant=40):
+    """
+    Several plants, each with its own temperature band, plus near-isothermal
+    steam and cooling-water streams shared across the site.
+    """
+    rng = np.random.default_rng(seed)
+    plants = max(1, n // streams_per_plant)
+    plant = rng.integers(0, plants, size=n)
+    band_low = rng.uniform(20.0, 250.0, size=plants)
+    band_high = band_low + rng.uniform(50.0, 250.0, size=plants)
+
+    low = band_low[plant]
+    high = band_high[plant]
+    ts = rng.uniform(low, high).round(1)
+    tt = rng.uniform(low, high).round(1)
+    cp = rng.lognormal(mean=1.5, sigma=1.0, size=n).round(3)
+
+    # Roughly 5 % of the site is phase change on the steam mains, modelled
+    # as a very large CP over a 1 degC span.
+    mains = np.array([250.0, 180.0, 140.0, 30.0])
+    steam = rng.random(n) < 0.05
+    level = mains[rng.integers(0, len(mains), size=n)]
+    condensing = rng.random(n) < 0.5
+    ts = np.where(steam, level, ts)
+    tt = np.where(steam, np.where(condensing, level - 1.0, level + 1.0), tt)
+    cp = np.where(steam, cp * 100.0, cp)
+
+    tt = np.where(ts == tt, tt + 1.0, tt)
+    return tmin, cp, ts, tt
+
+
+GENERATORS = {
+    "random": random_streams,
+    "clustered": clustered_streams,
+    "total_site": total_site_streams,
+}
+
+
+def write_streams_csv(path, tmin, cp, ts, tt):
+    """
+    Write a stream set in the ``Tmin`` / ``CP, TSUPPLY, TTARGET`` format read
+    by ``PyPinch``.
+    """
+    with open(path, "w", newline="") as f:
+        f.write("Tmin,{}\n".format(tmin))
+        f.write("CP,TSUPPLY,TTARGET\n")
+        np.savetxt(f, np.column_stack([cp, ts, tt]), delimiter=",", fmt="%.10g")
@@ -0,0 +1,29 @@
+# Gunicorn settings for serving thermalysis_pinch in production:
+#
+#   gunicorn -c gunicorn.conf.py "thermalysis_pinch.wsgi:create_app()"
+#
+# Every value can be overridden through the environment; see "Deployment" in
+# Readme.md for how to choose workers and threads.
+import multiprocessing
+import os
+
+bind = os.environ.get("PINCH_BIND", "0.0.0.0:8000")
+
+# Solves and figure rendering are CPU bound and hold the GIL, so throughput
+# scales with processes; threads only help overlap I/O-bound requests such as
+# asset downloads and background-callback polling.
+workers = int(os.environ.get("PINCH_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("PINCH_THREADS", 4))
+worker_class = "gthread"
+
+# Long solves run as background callbacks, so requests themselves stay short.
+timeout = int(os.environ.get("PINCH_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth from matplotlib.
+max_requests = int(os.environ.get("PINCH_MAX_REQUESTS", 1000))
+max_requests_jitter = 100
+
+accesslog = "-"
+errorlog = "-"
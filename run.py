@@ -1,7 +1,11 @@
+import os
+
 from thermalysis_pinch.app import init_app
 from thermalysis_pinch.config.main import PROJECT_NAME, PROJECT_SLUG
 from flask import Flask
 
+# Development server. For production use thermalysis_pinch.wsgi with gunicorn
+# or waitress, see "Deployment" in Readme.md.
 if __name__ == "__main__":
 
     dash_app = init_app(
@@ -11,7 +15,7 @@ if __name__ == "__main__":
     )
 
     dash_app.run(
-        debug=True,
-        port=5500,
-        host="10.29.1.180",
+        debug=os.environ.get("PINCH_DEBUG", "1") == "1",
+        port=int(os.environ.get("PINCH_PORT", 5500)),
+        host=os.environ.get("PINCH_HOST", "127.0.0.1"),
     )
@@ -0,0 +1,21 @@
+import sys
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def server():
+    from thermalysis_pinch.wsgi import create_app
+
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+def pages(server):
+    # Page modules are named after their files (pi-data.py), so they are
+    # only reachable through sys.modules once the app has registered them.
+    return {
+        name.rsplit(".", 1)[-1]: module
+        for name, module in sys.modules.items()
+        if name.rsplit(".", 1)[-1].startswith("pi-")
+    }
@@ -0,0 +1,31 @@
+import pytest
+
+from thermalysis_pinch.batch import main
+
+STREAMS = "Tmin,10\nCP,TSUPPLY,TTARGET\n2,150,60\n3,25,100\n"
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    (folder / "plant.csv").write_text(STREAMS)
+    return folder
+
+
+def test_format_from_output_extension(inputs, tmp_path):
+    output = tmp_path / "out.jsonl"
+    assert main([str(inputs), "-o", str(output), "--no-cache"]) == 0
+    assert output.read_text().startswith("{")
+
+
+def test_format_and_extension_disagree(inputs, tmp_path):
+    with pytest.raises(SystemExit):
+        main([str(inputs), "-o", str(tmp_path / "out.parquet"), "--format", "csv"])
+
+
+def test_parquet_from_output_extension(inputs, tmp_path):
+    pytest.importorskip("pyarrow")
+    output = tmp_path / "out.parquet"
+    assert main([str(inputs), "-o", str(output), "--no-cache"]) == 0
+    assert output.read_bytes()[:4] == b"PAR1"
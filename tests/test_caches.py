@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from thermalysis_pinch import placement, solution
+from thermalysis_pinch.solution import stream_input
+
+
+def _drag(i):
+    pinch_input = stream_input(10, [2, 3], [150 + i, 30], [60, 140])
+    return solution.sorted_streams(pinch_input).solve(10)["hot_utility"]
+
+
+def test_sorted_streams_cache_under_threads():
+    size = solution.SORTED_STREAMS_CACHE_SIZE
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(_drag, range(20 * size)))
+    assert len(results) == 20 * size
+    assert len(solution._sorted_streams) <= size
+
+
+def _scan(i):
+    h = np.array([10.0 + i, 0.0, 30.0])
+    t = np.array([200.0, 120.0, 40.0])
+    return placement.scan_placements(h, t, 120.0, size=8)
+
+
+def test_placement_cache_under_threads():
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(_scan, range(20 * placement.SCAN_CACHE_SIZE)))
+    assert len(placement._scans) <= placement.SCAN_CACHE_SIZE
@@ -0,0 +1,66 @@
+import multiprocessing
+import re
+import sys
+
+import pytest
+
+from thermalysis_pinch import metrics
+from thermalysis_pinch.solution import input_key, stream_input
+
+
+def _stage_count(text, stage):
+    match = re.search(
+        r'^pinch_solver_stage_duration_seconds_count\{{stage="{}"\}} (\S+)$'.format(
+            stage
+        ),
+        text,
+        re.MULTILINE,
+    )
+    return float(match.group(1)) if match else 0.0
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork")
+def test_background_solve_reaches_metrics(server, pages, tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "STAGE_RECORDS_DIR", str(tmp_path))
+    client = server.test_client()
+    text = client.get("/metrics").get_data(as_text=True)
+    before = _stage_count(text, "constructProblemTable")
+
+    data = {
+        "pinch_input": stream_input(
+            10, [2, 8, 2.5, 3], [150, 90, 20, 25], [60, 60, 125, 100]
+        )
+    }
+    key = input_key(data["pinch_input"])
+
+    # The DiskcacheManager runs background callbacks in a child process
+    process = multiprocessing.get_context("fork").Process(
+        target=pages["pi-data"].run_pinch_analysis,
+        args=(lambda progress: None, key, data),
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    text = client.get("/metrics").get_data(as_text=True)
+    assert _stage_count(text, "constructProblemTable") == before + 1
+    assert not list(tmp_path.iterdir())
+
+
+def test_response_bytes_pages_are_bounded(server):
+    client = server.test_client()
+    for i in range(3):
+        client.get("/probe-{}".format(i))
+        client.get("/pinch/report/{}.zip".format(i))
+    client.get("/pinch/pi-data")
+    text = client.get("/metrics").get_data(as_text=True)
+    pages = re.findall(r'^pinch_response_bytes_total\{page="([^"]*)"\}', text, re.M)
+    assert "/pinch/pi-data" in pages
+    assert not [page for page in pages if "probe" in page or "0.zip" in page]
+
+
+def test_clients_are_pruned_without_scrapes(server, monkeypatch):
+    monkeypatch.setattr(metrics, "_clients", {"stale": -1e9})
+    monkeypatch.setattr(metrics, "_clients_pruned_at", -1e9)
+    server.test_client().get("/healthz")
+    assert "stale" not in metrics._clients
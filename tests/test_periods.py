@@ -0,0 +1,46 @@
+import pytest
+
+from thermalysis_pinch.periods import main, solve_periods
+from thermalysis_pinch.solution import stream_input
+
+# One hot stream 200 -> 100 °C and cold streams 80 -> 190 and 150 -> 180 °C,
+# ΔTmin 10, with different CPs in the two periods.
+TS = [200, 80, 150]
+TT = [100, 190, 180]
+PERIODS = {
+    "a": stream_input(10, [2, 3, 4], TS, TT),
+    "b": stream_input(10, [4, 1, 4], TS, TT),
+}
+
+
+def test_time_average_target_by_hand():
+    # Equal durations average the CPs to 3, 2 and 4. Shifted intervals
+    # 195-185-155-95-85 then give net heat +10, -90, +60, -20 kW; the
+    # cascade 10, -80, -20, -40 needs 80 kW of hot utility, leaves 40 kW for
+    # cold utility and pinches at 155 °C (shifted).
+    combined = solve_periods(PERIODS, [1000, 1000])["combined"]
+    assert combined["model"] == "time-average"
+    assert combined["tmin"] == 10
+    assert combined["hot_utility"] == pytest.approx(80)
+    assert combined["cold_utility"] == pytest.approx(40)
+    assert combined["pinch_temperature"] == pytest.approx(155)
+    assert combined["hot_utility_energy"] == pytest.approx(80 * 2000)
+
+
+def test_time_average_target_is_not_the_mean_of_the_periods():
+    # Alone, period a needs 250 kW of hot utility and b 170 kW of cold
+    result = solve_periods(PERIODS)
+    assert list(result["periods"]["hot_utility"]) == pytest.approx([250, 0])
+    assert list(result["periods"]["cold_utility"]) == pytest.approx([0, 170])
+    assert result["summary"]["hot_utility_weighted_mean"] == pytest.approx(125)
+    assert result["combined"]["hot_utility"] == pytest.approx(80)
+
+
+def test_duplicate_period_names(tmp_path):
+    for folder in ("x", "y"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "summer.csv").write_text(
+            "Tmin,10\nCP,TSUPPLY,TTARGET\n2,150,60\n3,25,100\n"
+        )
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "x" / "summer.csv"), str(tmp_path / "y" / "summer.csv")])
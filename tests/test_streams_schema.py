@@ -0,0 +1,35 @@
+from thermalysis_pinch.schemas.streams import validate_stream_table
+
+
+def _cells(cells):
+    return [(cell["row"], cell["column"], cell["message"]) for cell in cells]
+
+
+def test_valid_table():
+    table, cells = validate_stream_table(tmin=10, cp=[1, 2], ts=[1, 2], tt=[2, 3])
+    assert table is not None
+    assert cells == []
+
+
+def test_length_error_kept_with_tmin_error():
+    table, cells = validate_stream_table(tmin=-1, cp=[1], ts=[1, 2], tt=[3])
+    assert table is None
+    columns = {cell["column"] for cell in cells}
+    assert "tmin" in columns
+    assert (None, None, "Value error, ts has 2 entries for 1 streams") in _cells(
+        cells
+    )
+
+
+def test_type_and_rule_errors_together():
+    table, cells = validate_stream_table(
+        tmin=10, cp=[1, "a", 3, -1], ts=[1, 2, 3, 5], tt=[1, 2, "b", 6]
+    )
+    assert table is None
+    found = {(row, column) for row, column, _ in _cells(cells)}
+    # Type errors in rows 1 and 2, rules broken in rows 0 and 3
+    assert found == {(0, "tt"), (1, "cp"), (2, "tt"), (3, "cp")}
+    messages = {(row, column): message for row, column, message in _cells(cells)}
+    assert messages[(0, "tt")] == "must differ from the supply temperature"
+    assert messages[(3, "cp")] == "must be greater than 0"
+    assert [cell["row"] for cell in cells] == sorted(cell["row"] for cell in cells)
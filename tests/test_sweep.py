@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from thermalysis_pinch.sweep import main
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    np.save(folder / "cp.npy", np.array([[2.0, 3.0], [2.0, 4.0], [1.0, 3.0]]))
+    np.save(folder / "ts.npy", np.array([[150.0, 25.0]] * 3))
+    np.save(folder / "tt.npy", np.array([[60.0, 100.0]] * 3))
+    return folder
+
+
+def test_missing_tmin_is_a_usage_error(inputs, tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit:
+        main([str(inputs), str(tmp_path / "out")])
+    assert exit.value.code == 2
+    assert "no tmin given" in capsys.readouterr().err
+
+
+def test_changed_chunk_size_is_a_usage_error(inputs, tmp_path, capsys):
+    output = str(tmp_path / "out")
+    assert main([str(inputs), output, "--tmin", "10", "--chunk-size", "2"]) == 0
+    with pytest.raises(SystemExit) as exit:
+        main([str(inputs), output, "--tmin", "10", "--chunk-size", "1"])
+    assert exit.value.code == 2
+    assert "different sweep" in capsys.readouterr().err
+
+
+def test_missing_inputs_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), str(tmp_path / "out"), "--tmin", "10"])
+    assert "No cp, ts, tt array" in capsys.readouterr().err
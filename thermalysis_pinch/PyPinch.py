@@ -7,7 +7,45 @@
 
 
 import csv
-import matplotlib.pyplot as plt
+import functools
+import math
+import os
+import time
+import tracemalloc
+
+
+def _pyplot():
+    # matplotlib is only needed to draw. Importing it on first use keeps
+    # "import PyPinch" light for headless solves and web workers.
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _numpy():
+    # numpy is imported on the first solve for the same reason: importing it
+    # takes several times as long as importing this module.
+    import numpy
+
+    return numpy
+
+
+def _instrumented(method):
+    # Wrap a solve, draw or csv stage so that its wall time and counters are
+    # recorded when profiling is enabled or a stage hook is registered. When
+    # neither is the case the only cost is the check below.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if (
+            not self._options["profile"]
+            and not self._stageHooks
+            and not PyPinch.stageHooks
+        ):
+            return method(self, *args, **kwargs)
+        return self._runStage(method, *args, **kwargs)
+
+    return wrapper
+
 
 class Streams:
 
@@ -21,10 +59,16 @@ class Streams:
         self._index = 0
         self._length = 0
 
-        with open(streamsDataFile, newline="") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                self._rawStreamsData.append(row)
+        if isinstance(streamsDataFile, (str, bytes, os.PathLike)):
+            with open(streamsDataFile, newline="") as f:
+                reader = csv.reader(f)
+                for row in reader:
+                    self._rawStreamsData.append(row)
+        else:
+            # Rows laid out like the streams data file, e.g. taken from the
+            # project store instead of from disk.
+            for row in streamsDataFile:
+                self._rawStreamsData.append(list(row))
 
         if self._rawStreamsData[0][0].strip() != "Tmin" or [
             item.strip() for item in self._rawStreamsData[1]
@@ -119,28 +163,43 @@ class Streams:
 
 class PyPinch:
 
+    # Callables ``hook(pinch, record)`` invoked after every instrumented stage
+    # of every instance, e.g. to feed an external metrics collector.
+    stageHooks = []
+
     def __init__(self, streamsDataFile, options={}):
 
         self.tmin = 0
         self.streams = []
         self.temperatureInterval = []
+        self.intervalStreams = None
         self.problemTable = []
         self.hotUtility = 0
         self.coldUtility = 0
         self.unfeasibleHeatCascade = []
         self.heatCascade = []
         self.pinchTemperature = 0
+        self.utilityErrorBound = 0
         self.shiftedCompositeDiagram = {
             "hot": {"H": [], "T": []},
             "cold": {"H": [], "T": []},
         }
         self.compositeDiagram = {"hot": {"H": [], "T": []}, "cold": {"H": [], "T": []}}
         self.grandCompositeCurve = {"H": [], "T": []}
+        self.stageProfile = []
 
         self._temperatures = []
         self._deltaHHot = []
         self._deltaHCold = []
-        self._options = {"debug": False, "draw": False, "csv": False}
+        self._stageHooks = []
+        self._options = {
+            "debug": False,
+            "draw": False,
+            "csv": False,
+            "profile": False,
+            "tolerance": 0,
+            "maxPoints": 5000,
+        }
 
         self.streams = Streams(streamsDataFile)
         self.tmin = self.streams.tmin
@@ -151,7 +210,61 @@ class PyPinch:
             self._options["draw"] = True
         if "csv" in options:
             self._options["csv"] = True
+        if "profile" in options:
+            self._options["profile"] = True
+        if "tolerance" in options:
+            self._options["tolerance"] = options["tolerance"]
+        if "maxPoints" in options:
+            self._options["maxPoints"] = options["maxPoints"]
+
+    def addStageHook(self, hook):
+        """Call ``hook(pinch, record)`` after every instrumented stage."""
+        self._stageHooks.append(hook)
+
+    def _runStage(self, method, *args, **kwargs):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            allocatedBefore = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        seconds = time.perf_counter() - start
+
+        # Stages called from within another stage (e.g. draw* from
+        # construct*) get their own record; the enclosing stage's time
+        # includes theirs.
+        record = {
+            "stage": method.__name__,
+            "seconds": seconds,
+            "streams": self.streams.numberOf,
+            "intervals": len(self.temperatureInterval),
+            "allocatedBytes": (
+                tracemalloc.get_traced_memory()[0] - allocatedBefore
+                if tracing
+                else None
+            ),
+        }
+        if self._options["profile"]:
+            self.stageProfile.append(record)
+
+        for hook in PyPinch.stageHooks + self._stageHooks:
+            hook(self, record)
 
+        return result
+
+    def printStageProfile(self):
+        for record in self.stageProfile:
+            print(
+                "{:<34} {:>10.6f} s  {:>7} streams  {:>7} intervals  {} bytes".format(
+                    record["stage"],
+                    record["seconds"],
+                    record["streams"],
+                    record["intervals"],
+                    record["allocatedBytes"],
+                )
+            )
+
+    @_instrumented
     def shiftTemperatures(self):
         for stream in self.streams:
             if stream["type"] == "HOT":
@@ -167,6 +280,7 @@ class PyPinch:
                 print(stream)
             print("Tmin = {}".format(self.tmin))
 
+    @_instrumented
     def constructTemperatureInterval(self):
         # Take all shifted temperatures and reverse sort them,
         # removing all duplicates
@@ -177,44 +291,133 @@ class PyPinch:
         self._temperatures = list(set(self._temperatures))
         self._temperatures.sort(reverse=True)
 
-        # Save the stream number of all the streams that pass
-        # through each shifted temperature interval
+        if self._options["tolerance"] > 0:
+            self._mergeTemperatures(self._options["tolerance"])
+
         for i in range(len(self._temperatures) - 1):
             t1 = self._temperatures[i]
             t2 = self._temperatures[i + 1]
-            interval = {"t1": t1, "t2": t2, "streamNumbers": []}
-
-            j = 0
-            for stream in self.streams:
-                if stream["type"] == "HOT":
-                    if stream["ss"] >= t1 and stream["st"] <= t2:
-                        interval["streamNumbers"].append(j)
-                else:
-                    if stream["st"] >= t1 and stream["ss"] <= t2:
-                        interval["streamNumbers"].append(j)
-                j = j + 1
+            self.temperatureInterval.append({"t1": t1, "t2": t2})
 
-            self.temperatureInterval.append(interval)
+        self.intervalStreams = self._incidence()
 
         if self._options["debug"] == True:
             print("\nTemperature Intervals: ")
+            indptr = self.intervalStreams["indptr"]
+            indices = self.intervalStreams["indices"]
             i = 0
             for interval in self.temperatureInterval:
-                print("Interval {} : {}".format(i, interval))
+                print(
+                    "Interval {} : {} streams {}".format(
+                        i, interval, indices[indptr[i] : indptr[i + 1]].tolist()
+                    )
+                )
                 i = i + 1
 
         if self._options["draw"] == True:
             self.drawTemperatureInterval()
 
-    def drawTemperatureInterval(self):
+    def _incidence(self):
+        # Which streams pass through which shifted temperature interval, as a
+        # sparse CSR matrix (intervals x streams): the streams of interval i
+        # are indices[indptr[i]:indptr[i + 1]], in stream order. A stream
+        # spans the consecutive intervals between its two shifted ends, so
+        # the matrix has one entry per interval a stream actually crosses.
+        np = _numpy()
+        count = len(self.temperatureInterval)
+        ascending = np.array(self._temperatures[::-1], dtype=np.float64)
+        ss = np.array([s["ss"] for s in self.streams], dtype=np.float64)
+        st = np.array([s["st"] for s in self.streams], dtype=np.float64)
+
+        # Intervals are numbered from the top temperature down. Entries are
+        # generated stream by stream, then stably sorted into interval order.
+        last = len(ascending) - 1
+        start = last - np.searchsorted(ascending, np.maximum(ss, st))
+        stop = last - np.searchsorted(ascending, np.minimum(ss, st))
+        spans = np.maximum(stop - start, 0)
+
+        first = np.cumsum(spans) - spans
+        streams = np.repeat(np.arange(len(spans), dtype=np.int32), spans)
+        rows = np.arange(len(streams), dtype=np.int32)
+        rows += np.repeat((start - first).astype(np.int32), spans)
+        order = np.argsort(rows, kind="stable")
+        return {
+            "indptr": np.concatenate(
+                [[0], np.cumsum(np.bincount(rows, minlength=count))]
+            ),
+            "indices": streams[order],
+            "shape": (count, len(spans)),
+        }
+
+    def _intervalSum(self, values):
+        # Sparse mat-vec of the interval-stream incidence with one value per
+        # stream: the sum of the values of the streams in every interval,
+        # added in stream order.
+        np = _numpy()
+        indptr = self.intervalStreams["indptr"]
+        indices = self.intervalStreams["indices"]
+        count = self.intervalStreams["shape"][0]
+        rows = np.repeat(np.arange(count), np.diff(indptr))
+        return np.bincount(rows, weights=values[indices], minlength=count)
+
+    def _streamCP(self, hotSign, coldSign):
+        # CP of every stream times hotSign or coldSign, by stream type
+        np = _numpy()
+        return np.array(
+            [
+                stream["cp"] * (hotSign if stream["type"] == "HOT" else coldSign)
+                for stream in self.streams
+            ],
+            dtype=np.float64,
+        )
+
+    def _mergeTemperatures(self, tolerance):
+        # Coarse mode: going down the sorted shifted temperatures, every
+        # temperature within ``tolerance`` of the top of its group joins that
+        # group, and each group is replaced by its midpoint. Stream ends move
+        # with their temperature, by at most tolerance / 2.
+        #
+        # Moving one stream end by d changes the heat of that stream above
+        # (and below) any temperature by at most cp * |d|, so every value of
+        # the heat cascade, and with it both minimum utilities, moves by at
+        # most the sum of cp * |d| over all moved ends. That sum is kept as
+        # utilityErrorBound; it never exceeds tolerance * (sum of all CP).
+        groups = []
+        for temperature in self._temperatures:
+            if not groups or groups[-1][0] - temperature > tolerance:
+                groups.append([])
+            groups[-1].append(temperature)
+
+        merged = []
+        snapped = {}
+        for group in groups:
+            merged.append((group[0] + group[-1]) / 2)
+            for temperature in group:
+                snapped[temperature] = merged[-1]
+
+        bound = 0
+        for stream in self.streams:
+            for end in ("ss", "st"):
+                bound = bound + stream["cp"] * abs(snapped[stream[end]] - stream[end])
+                stream[end] = snapped[stream[end]]
+
+        self._temperatures = merged
+        self.utilityErrorBound = bound
+
+        if self._options["debug"] == True:
+            print(
+                "\nMerged shifted temperatures within {}: utility error <= {}".format(
+                    tolerance, bound
+                )
+            )
+
+    @_instrumented
+    def drawTemperatureInterval(self, filename="ShiftT.png"):
+        plt = _pyplot()
         fig, ax = plt.subplots()
 
         plt.title("Shifted Temperature Interval Diagram")
         plt.ylabel("Shifted Temperature S (degC)")
-        filename = "ShiftT.png"
-        plt.savefig(filename, format="png", dpi=300, bbox_inches="tight")
-        plt.close(fig)
-        # plt.close(fig)  # Close the figure to free memory       ################################################
         ax.set_xticklabels([])
 
         xOffset = 50
@@ -275,19 +478,19 @@ class PyPinch:
             xOffset = xOffset + 50
             i = i + 1
 
+        plt.savefig(filename, format="png", dpi=300, bbox_inches="tight")
+        plt.close(fig)
+
+    @_instrumented
     def constructProblemTable(self):
 
-        for interval in self.temperatureInterval:
+        # Net CP of every interval: hot streams count positive, cold negative
+        deltaCP = self._intervalSum(self._streamCP(1, -1)).tolist()
+
+        for interval, netCP in zip(self.temperatureInterval, deltaCP):
             row = {}
             row["deltaS"] = interval["t1"] - interval["t2"]
-            row["deltaCP"] = 0
-
-            for i in interval["streamNumbers"]:
-                if self.streams.streamsData[i]["type"] == "HOT":
-                    row["deltaCP"] = row["deltaCP"] + self.streams.streamsData[i]["cp"]
-                else:
-                    row["deltaCP"] = row["deltaCP"] - self.streams.streamsData[i]["cp"]
-
+            row["deltaCP"] = netCP
             row["deltaH"] = row["deltaS"] * row["deltaCP"]
             self.problemTable.append(row)
 
@@ -304,7 +507,9 @@ class PyPinch:
         if self._options["csv"] == True:
             self.csvProblemTable()
 
-    def drawProblemTable(self):
+    @_instrumented
+    def drawProblemTable(self, filename="probtable.png"):
+        plt = _pyplot()
         fig, ax = plt.subplots(figsize=(6, 6))
         ax.axis("tight")
         ax.axis("off")
@@ -346,6 +551,10 @@ class PyPinch:
         table.auto_set_column_width([0, 1, 2, 3, 4])
         table.scale(1.3, 1.3)
 
+        plt.savefig(filename, format="png", dpi=300, bbox_inches="tight")
+        plt.close(fig)  # Close the figure to free memory
+
+    @_instrumented
     def csvProblemTable(self):
         colLabels = [
             "$Interval: S_i - S_{i+1}$",
@@ -393,6 +602,7 @@ class PyPinch:
             for rowText in cellText:
                 writer.writerow(rowText)
 
+    @_instrumented
     def constructHeatCascade(self):
 
         exitH = 0
@@ -451,7 +661,9 @@ class PyPinch:
         if self._options["csv"] == True:
             self.csvHeatCascade()
 
-    def drawHeatCascade(self):
+    @_instrumented
+    def drawHeatCascade(self, filename="Cascade.png"):
+        plt = _pyplot()
         fig, axs = plt.subplots(1, 2, figsize=(10, 6))
         axs[0].axis("auto")
         axs[0].axis("off")
@@ -493,6 +705,10 @@ class PyPinch:
         table.auto_set_column_width([0, 1, 2])
         table.scale(1.3, 1.3)
 
+        plt.savefig(filename, format="png", dpi=300, bbox_inches="tight")
+        plt.close(fig)  # Close the figure to free memory
+
+    @_instrumented
     def csvHeatCascade(self):
         cellText = [["Unfeasible Heat Cascade: "]]
         cellText.append(["", "", "Hot Utility: 0 kW"])
@@ -533,20 +749,13 @@ class PyPinch:
             for rowText in cellText:
                 writer.writerow(rowText)
 
+    @_instrumented
     def constructShiftedCompositeDiagram(self):
         # Find enthalpy change deltaH for the hot and
         # cold composite streams
-        for interval in self.temperatureInterval:
-            hotH = 0
-            coldH = 0
-            # Add CP values for the hot and cold streams
-            # in a given temperature interval
-            for i in interval["streamNumbers"]:
-                if self.streams.streamsData[i]["type"] == "HOT":
-                    hotH = hotH + self.streams.streamsData[i]["cp"]
-                else:
-                    coldH = coldH + self.streams.streamsData[i]["cp"]
-
+        hotCP = self._intervalSum(self._streamCP(1, 0)).tolist()
+        coldCP = self._intervalSum(self._streamCP(0, 1)).tolist()
+        for interval, hotH, coldH in zip(self.temperatureInterval, hotCP, coldCP):
             # Enthalpy = CP * deltaT
             hotH = hotH * (interval["t1"] - interval["t2"])
             self._deltaHHot.append(hotH)
@@ -598,29 +807,44 @@ class PyPinch:
         if self._options["csv"] == True:
             self.csvShiftedCompositeDiagram()
 
-    def drawShiftedCompositeDiagram(self):
-        fig = plt.figure()
-        plt.plot(
-            self.shiftedCompositeDiagram["hot"]["H"],
-            self.shiftedCompositeDiagram["hot"]["T"],
-            "tab:red",
-        )
-        plt.plot(
+    def _plotCurve(self, curve, maxPoints, keepT=(), keepH=()):
+        # Vertices of a curve to draw: thinned to maxPoints (default the
+        # "maxPoints" option) keeping the pinch, ends and turns.
+        from thermalysis_pinch.curves import downsample
+
+        if maxPoints is None:
+            maxPoints = self._options["maxPoints"]
+        return downsample(curve["H"], curve["T"], maxPoints, keepT, keepH)
+
+    def _pinchEnthalpy(self):
+        # Enthalpy of the shifted cold composite curve at the pinch, or None
+        # when the pinch is outside the curve.
+        from thermalysis_pinch.curves import Curve
+
+        curve = Curve(
             self.shiftedCompositeDiagram["cold"]["H"],
             self.shiftedCompositeDiagram["cold"]["T"],
-            "tab:blue",
         )
-
-        plt.plot(
-            self.shiftedCompositeDiagram["hot"]["H"],
-            self.shiftedCompositeDiagram["hot"]["T"],
-            "ro",
+        pinchH = float(curve.enthalpy(self.pinchTemperature))
+        return None if math.isnan(pinchH) else pinchH
+
+    @_instrumented
+    def drawShiftedCompositeDiagram(
+        self, filename="ShiftedCompositeDiagram.png", maxPoints=None
+    ):
+        plt = _pyplot()
+        fig = plt.figure()
+        hotH, hotT = self._plotCurve(
+            self.shiftedCompositeDiagram["hot"], maxPoints, [self.pinchTemperature]
         )
-        plt.plot(
-            self.shiftedCompositeDiagram["cold"]["H"],
-            self.shiftedCompositeDiagram["cold"]["T"],
-            "bo",
+        coldH, coldT = self._plotCurve(
+            self.shiftedCompositeDiagram["cold"], maxPoints, [self.pinchTemperature]
         )
+        plt.plot(hotH, hotT, "tab:red")
+        plt.plot(coldH, coldT, "tab:blue")
+
+        plt.plot(hotH, hotT, "ro")
+        plt.plot(coldH, coldT, "bo")
 
         maxColdH = max(self.shiftedCompositeDiagram["cold"]["H"])
         plt.fill_between(
@@ -634,26 +858,21 @@ class PyPinch:
             alpha=0.5,
         )
 
-        try:
-            pinchIndex = self.shiftedCompositeDiagram["cold"]["T"].index(
-                self.pinchTemperature
-            )
-            pinchH = self.shiftedCompositeDiagram["cold"]["H"][pinchIndex]
+        pinchH = self._pinchEnthalpy()
+        if pinchH is not None:
             plt.plot(
                 [pinchH, pinchH], [self._temperatures[0], self._temperatures[-1]], ":"
             )
-        except ValueError:
-            pass
 
         plt.grid(True)
         plt.title("Shifted Temperature-Enthalpy Composite Diagram")
         plt.xlabel("Enthalpy H (kW)")
         plt.ylabel("Shifted Temperature S (degC)")
-        filename = "ShiftedCompositeDiagram.png"
         plt.savefig(filename, format="png", dpi=300, bbox_inches="tight")
 
         plt.close(fig)  # Close the figure to free memory
 
+    @_instrumented
     def csvShiftedCompositeDiagram(self):
         with open("ShiftedCompositeDiagram.csv", "w", newline="") as f:
             writer = csv.writer(f, delimiter=",")
@@ -676,6 +895,7 @@ class PyPinch:
                     ]
                 )
 
+    @_instrumented
     def constructCompositeDiagram(self):
         self.compositeDiagram["hot"]["T"] = [
             x + self.tmin / 2 for x in self.shiftedCompositeDiagram["hot"]["T"]
@@ -692,25 +912,26 @@ class PyPinch:
         if self._options["csv"] == True:
             self.csvCompositeDiagram()
 
-    def drawCompositeDiagram(self):
+    @_instrumented
+    def drawCompositeDiagram(self, filename="CompositeDiagram.png", maxPoints=None):
+        plt = _pyplot()
         fig = plt.figure()
-        plt.plot(
-            self.compositeDiagram["hot"]["H"],
-            self.compositeDiagram["hot"]["T"],
-            "tab:red",
+        # The pinch is at pinchTemperature +/- tmin / 2 on the actual curves
+        hotH, hotT = self._plotCurve(
+            self.compositeDiagram["hot"],
+            maxPoints,
+            [self.pinchTemperature + self.tmin / 2],
         )
-        plt.plot(
-            self.compositeDiagram["cold"]["H"],
-            self.compositeDiagram["cold"]["T"],
-            "tab:blue",
+        coldH, coldT = self._plotCurve(
+            self.compositeDiagram["cold"],
+            maxPoints,
+            [self.pinchTemperature - self.tmin / 2],
         )
+        plt.plot(hotH, hotT, "tab:red")
+        plt.plot(coldH, coldT, "tab:blue")
 
-        plt.plot(
-            self.compositeDiagram["hot"]["H"], self.compositeDiagram["hot"]["T"], "ro"
-        )
-        plt.plot(
-            self.compositeDiagram["cold"]["H"], self.compositeDiagram["cold"]["T"], "bo"
-        )
+        plt.plot(hotH, hotT, "ro")
+        plt.plot(coldH, coldT, "bo")
 
         maxColdH = max(self.compositeDiagram["cold"]["H"])
         plt.fill_between(
@@ -728,24 +949,20 @@ class PyPinch:
             alpha=0.5,
         )
 
-        try:
-            pinchIndex = self.shiftedCompositeDiagram["cold"]["T"].index(
-                self.pinchTemperature
-            )
-            pinchH = self.shiftedCompositeDiagram["cold"]["H"][pinchIndex]
+        pinchH = self._pinchEnthalpy()
+        if pinchH is not None:
             plt.plot(
                 [pinchH, pinchH], [self._temperatures[0], self._temperatures[-1]], ":"
             )
-        except ValueError:
-            pass
 
         plt.grid(True)
         plt.title("Temperature-Enthalpy Composite Diagram")
         plt.xlabel("Enthalpy H (kW)")
         plt.ylabel("Temperature T (degC)")
-        filename = "CompositeDiagram.png"
         plt.savefig(filename, format="png", dpi=300, bbox_inches="tight")
         plt.close(fig)
+
+    @_instrumented
     def csvCompositeDiagram(self):
         with open("CompositeDiagram.csv", "w", newline="") as f:
             writer = csv.writer(f, delimiter=",")
@@ -768,6 +985,7 @@ class PyPinch:
                     ]
                 )
 
+    @_instrumented
     def constructGrandCompositeCurve(self):
         self.grandCompositeCurve["H"].append(self.hotUtility)
         self.grandCompositeCurve["T"].append(self._temperatures[0])
@@ -786,12 +1004,17 @@ class PyPinch:
         if self._options["csv"] == True:
             self.csvGrandCompositeCurve()
 
-    def drawGrandCompositeCurve(self):
+    @_instrumented
+    def drawGrandCompositeCurve(
+        self, filename="GrandCompositeCurve.png", maxPoints=None
+    ):
+        plt = _pyplot()
         fig = plt.figure()
-        plt.plot(
-            self.grandCompositeCurve["H"], self.grandCompositeCurve["T"], "tab:blue"
+        gccH, gccT = self._plotCurve(
+            self.grandCompositeCurve, maxPoints, [self.pinchTemperature], [0.0]
         )
-        plt.plot(self.grandCompositeCurve["H"], self.grandCompositeCurve["T"], "bo")
+        plt.plot(gccH, gccT, "tab:blue")
+        plt.plot(gccH, gccT, "bo")
 
         plt.fill_between(
             [0, self.grandCompositeCurve["H"][0]],
@@ -818,9 +1041,10 @@ class PyPinch:
         plt.title("Grand Composite Curve")
         plt.xlabel("Net Enthalpy Change ∆H (kW)")
         plt.ylabel("Shifted Temperature S (degC)")
-        filename = "GrandCompositeCurve.png"
         plt.savefig(filename, format="png", dpi=300, bbox_inches="tight")
         plt.close(fig)
+
+    @_instrumented
     def csvGrandCompositeCurve(self):
         with open("GrandCompositeCurve.csv", "w", newline="") as f:
             writer = csv.writer(f, delimiter=",")
@@ -831,6 +1055,7 @@ class PyPinch:
                 )
 
     def showPlots(self):
+        plt = _pyplot()
         plt.savefig("Diagram.png")
         plt.show()
 
@@ -842,14 +1067,35 @@ class PyPinch:
             self._options["draw"] = True
         if "csv" in options:
             self._options["csv"] = True
+        if "profile" in options:
+            self._options["profile"] = True
+        if "tolerance" in options:
+            self._options["tolerance"] = options["tolerance"]
+        if "maxPoints" in options:
+            self._options["maxPoints"] = options["maxPoints"]
+
+        # Allocated bytes are only known while tracemalloc is tracing, so
+        # trace for the duration of a profiled solve unless the caller
+        # already does.
+        startedTracing = self._options["profile"] and not tracemalloc.is_tracing()
+        if startedTracing:
+            tracemalloc.start()
 
-        self.shiftTemperatures()
-        self.constructTemperatureInterval()
-        self.constructProblemTable()
-        self.constructHeatCascade()
-        self.constructShiftedCompositeDiagram()
-        self.constructCompositeDiagram()
-        self.constructGrandCompositeCurve()
+        try:
+            self.shiftTemperatures()
+            self.constructTemperatureInterval()
+            self.constructProblemTable()
+            self.constructHeatCascade()
+            self.constructShiftedCompositeDiagram()
+            self.constructCompositeDiagram()
+            self.constructGrandCompositeCurve()
+        finally:
+            if startedTracing:
+                tracemalloc.stop()
+
+        if self._options["debug"] == True and self._options["profile"] == True:
+            print("\nStage Profile: ")
+            self.printStageProfile()
 
         if self._options["draw"] == True:
             self.showPlots()
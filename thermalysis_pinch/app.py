@@ -3,6 +3,8 @@ from dash import dcc, html
 
 from agility.components import Sidebar
 from thermalysis_pinch.config.main import CONFIG_SIDEBAR, STORE_ID
+from thermalysis_pinch.jobs import background_callback_manager
+from thermalysis_pinch.metrics import init_metrics
 from thermalysis_pinch.project import Project
 
 external_scripts = [
@@ -28,8 +30,11 @@ def init_app(
         ],
         external_scripts=external_scripts,  # Tailwind CSS from JS src file
         title=app_title,  # Update title if needed or use a variable
+        # long solves run as background callbacks in a separate process
+        background_callback_manager=background_callback_manager(),
     )
     dash_app.config.suppress_callback_exceptions = True
+    init_metrics(dash_app)
 
     sidebar = Sidebar(CONFIG_SIDEBAR, STORE_ID, Project(), dash_app)
 
@@ -0,0 +1,304 @@
+"""
+thermalysis_pinch.batch
+
+``pinch-batch``: solve every stream CSV in a directory or glob in parallel.
+
+    pinch-batch data/ --jobs 8 --output targets.parquet
+
+Each input file is solved in a worker process and its targets are appended to
+one consolidated output as soon as they arrive. The SHA-256 of every file is
+kept in a cache file next to the output; files whose content is unchanged
+since the last run are not solved again and their previous result is written
+instead.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+FIELDS = [
+    "file",
+    "sha256",
+    "streams",
+    "tmin",
+    "intervals",
+    "hot_utility",
+    "cold_utility",
+    "pinch_temperature",
+    "seconds",
+    "cached",
+    "error",
+]
+
+FORMATS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+
+
+def find_inputs(patterns, recursive=False):
+    """
+    Expand directories and glob patterns into a sorted list of CSV files.
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            sub = os.path.join("**", "*.csv") if recursive else "*.csv"
+            matches = glob.glob(os.path.join(pattern, sub), recursive=recursive)
+        else:
+            matches = glob.glob(pattern, recursive=recursive)
+        files.update(os.path.abspath(path) for path in matches if os.path.isfile(path))
+    return sorted(files)
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def solve_file(job):
+    """
+    Solve one stream file and return its result record. Runs in a worker.
+    """
+    from thermalysis_pinch.PyPinch import PyPinch
+
+    path, sha256 = job
+    record = dict.fromkeys(FIELDS)
+    record.update({"file": path, "sha256": sha256, "cached": False})
+
+    start = time.perf_counter()
+    try:
+        pinch = PyPinch(path)
+        pinch.solve()
+        record.update(
+            {
+                "streams": pinch.streams.numberOf,
+                "tmin": pinch.tmin,
+                "intervals": len(pinch.temperatureInterval),
+                "hot_utility": pinch.hotUtility,
+                "cold_utility": pinch.coldUtility,
+                "pinch_temperature": pinch.pinchTemperature,
+            }
+        )
+    except Exception as e:
+        record["error"] = "{}: {}".format(type(e).__name__, str(e).strip())
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        import csv
+
+        self._file = open(path, "w", newline="")
+        self._writer = csv.DictWriter(self._file, FIELDS)
+        self._writer.writeheader()
+
+    def write(self, record):
+        self._writer.writerow(record)
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlWriter:
+    def __init__(self, path):
+        self._file = open(path, "w")
+
+    def write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    # Records are buffered into row groups so the file is written
+    # incrementally instead of being assembled in memory at the end.
+    ROW_GROUP = 1024
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Parquet output requires pyarrow (pip install .[arrow]); "
+                "or use --format csv"
+            )
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [
+                ("file", pa.string()),
+                ("sha256", pa.string()),
+                ("streams", pa.int64()),
+                ("tmin", pa.float64()),
+                ("intervals", pa.int64()),
+                ("hot_utility", pa.float64()),
+                ("cold_utility", pa.float64()),
+                ("pinch_temperature", pa.float64()),
+                ("seconds", pa.float64()),
+                ("cached", pa.bool_()),
+                ("error", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._buffer = []
+
+    def write(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.ROW_GROUP:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            table = self._pa.Table.from_pylist(self._buffer, schema=self._schema)
+            self._writer.write_table(table)
+            self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+WRITERS = {"csv": _CsvWriter, "jsonl": _JsonlWriter, "parquet": _ParquetWriter}
+
+
+def _load_cache(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def _save_cache(path, cache):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp, path)
+
+
+def run_batch(files, output, fmt="csv", jobs=None, cache_path=None, progress=None):
+    """
+    Solve ``files`` and write one record per file to ``output``.
+
+    Returns a summary dict with counts and throughput.
+    """
+    cache = _load_cache(cache_path)
+    writer = WRITERS[fmt](output)
+
+    start = time.perf_counter()
+    todo = []
+    summary = {"files": len(files), "solved": 0, "cached": 0, "errors": 0}
+    try:
+        for path in files:
+            sha256 = file_hash(path)
+            entry = cache.get(path)
+            if entry and entry["sha256"] == sha256 and not entry["record"]["error"]:
+                record = dict(entry["record"], cached=True)
+                writer.write(record)
+                summary["cached"] += 1
+            else:
+                todo.append((path, sha256))
+
+        if jobs == 1 or len(todo) <= 1:
+            results = map(solve_file, todo)
+            pool = None
+        else:
+            pool = multiprocessing.Pool(jobs)
+            chunksize = max(1, len(todo) // ((jobs or os.cpu_count() or 1) * 8))
+            results = pool.imap_unordered(solve_file, todo, chunksize=chunksize)
+
+        try:
+            for record in results:
+                writer.write(record)
+                if record["error"]:
+                    summary["errors"] += 1
+                else:
+                    summary["solved"] += 1
+                cache[record["file"]] = {"sha256": record["sha256"], "record": record}
+                if progress:
+                    progress(summary)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    finally:
+        writer.close()
+        if cache_path:
+            _save_cache(cache_path, cache)
+
+    summary["seconds"] = time.perf_counter() - start
+    summary["files_per_second"] = (
+        summary["files"] / summary["seconds"] if summary["seconds"] > 0 else 0.0
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pinch-batch", description="Solve every stream CSV in a directory or glob."
+    )
+    parser.add_argument("inputs", nargs="+", help="directories or glob patterns")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=None, help="worker processes (default: CPUs)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(FORMATS),
+        help="output format (default: from the --output extension, else csv)",
+    )
+    parser.add_argument("--output", "-o", help="consolidated output file")
+    parser.add_argument(
+        "--cache",
+        help="content-hash cache file (default: <output>.cache.json)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="solve every file regardless of hash"
+    )
+    parser.add_argument("--recursive", "-r", action="store_true")
+    args = parser.parse_args(argv)
+
+    # The output extension decides the format unless --format is given
+    suffix = os.path.splitext(args.output or "")[1].lower()
+    inferred = next((name for name, ext in FORMATS.items() if ext == suffix), None)
+    if args.format and inferred and args.format != inferred:
+        parser.error(
+            "--format {} does not match the {} output {}".format(
+                args.format, inferred, args.output
+            )
+        )
+    args.format = args.format or inferred or "csv"
+    output = args.output or "pinch-batch-results" + FORMATS[args.format]
+    cache_path = None if args.no_cache else (args.cache or output + ".cache.json")
+
+    files = find_inputs(args.inputs, recursive=args.recursive)
+    if not files:
+        print("[ERROR] No stream files matched.", file=sys.stderr)
+        return 2
+
+    def progress(summary):
+        done = summary["solved"] + summary["errors"] + summary["cached"]
+        if done % 100 == 0:
+            print("{} / {} files".format(done, summary["files"]), file=sys.stderr)
+
+    summary = run_batch(
+        files, output, args.format, args.jobs, cache_path, progress=progress
+    )
+    print(
+        "{files} files ({solved} solved, {cached} unchanged, {errors} failed) "
+        "in {seconds:.2f} s: {files_per_second:.1f} files/s -> {output}".format(
+            output=output, **summary
+        )
+    )
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
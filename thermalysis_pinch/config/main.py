@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 STORE_ID = "pinch" + "_store"
 PROJECT_NAME = "pinch".replace("_", " ").title()
 PROJECT_SLUG = "pinch"
@@ -17,6 +20,18 @@ CONFIG_SIDEBAR = {
         },
         {"name": "The Temperature-Enthalpy Composite Diagram", "path": "pi-tecd"},
         {"name": "The Grand Composite Curve", "path": "pi-gcc"},
+        {"name": "Heat Pump and Heat Engine Placement", "path": "pi-place"},
         {"name": "Report", "path": "pi-report"},
     ],
 }
+
+# Shared on-disk state (background jobs, report cache, pending report
+# downloads). Every worker process of a deployment must see the same
+# directory, so point this at a common path when serving from several hosts.
+CACHE_DIR = os.environ.get(
+    "PINCH_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pinch")
+)
+
+# Size limit of the report artifact cache in CACHE_DIR; the least recently
+# used artifacts are deleted beyond it.
+REPORT_CACHE_MB = int(os.environ.get("PINCH_REPORT_CACHE_MB", "1024"))
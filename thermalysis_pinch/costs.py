@@ -0,0 +1,154 @@
+"""
+thermalysis_pinch.costs
+
+Annual utility cost and CO₂ of solved designs under many price scenarios.
+
+Designs are given by their utility duties in kW, one array per utility, such
+as the minimum hot and cold utility of every solved design
+(``target_duties``) or the duties of several steam levels and cooling water.
+Scenarios are columns of the same length: operating hours per year, a price
+per kWh and an emission factor in kg CO₂/kWh for every utility, and a carbon
+price per tonne CO₂. Scalars apply to every scenario.
+
+    duties = target_duties([solution_summary(p) for p in designs])
+    costs = utility_costs(
+        duties,
+        prices={"hot_utility": gas_prices, "cold_utility": 0.002},
+        hours=8000,
+        emission_factors={"hot_utility": 0.2, "cold_utility": 0.0},
+        carbon_price=carbon_prices,
+    )
+    write_costs(costs, "results", format="parquet")
+
+Every result is a ``(scenarios, designs)`` array computed in one pass, with
+savings measured against the ``baseline`` design of each scenario.
+"""
+
+import uuid
+
+import numpy as np
+
+RESULTS = [
+    "energy",
+    "energy_cost",
+    "co2",
+    "carbon_cost",
+    "total_cost",
+    "savings",
+    "co2_savings",
+]
+
+
+def target_duties(summaries):
+    """
+    ``{"hot_utility": (designs,), "cold_utility": (designs,)}`` from the
+    solution summaries (or batch records) of several designs.
+    """
+    return {
+        name: np.array([summary[name] for summary in summaries], dtype=np.float64)
+        for name in ("hot_utility", "cold_utility")
+    }
+
+
+def _per_utility(values, names, size, what):
+    # (scenarios, utilities) from a {utility: scalar or (scenarios,)} mapping
+    missing = [name for name in names if name not in values]
+    if missing:
+        raise ValueError("No {} for utilities {}".format(what, missing))
+    return np.column_stack(
+        [
+            np.broadcast_to(np.asarray(values[name], dtype=np.float64), (size,))
+            for name in names
+        ]
+    )
+
+
+def utility_costs(
+    duties,
+    prices,
+    hours,
+    emission_factors=None,
+    carbon_price=0.0,
+    baseline=0,
+):
+    """
+    Annual energy (kWh), energy cost, CO₂ (t), carbon cost, total cost, and
+    cost and CO₂ savings against design ``baseline``, for every scenario and
+    design.
+
+    Returns ``{name: (scenarios, designs) ndarray}`` plus the ``utilities``
+    in column order and ``utility_energy``, ``(scenarios, designs,
+    utilities)`` in kWh.
+    """
+    names = list(duties)
+    duty = np.column_stack(
+        [np.atleast_1d(np.asarray(duties[name], dtype=np.float64)) for name in names]
+    )
+    if np.any(duty < 0):
+        raise ValueError("utility duties must not be negative")
+
+    emission_factors = emission_factors or dict.fromkeys(names, 0.0)
+    scenario_values = [hours, carbon_price]
+    scenario_values += [prices[name] for name in names if name in prices]
+    scenario_values += [emission_factors[n] for n in names if n in emission_factors]
+    shape = np.broadcast(*[np.asarray(value) for value in scenario_values]).shape
+    if len(shape) > 1:
+        raise ValueError("scenario values must be scalars or 1-D arrays")
+    size = shape[0] if shape else 1
+
+    hours = np.broadcast_to(np.asarray(hours, dtype=np.float64), (size,))
+    carbon_price = np.broadcast_to(np.asarray(carbon_price, dtype=np.float64), (size,))
+    price = _per_utility(prices, names, size, "prices")
+    factor = _per_utility(emission_factors, names, size, "emission factors")
+
+    # kWh per scenario, design and utility; everything else is a reduction
+    # over the utility axis.
+    utility_energy = hours[:, np.newaxis, np.newaxis] * duty[np.newaxis, :, :]
+    energy_cost = np.einsum("sdu,su->sd", utility_energy, price)
+    co2 = np.einsum("sdu,su->sd", utility_energy, factor) / 1000.0
+    carbon_cost = co2 * carbon_price[:, np.newaxis]
+    total_cost = energy_cost + carbon_cost
+
+    return {
+        "utilities": names,
+        "utility_energy": utility_energy,
+        "energy": utility_energy.sum(axis=-1),
+        "energy_cost": energy_cost,
+        "co2": co2,
+        "carbon_cost": carbon_cost,
+        "total_cost": total_cost,
+        "savings": total_cost[:, baseline, np.newaxis] - total_cost,
+        "co2_savings": co2[:, baseline, np.newaxis] - co2,
+    }
+
+
+def cost_columns(costs, designs=None, scenarios=None):
+    """
+    The results of ``utility_costs`` as one long table: a row per scenario
+    and design, named by ``designs`` and ``scenarios`` (default 0, 1, ...).
+    """
+    count, size = costs["total_cost"].shape
+    scenarios = np.arange(count) if scenarios is None else np.asarray(scenarios)
+    designs = np.arange(size) if designs is None else np.asarray(designs)
+
+    columns = {
+        "scenario": np.repeat(scenarios, size),
+        "design": np.tile(designs, count),
+    }
+    for name in RESULTS:
+        columns[name] = costs[name].ravel()
+    return columns
+
+
+def write_costs(costs, directory, run_id=None, format="parquet", **names):
+    """
+    Write ``cost_columns(costs, **names)`` as the ``utility_costs`` table of
+    a ``thermalysis_pinch.export`` dataset. Returns ``(run_id, path)``.
+    """
+    from thermalysis_pinch.export import write_table
+
+    run_id = run_id or uuid.uuid4().hex
+    path = write_table(
+        "utility_costs", cost_columns(costs, **names), directory, run_id, format
+    )
+    return run_id, path
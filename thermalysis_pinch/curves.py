@@ -0,0 +1,278 @@
+"""
+thermalysis_pinch.curves
+
+Batch lookups on the composite and grand composite curves.
+
+``Curve`` takes the points of one curve and answers T→H (``enthalpy``) and
+H→T (``temperature``) for whole arrays of queries by binary search. A curve is
+split once into runs that are monotone in the queried coordinate. Composite
+curves are a single run. The grand composite curve is monotone in T, but in H
+it turns at the pinch and at every pocket, so it splits into several runs.
+Every run is searched, and where a query has several answers (a flat segment,
+or a GCC enthalpy met both above and below the pinch) the highest is
+returned, or the lowest with ``highest=False``. Queries outside the curve give
+NaN.
+
+    curves = table_curves(decode_tables(pinch_output))
+    h = curves["composite"]["hot"].enthalpy([80.0, 120.0])
+    t = curves["grand_composite"].temperature(0.0, highest=False)
+
+``downsample`` thins a curve with more than ``budget`` vertices for plotting.
+Vertices on a straight line between their neighbours are dropped first, which
+leaves the drawn line unchanged. If more than ``budget`` vertices remain,
+Largest-Triangle-Three-Buckets picks the rest between anchors that are never
+dropped: the end points (the utility ends of a curve), every vertex where H
+or T turns back (the noses and pockets of the GCC), and the pinch, given as
+temperatures (``keep_t``, which keeps the segment across each) or enthalpies
+(``keep_h``, the zero heat flow of the GCC).
+
+    h, t = downsample(gcc_h, gcc_t, budget=2000, keep_t=[pinch], keep_h=[0.0])
+"""
+
+import numpy as np
+
+
+def _monotone_runs(x, f):
+    # Split the points into runs over which x never changes direction, each
+    # returned ascending in x. Steps with equal x belong to the run they are
+    # in, so a flat segment stays within one run.
+    if len(x) < 2:
+        return [(x, f)]
+    step = np.sign(np.diff(x))
+    nonzero = np.flatnonzero(step)
+    if not len(nonzero):
+        return [(x, f)]
+    last = np.searchsorted(nonzero, np.arange(len(step)), side="right") - 1
+    direction = step[nonzero[np.maximum(last, 0)]]
+    bounds = np.concatenate(
+        [[0], np.flatnonzero(direction[1:] != direction[:-1]) + 1, [len(x) - 1]]
+    )
+
+    runs = []
+    for start, end, sign in zip(bounds[:-1], bounds[1:], direction[bounds[:-1]]):
+        xp, fp = x[start : end + 1], f[start : end + 1]
+        runs.append((xp, fp) if sign > 0 else (xp[::-1], fp[::-1]))
+    return runs
+
+
+def _interp(x, xp, fp, side):
+    # Linear interpolation on ascending xp that may repeat values. At a
+    # repeated xp, side="left" gives the first of its fp and side="right"
+    # the last. NaN outside [xp[0], xp[-1]].
+    if len(xp) == 1:
+        return np.where(x == xp[0], fp[0], np.nan)
+    i = np.clip(np.searchsorted(xp, x, side=side), 1, len(xp) - 1)
+    x0, x1 = xp[i - 1], xp[i]
+    width = x1 - x0
+    weight = np.divide(
+        x - x0,
+        width,
+        out=np.full(np.shape(x), 0.0 if side == "left" else 1.0),
+        where=width > 0,
+    )
+    value = fp[i - 1] + weight * (fp[i] - fp[i - 1])
+    return np.where((x >= xp[0]) & (x <= xp[-1]), value, np.nan)
+
+
+class Curve:
+    """
+    A piecewise linear curve through the points ``(h, t)``, for vectorised
+    T→H and H→T lookups.
+    """
+
+    def __init__(self, h, t):
+        self.h = np.asarray(h, dtype=np.float64)
+        self.t = np.asarray(t, dtype=np.float64)
+        if self.h.shape != self.t.shape or self.h.ndim != 1:
+            raise ValueError("h and t must be 1-D arrays of the same length")
+        self._by_t = _monotone_runs(self.t, self.h)
+        self._by_h = _monotone_runs(self.h, self.t)
+
+    def _lookup(self, runs, x, highest):
+        x = np.asarray(x, dtype=np.float64)
+        if not len(self.h):
+            return np.full(x.shape, np.nan)
+        pick = np.fmax if highest else np.fmin
+
+        # With several runs, sort the queries once so that each run only
+        # interpolates the slice of queries within its range.
+        flat = x.ravel()
+        order = np.argsort(flat, kind="stable") if len(runs) > 1 else None
+        queries = flat if order is None else flat[order]
+        result = np.full(queries.shape, np.nan)
+        for xp, fp in runs:
+            lo, hi = 0, len(queries)
+            if order is not None:
+                lo = np.searchsorted(queries, xp[0], side="left")
+                hi = np.searchsorted(queries, xp[-1], side="right")
+            # Both sides only differ where xp repeats.
+            sides = ("left", "right") if np.any(xp[1:] == xp[:-1]) else ("left",)
+            for side in sides:
+                result[lo:hi] = pick(
+                    result[lo:hi], _interp(queries[lo:hi], xp, fp, side)
+                )
+
+        if order is not None:
+            result[order] = result.copy()
+        return result.reshape(x.shape)
+
+    def enthalpy(self, t, highest=True):
+        """
+        Enthalpy of the curve at temperature(s) ``t``.
+        """
+        return self._lookup(self._by_t, t, highest)
+
+    def temperature(self, h, highest=True):
+        """
+        Temperature of the curve at enthalpy(ies) ``h``.
+        """
+        return self._lookup(self._by_h, h, highest)
+
+
+def pinch_curves(pinch):
+    """
+    ``{"shifted_composite": {"hot": Curve, "cold": Curve}, "composite": {...},
+    "grand_composite": Curve}`` of a solved PyPinch.
+    """
+    return {
+        "shifted_composite": {
+            side: Curve(points["H"], points["T"])
+            for side, points in pinch.shiftedCompositeDiagram.items()
+        },
+        "composite": {
+            side: Curve(points["H"], points["T"])
+            for side, points in pinch.compositeDiagram.items()
+        },
+        "grand_composite": Curve(
+            pinch.grandCompositeCurve["H"], pinch.grandCompositeCurve["T"]
+        ),
+    }
+
+
+def table_curves(tables):
+    """
+    The curves of ``pinch_curves`` from the tables of
+    ``thermalysis_pinch.export.result_tables`` or ``solution.decode_tables``.
+    """
+    curves = {}
+    for name in ("shifted_composite", "composite"):
+        columns = tables[name]
+        curves[name] = {
+            side: Curve(
+                columns["h"][columns["curve"] == side],
+                columns["t"][columns["curve"] == side],
+            )
+            for side in ("hot", "cold")
+        }
+    gcc = tables["grand_composite"]
+    curves["grand_composite"] = Curve(gcc["h"], gcc["t"])
+    return curves
+
+
+def _straight(h, t):
+    # Vertices to drop without changing the drawn line: repeats of the
+    # previous vertex, then interior vertices on the straight line from the
+    # previous to the next vertex and between them, up to rounding. Both axes
+    # are scaled to their range first, so the tests do not depend on units.
+    h = h / (np.ptp(h) or 1.0)
+    t = t / (np.ptp(t) or 1.0)
+    repeat = np.zeros(len(h), dtype=bool)
+    repeat[1:] = np.hypot(np.diff(h), np.diff(t)) <= 1e-12
+    index = np.flatnonzero(~repeat)
+    if len(index) < 3:
+        return repeat
+
+    h, t = h[index], t[index]
+    dh0, dt0 = h[1:-1] - h[:-2], t[1:-1] - t[:-2]
+    dh1, dt1 = h[2:] - h[1:-1], t[2:] - t[1:-1]
+    cross = dh0 * dt1 - dt0 * dh1
+    scale = np.hypot(dh0, dt0) * np.hypot(dh1, dt1)
+    collinear = (np.abs(cross) <= 1e-12 * scale) & (dh0 * dh1 + dt0 * dt1 > 0)
+    repeat[index[1:-1][collinear]] = True
+    return repeat
+
+
+def _anchors(h, t, keep_t, keep_h):
+    # Vertices downsampling must keep
+    anchor = np.zeros(len(h), dtype=bool)
+    anchor[[0, -1]] = True
+    for x in (h, t):
+        step = np.sign(np.diff(x))
+        nonzero = np.flatnonzero(step)
+        turns = step[nonzero[1:]] != step[nonzero[:-1]]
+        # The last vertex going one way and the first going the other
+        anchor[nonzero[:-1][turns] + 1] = True
+        anchor[nonzero[1:][turns]] = True
+    for value in keep_t:
+        # Both ends of every segment that reaches the temperature
+        low, high = np.minimum(t[:-1], t[1:]), np.maximum(t[:-1], t[1:])
+        spans = np.flatnonzero((low <= value) & (value <= high))
+        anchor[spans] = anchor[spans + 1] = True
+    for value in keep_h:
+        anchor[h == value] = True
+    return anchor
+
+
+def _lttb(h, t, first, candidates, last, count):
+    # Pick count of the candidate vertices between the vertices first and
+    # last by Largest-Triangle-Three-Buckets.
+    x, y = h[candidates], t[candidates]
+    bounds = np.linspace(0, len(candidates), count + 1).astype(np.int64)
+    sizes = np.diff(bounds)
+    # Mean of every bucket, and the end vertex after the last one
+    after_h = np.append(np.add.reduceat(x, bounds[:-1])[1:] / sizes[1:], h[last])
+    after_t = np.append(np.add.reduceat(y, bounds[:-1])[1:] / sizes[1:], t[last])
+
+    chosen = np.empty(count, dtype=np.int64)
+    previous_h, previous_t = h[first], t[first]
+    for k in range(count):
+        start, stop = bounds[k], bounds[k + 1]
+        bucket_h, bucket_t = x[start:stop], y[start:stop]
+        area = np.abs(
+            (previous_h - after_h[k]) * (bucket_t - previous_t)
+            - (previous_h - bucket_h) * (after_t[k] - previous_t)
+        )
+        best = start + int(area.argmax())
+        chosen[k] = best
+        previous_h, previous_t = x[best], y[best]
+    return candidates[chosen]
+
+
+def downsample(h, t, budget=None, keep_t=(), keep_h=()):
+    """
+    The vertices of the curve ``(h, t)`` to plot, as ``(h, t)`` arrays in
+    curve order. A curve within ``budget`` is returned whole; otherwise
+    collinear vertices are removed and LTTB brings it down to ``budget``
+    vertices, or to the anchors if there are more of them. With no budget
+    only collinear vertices are removed.
+    """
+    h = np.asarray(h, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    if len(h) < 3 or (budget is not None and len(h) <= budget):
+        return h, t
+
+    anchor = _anchors(h, t, keep_t, keep_h)
+    index = np.flatnonzero(~_straight(h, t) | anchor)
+
+    if budget is not None and len(index) > budget:
+        # Share the vertices left after the anchors between the gaps from
+        # one anchor to the next, in proportion to their vertices.
+        anchors = np.flatnonzero(anchor)
+        at = np.searchsorted(index, anchors)
+        gaps = [index[a + 1 : b] for a, b in zip(at, at[1:])]
+        sizes = np.array([len(gap) for gap in gaps])
+        spare = max(budget - len(anchors), 0)
+        share = spare * sizes / max(sizes.sum(), 1)
+        counts = np.floor(share).astype(int)
+        extra = spare - counts.sum()
+        counts[np.argsort(counts - share)[:extra]] += 1
+
+        chosen = list(anchors)
+        for a, b, gap, count in zip(anchors, anchors[1:], gaps, counts):
+            if count >= len(gap):
+                chosen.extend(gap)
+            elif count > 0:
+                chosen.extend(_lttb(h, t, a, gap, b, count))
+        index = np.sort(np.array(chosen, dtype=np.int64))
+
+    return h[index], t[index]
@@ -0,0 +1,206 @@
+"""
+thermalysis_pinch.export
+
+Typed columnar export of solved PyPinch results.
+
+``result_tables`` turns a solved ``PyPinch`` into plain columns (one NumPy
+array per column, no label rows), and ``write_dataset`` writes them as one
+dataset directory with a ``run_id`` column:
+
+    <directory>/<table>/<run_id>.<ext>
+
+so that every table can be read back across runs with ``read_dataset``.
+Supported formats are Parquet, uncompressed Arrow IPC (memory-mappable, read
+zero-copy) and LZ4-compressed Feather. pyarrow is only needed for writing and
+reading, not for ``result_tables``.
+"""
+
+import os
+import uuid
+
+import numpy as np
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "feather": ".feather"}
+
+TABLES = [
+    "summary",
+    "streams",
+    "problem_table",
+    "heat_cascade",
+    "shifted_composite",
+    "composite",
+    "grand_composite",
+]
+
+
+def curve_columns(diagram):
+    hot_h = np.asarray(diagram["hot"]["H"], dtype=np.float64)
+    cold_h = np.asarray(diagram["cold"]["H"], dtype=np.float64)
+    return {
+        "curve": np.array(["hot"] * len(hot_h) + ["cold"] * len(cold_h), dtype=object),
+        "point": np.concatenate(
+            [np.arange(len(hot_h)), np.arange(len(cold_h))]
+        ).astype(np.int64),
+        "h": np.concatenate([hot_h, cold_h]),
+        "t": np.concatenate(
+            [
+                np.asarray(diagram["hot"]["T"], dtype=np.float64),
+                np.asarray(diagram["cold"]["T"], dtype=np.float64),
+            ]
+        ),
+    }
+
+
+def result_tables(pinch):
+    """
+    Return ``{table: {column: ndarray}}`` for a solved PyPinch instance.
+    """
+    streams = pinch.streams.streamsData
+    intervals = pinch.temperatureInterval
+    delta_h = np.array([row["deltaH"] for row in pinch.problemTable], dtype=np.float64)
+
+    tables = {}
+    tables["summary"] = {
+        "tmin": np.array([pinch.tmin], dtype=np.float64),
+        "streams": np.array([len(streams)], dtype=np.int64),
+        "intervals": np.array([len(intervals)], dtype=np.int64),
+        "hot_utility": np.array([pinch.hotUtility], dtype=np.float64),
+        "cold_utility": np.array([pinch.coldUtility], dtype=np.float64),
+        "pinch_temperature": np.array([pinch.pinchTemperature], dtype=np.float64),
+    }
+    tables["streams"] = {
+        "stream": np.arange(1, len(streams) + 1, dtype=np.int64),
+        "type": np.array([s["type"] for s in streams], dtype=object),
+        "cp": np.array([s["cp"] for s in streams], dtype=np.float64),
+        "ts": np.array([s["ts"] for s in streams], dtype=np.float64),
+        "tt": np.array([s["tt"] for s in streams], dtype=np.float64),
+        "ss": np.array([s.get("ss", np.nan) for s in streams], dtype=np.float64),
+        "st": np.array([s.get("st", np.nan) for s in streams], dtype=np.float64),
+    }
+    tables["problem_table"] = {
+        "interval": np.arange(1, len(intervals) + 1, dtype=np.int64),
+        "s_upper": np.array([i["t1"] for i in intervals], dtype=np.float64),
+        "s_lower": np.array([i["t2"] for i in intervals], dtype=np.float64),
+        "delta_s": np.array([r["deltaS"] for r in pinch.problemTable], dtype=np.float64),
+        "delta_cp": np.array(
+            [r["deltaCP"] for r in pinch.problemTable], dtype=np.float64
+        ),
+        "delta_h": delta_h,
+        "status": np.where(
+            delta_h > 0, "surplus", np.where(delta_h < 0, "deficit", "balanced")
+        ).astype(object),
+    }
+    tables["heat_cascade"] = {
+        "interval": np.arange(1, len(pinch.heatCascade) + 1, dtype=np.int64),
+        "delta_h": np.array(
+            [r["deltaH"] for r in pinch.heatCascade], dtype=np.float64
+        ),
+        "infeasible_exit_h": np.array(
+            [r["exitH"] for r in pinch.unfeasibleHeatCascade], dtype=np.float64
+        ),
+        "exit_h": np.array([r["exitH"] for r in pinch.heatCascade], dtype=np.float64),
+    }
+    tables["shifted_composite"] = curve_columns(pinch.shiftedCompositeDiagram)
+    tables["composite"] = curve_columns(pinch.compositeDiagram)
+    tables["grand_composite"] = {
+        "point": np.arange(len(pinch.grandCompositeCurve["H"]), dtype=np.int64),
+        "h": np.asarray(pinch.grandCompositeCurve["H"], dtype=np.float64),
+        "t": np.asarray(pinch.grandCompositeCurve["T"], dtype=np.float64),
+    }
+    return tables
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Columnar export requires pyarrow (pip install .[arrow])")
+    return pyarrow
+
+
+def to_arrow(columns, run_id=None):
+    """
+    Build a pyarrow Table from ``{column: ndarray}``, prepending ``run_id``.
+    """
+    pa = _pyarrow()
+    arrays = {}
+    length = len(next(iter(columns.values()))) if columns else 0
+    if run_id is not None:
+        arrays["run_id"] = pa.array([run_id] * length, type=pa.string())
+    for name, values in columns.items():
+        values = np.asarray(values)
+        if values.dtype == object:
+            arrays[name] = pa.array(values.tolist(), type=pa.string())
+        else:
+            arrays[name] = pa.array(values)
+    return pa.table(arrays)
+
+
+def write_table(name, columns, directory, run_id, format="parquet"):
+    """
+    Write one table of the dataset and return the file path.
+    """
+    if format not in FORMATS:
+        raise ValueError(
+            "Unknown format {!r}; expected one of {}".format(format, sorted(FORMATS))
+        )
+    table = to_arrow(columns, run_id)
+    folder = os.path.join(directory, name)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, str(run_id) + FORMATS[format])
+
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path)
+    else:
+        import pyarrow.feather as feather
+
+        # Uncompressed IPC files can be memory-mapped and read zero-copy;
+        # Feather trades that for LZ4 compression.
+        compression = "uncompressed" if format == "arrow" else "lz4"
+        feather.write_feather(table, path, compression=compression)
+    return path
+
+
+def write_dataset(pinch, directory, run_id=None, format="parquet", tables=None):
+    """
+    Write every result table of a solved PyPinch into ``directory``.
+
+    Returns ``(run_id, {table: path})``.
+    """
+    run_id = run_id or uuid.uuid4().hex
+    paths = {}
+    for name, columns in result_tables(pinch).items():
+        if tables is None or name in tables:
+            paths[name] = write_table(name, columns, directory, run_id, format)
+    return run_id, paths
+
+
+def read_dataset(directory, table, format="parquet", run_ids=None):
+    """
+    Read one table across all runs in ``directory`` as a pyarrow Table.
+
+    Arrow IPC files are memory-mapped, so their buffers are not copied.
+    """
+    pa = _pyarrow()
+
+    folder = os.path.join(directory, table)
+    extension = FORMATS[format]
+    names = sorted(f for f in os.listdir(folder) if f.endswith(extension))
+    if run_ids is not None:
+        wanted = {str(run_id) + extension for run_id in run_ids}
+        names = [name for name in names if name in wanted]
+    paths = [os.path.join(folder, name) for name in names]
+
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        tables = [pq.read_table(path) for path in paths]
+    else:
+        tables = [
+            pa.ipc.open_file(pa.memory_map(path, "r")).read_all() for path in paths
+        ]
+    if not tables:
+        raise FileNotFoundError("No {} files for table {!r}".format(format, table))
+    return pa.concat_tables(tables)
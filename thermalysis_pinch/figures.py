@@ -0,0 +1,289 @@
+"""
+thermalysis_pinch.figures
+
+Plotly figures of a solved pinch problem, built from the tables of
+``thermalysis_pinch.export.result_tables`` (or ``solution.decode_tables``).
+They mirror the matplotlib drawings of ``PyPinch`` for the interactive
+pages; the report keeps the PNGs.
+
+Figures are plain figure dicts, which ``dcc.Graph`` takes as they are.
+Building them skips plotly's validation, which costs far more than the
+figure itself on large curves; wrap one in ``go.Figure`` to edit it.
+
+Curves with more than ``max_points`` vertices are thinned with
+``curves.downsample`` before they are sent to the browser, keeping the
+pinch, the utility ends and the turns of the GCC.
+"""
+
+import numpy as np
+
+from thermalysis_pinch.curves import Curve, downsample
+
+HOT = "#d62728"
+COLD = "#1f77b4"
+
+# Default vertex budget of every curve trace
+CURVE_POINTS = 2000
+
+
+def _figure(data, shapes, title, xaxis, yaxis):
+    return {
+        "data": data,
+        "layout": {
+            "title": {"text": title},
+            "xaxis": {"title": {"text": xaxis}, "showgrid": True},
+            "yaxis": {"title": {"text": yaxis}, "showgrid": True},
+            "shapes": shapes,
+            "template": "simple_white",
+            "showlegend": True,
+            "margin": {"l": 60, "r": 20, "t": 50, "b": 50},
+        },
+    }
+
+
+def _line(x, y, name, colour, mode="lines+markers", width=2, **kwargs):
+    line = {"color": colour, "width": width}
+    return dict(type="scatter", x=x, y=y, mode=mode, name=name, line=line, **kwargs)
+
+
+def _band(x0, x1, colour):
+    # Full-height band between two enthalpies
+    return {
+        "type": "rect",
+        "xref": "x",
+        "yref": "paper",
+        "x0": x0,
+        "x1": x1,
+        "y0": 0,
+        "y1": 1,
+        "fillcolor": colour,
+        "opacity": 0.25,
+        "line": {"width": 0},
+        "layer": "below",
+    }
+
+
+def _rule(vertical, at):
+    # Dotted full-width or full-height line
+    return {
+        "type": "line",
+        "xref": "x" if vertical else "paper",
+        "yref": "paper" if vertical else "y",
+        "x0": at if vertical else 0,
+        "x1": at if vertical else 1,
+        "y0": 0 if vertical else at,
+        "y1": 1 if vertical else at,
+        "line": {"dash": "dot", "color": "black", "width": 1},
+    }
+
+
+def _curve(columns, name):
+    mask = columns["curve"] == name
+    return columns["h"][mask], columns["t"][mask]
+
+
+def _segments(x, y0, y1):
+    # One trace for many vertical segments: x, x, None repeated.
+    n = len(x)
+    xs = np.empty(3 * n, dtype=object)
+    ys = np.empty(3 * n, dtype=object)
+    xs[0::3], xs[1::3], xs[2::3] = x, x, None
+    ys[0::3], ys[1::3], ys[2::3] = y0, y1, None
+    return xs, ys
+
+
+def temperature_interval_figure(tables):
+    """
+    Shifted temperature interval diagram: one arrow per stream from its
+    shifted supply to its shifted target temperature.
+    """
+    streams = tables["streams"]
+    table = tables["problem_table"]
+    boundaries = np.concatenate([table["s_upper"][:1], table["s_lower"]])
+    x = streams["stream"].astype(np.float64)
+
+    ys, xs = _segments(boundaries, 0.5, len(x) + 0.5)
+    data = [
+        _line(
+            xs,
+            ys,
+            "Interval boundaries",
+            "black",
+            mode="lines",
+            width=1,
+            hoverinfo="skip",
+            opacity=0.6,
+        )
+    ]
+    for kind, colour in (("HOT", HOT), ("COLD", COLD)):
+        mask = streams["type"] == kind
+        if not mask.any():
+            continue
+        xs, ys = _segments(x[mask], streams["ss"][mask], streams["st"][mask])
+        data.append(
+            _line(
+                xs,
+                ys,
+                kind.title() + " streams",
+                colour,
+                mode="lines",
+                width=4,
+                hoverinfo="skip",
+            )
+        )
+        data.append(
+            {
+                "type": "scatter",
+                "x": x[mask],
+                "y": streams["st"][mask],
+                "mode": "markers",
+                "marker": {
+                    "color": colour,
+                    "size": 12,
+                    "symbol": "triangle-down" if kind == "HOT" else "triangle-up",
+                },
+                "customdata": np.stack(
+                    [streams["cp"][mask], streams["ts"][mask], streams["tt"][mask]],
+                    axis=-1,
+                ),
+                "hovertemplate": "Stream %{x}<br>CP %{customdata[0]} kW/°C"
+                "<br>%{customdata[1]} → %{customdata[2]} °C<extra></extra>",
+                "showlegend": False,
+            }
+        )
+
+    figure = _figure(
+        data,
+        [],
+        "Shifted Temperature Interval Diagram",
+        "Stream",
+        "Shifted Temperature S (°C)",
+    )
+    figure["layout"]["xaxis"].update(tickmode="array", tickvals=x)
+    return figure
+
+
+def composite_figure(tables, shifted=False, max_points=CURVE_POINTS):
+    """
+    Hot and cold composite curves with the minimum utilities shaded and the
+    pinch marked; ``shifted`` plots the shifted composite curves. Each curve
+    is thinned to ``max_points`` vertices (None: collinear vertices only).
+    """
+    summary = tables["summary"]
+    columns = tables["shifted_composite" if shifted else "composite"]
+    hot_h, hot_t = _curve(columns, "hot")
+    cold_h, cold_t = _curve(columns, "cold")
+    hot_utility = float(summary["hot_utility"][0])
+    cold_utility = float(summary["cold_utility"][0])
+    pinch = float(summary["pinch_temperature"][0])
+
+    shapes = []
+    max_cold_h = float(cold_h.max()) if len(cold_h) else 0.0
+    if cold_utility > 0:
+        shapes.append(_band(0, cold_utility, "blue"))
+    if hot_utility > 0:
+        shapes.append(_band(max_cold_h - hot_utility, max_cold_h, "red"))
+
+    pinch_h = float(Curve(*_curve(tables["shifted_composite"], "cold")).enthalpy(pinch))
+    if not np.isnan(pinch_h):
+        shapes.append(_rule(True, pinch_h))
+
+    # The pinch is at pinch ± ΔTmin/2 on the actual curves
+    half = 0.0 if shifted else float(summary["tmin"][0]) / 2
+    hot_h, hot_t = downsample(hot_h, hot_t, max_points, keep_t=[pinch + half])
+    cold_h, cold_t = downsample(cold_h, cold_t, max_points, keep_t=[pinch - half])
+
+    title = (
+        "Shifted Temperature-Enthalpy Composite Diagram"
+        if shifted
+        else "Temperature-Enthalpy Composite Diagram"
+    )
+    yaxis = "Shifted Temperature S (°C)" if shifted else "Temperature T (°C)"
+    return _figure(
+        [_line(hot_h, hot_t, "Hot", HOT), _line(cold_h, cold_t, "Cold", COLD)],
+        shapes,
+        title,
+        "Enthalpy H (kW)",
+        yaxis,
+    )
+
+
+def grand_composite_figure(tables, max_points=CURVE_POINTS):
+    """
+    Grand composite curve with the minimum utilities shaded and the pinch
+    temperature marked, thinned to ``max_points`` vertices (None: collinear
+    vertices only).
+    """
+    columns = tables["grand_composite"]
+    h, t = columns["h"], columns["t"]
+    pinch = float(tables["summary"]["pinch_temperature"][0])
+
+    shapes = []
+    if len(h):
+        for x1, y1, colour in ((h[0], t[0], "red"), (h[-1], t[-1], "blue")):
+            shapes.append(
+                {
+                    "type": "rect",
+                    "x0": 0,
+                    "x1": float(x1),
+                    "y0": 0,
+                    "y1": float(y1),
+                    "fillcolor": colour,
+                    "opacity": 0.25,
+                    "line": {"width": 0},
+                    "layer": "below",
+                }
+            )
+    shapes.append(_rule(False, pinch))
+    h, t = downsample(h, t, max_points, keep_t=[pinch], keep_h=[0.0])
+    return _figure(
+        [_line(h, t, "GCC", COLD)],
+        shapes,
+        "Grand Composite Curve",
+        "Net Enthalpy Change ΔH (kW)",
+        "Shifted Temperature S (°C)",
+    )
+
+
+def figure_patch(figure):
+    """
+    A ``dash.Patch`` that replaces the traces, shapes and title of a figure
+    already on the page, leaving its axes, zoom and template alone.
+    """
+    from dash import Patch
+
+    patch = Patch()
+    patch["data"] = figure["data"]
+    patch["layout"]["shapes"] = figure["layout"]["shapes"]
+    patch["layout"]["title"] = figure["layout"]["title"]
+    return patch
+
+
+def placement_figure(scan, pinch_temperature):
+    """
+    Net utility saving of a heat pump or heat engine at every source and
+    sink temperature of a placement scan, with the pinch marked on both axes.
+    """
+    data = [
+        {
+            "type": "heatmap",
+            "x": scan["sinks"],
+            "y": scan["sources"],
+            "z": scan["net_saving"],
+            "colorscale": "RdBu",
+            "zmid": 0,
+            "colorbar": {"title": {"text": "kW"}},
+            "hovertemplate": "Source %{y:.1f} °C<br>Sink %{x:.1f} °C"
+            "<br>Net saving %{z:.4g} kW<extra></extra>",
+        }
+    ]
+    shapes = [_rule(True, pinch_temperature), _rule(False, pinch_temperature)]
+    figure = _figure(
+        data,
+        shapes,
+        "Heat Pump and Heat Engine Placement",
+        "Sink Shifted Temperature S (°C)",
+        "Source Shifted Temperature S (°C)",
+    )
+    figure["layout"]["showlegend"] = False
+    return figure
@@ -0,0 +1,164 @@
+"""
+thermalysis_pinch.jit_kernels
+
+Numba-compiled loops behind ``thermalysis_pinch.kernels``, imported only when
+the ``numba`` backend is in use. Each kernel does the same floating point
+operations in the same order as the NumPy code it replaces (sequential
+cumulative sums, per-interval sums in stream order), so both backends give
+identical results. Compiled code is cached next to this module.
+"""
+
+import numba
+import numpy as np
+
+
+@numba.njit(cache=True)
+def merge_unique(a, b):
+    # Distinct values of two ascending arrays, ascending, and the position of
+    # every element of a and b in them.
+    merged = np.empty(len(a) + len(b))
+    index_a = np.empty(len(a), dtype=np.int64)
+    index_b = np.empty(len(b), dtype=np.int64)
+    i = j = size = 0
+    while i < len(a) or j < len(b):
+        if j == len(b) or (i < len(a) and a[i] <= b[j]):
+            value = a[i]
+        else:
+            value = b[j]
+        merged[size] = value
+        while i < len(a) and a[i] == value:
+            index_a[i] = size
+            i += 1
+        while j < len(b) and b[j] == value:
+            index_b[j] = size
+            j += 1
+        size += 1
+    return merged[:size], index_a, index_b
+
+
+@numba.njit(cache=True)
+def unique_ends(lower, upper):
+    # np.unique(concatenate([lower, upper]), return_inverse=True), split into
+    # the indices of the lower and the upper ends.
+    values = np.concatenate((lower, upper))
+    order = np.argsort(values)
+    distinct = np.empty(len(values))
+    inverse = np.empty(len(values), dtype=np.int64)
+    size = 0
+    for k in range(len(order)):
+        value = values[order[k]]
+        if size == 0 or value != distinct[size - 1]:
+            distinct[size] = value
+            size += 1
+        inverse[order[k]] = size - 1
+    return distinct[:size], inverse[: len(lower)], inverse[len(lower) :]
+
+
+@numba.njit(cache=True)
+def interval_cp(lower, upper, cp, size):
+    # Same sums as kernels._interval_cp: per-end sums in stream order, then
+    # one running sum, zero where no stream is present.
+    edges = np.zeros(size)
+    removed = np.zeros(size)
+    count = np.zeros(size, dtype=np.int64)
+    for k in range(len(cp)):
+        edges[lower[k]] += cp[k]
+        removed[upper[k]] += cp[k]
+        count[lower[k]] += 1
+        count[upper[k]] -= 1
+    result = np.zeros(max(size - 1, 0))
+    total = 0.0
+    present = 0
+    for k in range(size - 1):
+        total += edges[k] - removed[k]
+        present += count[k]
+        if present > 0:
+            result[k] = total
+    return result
+
+
+@numba.njit(cache=True)
+def problem_table(
+    hot_t, hot_lower, hot_upper, hot_cp, cold_t, cold_lower, cold_upper, cold_cp, tmin
+):
+    temperatures, hot_index, cold_index = merge_unique(
+        hot_t - tmin / 2, cold_t + tmin / 2
+    )
+    size = len(temperatures)
+    hot_h = interval_cp(hot_index[hot_lower], hot_index[hot_upper], hot_cp, size)
+    cold_h = interval_cp(cold_index[cold_lower], cold_index[cold_upper], cold_cp, size)
+    for k in range(size - 1):
+        delta_s = temperatures[k + 1] - temperatures[k]
+        hot_h[k] = hot_h[k] * delta_s
+        cold_h[k] = cold_h[k] * delta_s
+    return temperatures, hot_h, cold_h
+
+
+@numba.njit(cache=True)
+def cascade(temperatures, hot_h, cold_h):
+    # (hot utility, cold utility, pinch temperature), as kernels._cascade
+    total = 0.0
+    lowest = 0.0
+    pinch_interval = 0
+    for k in range(len(hot_h)):
+        total += hot_h[len(hot_h) - 1 - k] - cold_h[len(hot_h) - 1 - k]
+        if total < lowest:
+            lowest = total
+            pinch_interval = k
+    hot_utility = abs(lowest)
+    cold_utility = total + hot_utility if len(hot_h) else hot_utility
+    size = len(temperatures)
+    pinch = temperatures[size - 2 - pinch_interval] if size > 1 else temperatures[0]
+    return hot_utility, cold_utility, pinch
+
+
+@numba.njit(cache=True)
+def targets(
+    hot_t, hot_lower, hot_upper, hot_cp, cold_t, cold_lower, cold_upper, cold_cp, tmins
+):
+    result = np.empty((3, len(tmins)))
+    for i in range(len(tmins)):
+        temperatures, hot_h, cold_h = problem_table(
+            hot_t,
+            hot_lower,
+            hot_upper,
+            hot_cp,
+            cold_t,
+            cold_lower,
+            cold_upper,
+            cold_cp,
+            tmins[i],
+        )
+        result[0, i], result[1, i], result[2, i] = cascade(temperatures, hot_h, cold_h)
+    return result
+
+
+@numba.njit(cache=True, parallel=True)
+def solve_batch(cp, ts, tt, tmin):
+    # One scenario per row, rows in parallel; padding and invalid streams are
+    # skipped as in kernels.solve_batch.
+    result = np.full((3, cp.shape[0]), np.nan)
+    for row in numba.prange(cp.shape[0]):
+        use = np.isfinite(cp[row]) & np.isfinite(ts[row]) & np.isfinite(tt[row])
+        use &= (cp[row] > 0) & (ts[row] != tt[row])
+        if not use.any() or not np.isfinite(tmin[row]):
+            continue
+        row_cp, row_ts, row_tt = cp[row][use], ts[row][use], tt[row][use]
+        hot = row_ts > row_tt
+        hot_t, hot_lower, hot_upper = unique_ends(row_tt[hot], row_ts[hot])
+        cold_t, cold_lower, cold_upper = unique_ends(row_ts[~hot], row_tt[~hot])
+        temperatures, hot_h, cold_h = problem_table(
+            hot_t,
+            hot_lower,
+            hot_upper,
+            row_cp[hot],
+            cold_t,
+            cold_lower,
+            cold_upper,
+            row_cp[~hot],
+            tmin[row],
+        )
+        result[0, row], result[1, row], result[2, row] = cascade(
+            temperatures, hot_h, cold_h
+        )
+    return result
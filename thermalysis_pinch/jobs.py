@@ -0,0 +1,75 @@
+"""
+thermalysis_pinch.jobs
+
+Background callback support for long-running solves.
+
+Dash background callbacks run in a separate worker process managed by a
+``DiskcacheManager``; the browser polls for progress and the result, so a
+large solve no longer holds a server worker or runs into request timeouts.
+"""
+
+import os
+
+import dash
+
+from thermalysis_pinch.config.main import CACHE_DIR
+from thermalysis_pinch.metrics import save_stage_records
+
+DEFAULT_CACHE_DIR = os.path.join(CACHE_DIR, "jobs")
+
+SOLVE_STAGES = [
+    "shiftTemperatures",
+    "constructTemperatureInterval",
+    "constructProblemTable",
+    "constructHeatCascade",
+    "constructShiftedCompositeDiagram",
+    "constructCompositeDiagram",
+    "constructGrandCompositeCurve",
+]
+
+STAGE_LABELS = {
+    "shiftTemperatures": "Shifting temperatures",
+    "constructTemperatureInterval": "Building temperature intervals",
+    "constructProblemTable": "Building problem table",
+    "constructHeatCascade": "Cascading heat",
+    "constructShiftedCompositeDiagram": "Building shifted composite curves",
+    "constructCompositeDiagram": "Building composite curves",
+    "constructGrandCompositeCurve": "Building grand composite curve",
+}
+
+
+def background_callback_manager(cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Return the manager passed to ``dash.Dash(background_callback_manager=...)``.
+    """
+    import diskcache
+
+    return dash.DiskcacheManager(diskcache.Cache(cache_dir))
+
+
+def solve_with_progress(pinch, set_progress, options={}):
+    """
+    Solve ``pinch`` and report ``(done, total, label)`` through
+    ``set_progress`` before each solve stage, ``label`` naming the stage that
+    is about to run.
+
+    Meant for background callbacks: the stage timings are lost with the job
+    process, so they are saved for the web process to add to ``/metrics``.
+    """
+    total = len(SOLVE_STAGES)
+    done = []
+    records = []
+
+    def report(pinch, record):
+        records.append(record)
+        if record["stage"] in STAGE_LABELS:
+            done.append(record["stage"])
+            if len(done) < total:
+                label = STAGE_LABELS[SOLVE_STAGES[len(done)]]
+                set_progress((str(len(done)), str(total), label))
+
+    set_progress(("0", str(total), STAGE_LABELS[SOLVE_STAGES[0]]))
+    pinch.addStageHook(report)
+    pinch.solve(options)
+    save_stage_records(records)
+    return pinch
@@ -0,0 +1,282 @@
+"""
+thermalysis_pinch.kernels
+
+Array kernels for the pinch targeting steps of ``PyPinch``.
+
+``SortedStreams`` sorts the temperatures of one stream set once. After that,
+the problem table, heat cascade, composite curves and grand composite curve
+can be rebuilt for any ΔTmin without going through ``PyPinch`` again. ΔTmin
+only shifts the sorted hot temperatures down and the cold ones up, so each
+rebuild is one merge of two sorted arrays plus a few cumulative sums. The
+results follow the conventions of ``PyPinch``: the same intervals, the same
+pinch choice, and curve points only where the enthalpy changes.
+
+The problem table, the cascade, ``SortedStreams.targets`` and ``solve_batch``
+run as Numba-compiled loops (``thermalysis_pinch.jit_kernels``) when Numba is
+installed, and as the NumPy code below otherwise, with identical results. Set
+``PINCH_KERNELS=numpy`` to force the NumPy backend, or call ``use_backend``.
+"""
+
+import os
+
+import numpy as np
+
+BACKENDS = ["numba", "numpy"]
+
+_backend = None
+
+
+def backend():
+    """
+    The kernel backend in use, ``"numba"`` or ``"numpy"``. Chosen on first use
+    from ``PINCH_KERNELS`` (default ``auto``: Numba if it can be imported),
+    so importing this module never imports Numba.
+    """
+    if _backend is None:
+        choice = os.environ.get("PINCH_KERNELS", "auto")
+        use_backend("numba" if choice == "auto" and _numba_available() else choice)
+    return _backend
+
+
+def use_backend(name):
+    """
+    Select the ``"numba"`` or ``"numpy"`` backend for this process.
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(
+            "Unknown kernel backend {!r}, expected one of {}".format(name, BACKENDS)
+        )
+    if name == "numba":
+        # Fails here, not in the middle of a solve, if Numba is missing
+        import thermalysis_pinch.jit_kernels  # noqa: F401
+    _backend = name
+
+
+def _numba_available():
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _jit():
+    from thermalysis_pinch import jit_kernels
+
+    return jit_kernels
+
+
+def _interval_cp(lower, upper, cp, size):
+    # Sum of CP over the streams spanning each interval, where stream i
+    # spans the intervals lower[i] .. upper[i] - 1.
+    edges = np.bincount(lower, cp, size) - np.bincount(upper, cp, size)
+    # The running sum leaves rounding residue where all streams have ended;
+    # count the streams so that empty intervals are exactly zero.
+    count = np.cumsum(
+        np.bincount(lower, minlength=size) - np.bincount(upper, minlength=size)
+    )
+    return np.where(count[:-1] > 0, np.cumsum(edges)[:-1], 0.0)
+
+
+def _cascade(temperatures, hot_h, cold_h):
+    # Heat cascade from the top interval down, as in the problem table, and
+    # the targets: the hot utility lifts the lowest cascade value to zero,
+    # the pinch is the bottom of the first interval reaching it.
+    delta_h = (hot_h - cold_h)[::-1]
+    cascade = np.cumsum(delta_h)
+    lowest = min(0.0, cascade.min()) if len(cascade) else 0.0
+    pinch_interval = int(np.argmin(cascade)) if lowest < 0 else 0
+    hot_utility = abs(lowest)
+    exit_h = cascade + hot_utility
+    cold_utility = exit_h[-1] if len(exit_h) else hot_utility
+    descending = temperatures[::-1]
+    pinch = descending[pinch_interval + 1] if len(descending) > 1 else descending[0]
+    return delta_h, exit_h, hot_utility, cold_utility, pinch
+
+
+class SortedStreams:
+    """
+    The hot and cold stream temperatures of a stream set, sorted once, for
+    targeting at any ΔTmin.
+    """
+
+    def __init__(self, cp, ts, tt):
+        cp = np.asarray(cp, dtype=np.float64)
+        ts = np.asarray(ts, dtype=np.float64)
+        tt = np.asarray(tt, dtype=np.float64)
+
+        # Same rule as PyPinch.Streams: hot when the supply is hotter.
+        hot = ts > tt
+        self.hot_cp = cp[hot]
+        self.cold_cp = cp[~hot]
+
+        # Distinct end temperatures per side, ascending, and every stream's
+        # lower and upper end as an index into them.
+        self.hot_t, index = np.unique(
+            np.concatenate([tt[hot], ts[hot]]), return_inverse=True
+        )
+        self.hot_lower, self.hot_upper = np.split(index.ravel(), 2)
+        self.cold_t, index = np.unique(
+            np.concatenate([ts[~hot], tt[~hot]]), return_inverse=True
+        )
+        self.cold_lower, self.cold_upper = np.split(index.ravel(), 2)
+
+    def problem_table(self, tmin):
+        """
+        Return ``(temperatures, hot_h, cold_h)`` at ``tmin``: the distinct
+        shifted temperatures in ascending order, and the heat released by
+        the hot and taken up by the cold streams in every interval between
+        them.
+        """
+        if backend() == "numba":
+            return _jit().problem_table(*self._sorted(), float(tmin))
+
+        hot_s = self.hot_t - tmin / 2
+        cold_s = self.cold_t + tmin / 2
+        temperatures = np.unique(np.concatenate([hot_s, cold_s]))
+        size = len(temperatures)
+
+        hot_index = np.searchsorted(temperatures, hot_s)
+        cold_index = np.searchsorted(temperatures, cold_s)
+        hot_cp = _interval_cp(
+            hot_index[self.hot_lower], hot_index[self.hot_upper], self.hot_cp, size
+        )
+        cold_cp = _interval_cp(
+            cold_index[self.cold_lower], cold_index[self.cold_upper], self.cold_cp, size
+        )
+        delta_s = np.diff(temperatures)
+        return temperatures, hot_cp * delta_s, cold_cp * delta_s
+
+    def _sorted(self):
+        return (
+            self.hot_t,
+            self.hot_lower,
+            self.hot_upper,
+            self.hot_cp,
+            self.cold_t,
+            self.cold_lower,
+            self.cold_upper,
+            self.cold_cp,
+        )
+
+    def targets(self, tmins):
+        """
+        ``(hot_utility, cold_utility, pinch_temperature)`` arrays at every
+        ΔTmin of ``tmins``, without building the curves.
+        """
+        tmins = np.atleast_1d(np.asarray(tmins, dtype=np.float64))
+        if backend() == "numba":
+            return tuple(_jit().targets(*self._sorted(), tmins))
+
+        result = np.empty((3, len(tmins)))
+        for i, tmin in enumerate(tmins):
+            result[:, i] = _cascade(*self.problem_table(tmin))[2:]
+        return tuple(result)
+
+    def solve(self, tmin):
+        """
+        Targets and curves at ``tmin`` as ``{name: value}``: the hot and cold
+        utility, the pinch temperature, the heat cascade and the shifted
+        composite, composite and grand composite curves.
+        """
+        temperatures, hot_h, cold_h = self.problem_table(tmin)
+        delta_h, exit_h, hot_utility, cold_utility, pinch = _cascade(
+            temperatures, hot_h, cold_h
+        )
+
+        descending = temperatures[::-1]
+        hot_points = hot_h != 0
+        cold_points = cold_h != 0
+        shifted = {
+            "hot": {
+                "H": np.concatenate([[0.0], np.cumsum(hot_h[hot_points])]),
+                "T": np.concatenate([temperatures[:1], temperatures[1:][hot_points]]),
+            },
+            "cold": {
+                "H": np.concatenate(
+                    [[cold_utility], cold_utility + np.cumsum(cold_h[cold_points])]
+                ),
+                "T": np.concatenate([temperatures[:1], temperatures[1:][cold_points]]),
+            },
+        }
+        return {
+            "tmin": float(tmin),
+            "hot_utility": float(hot_utility),
+            "cold_utility": float(cold_utility),
+            "pinch_temperature": float(pinch),
+            "temperatures": descending,
+            "delta_h": delta_h,
+            "exit_h": exit_h,
+            "shifted_composite": shifted,
+            "composite": {
+                "hot": {"H": shifted["hot"]["H"], "T": shifted["hot"]["T"] + tmin / 2},
+                "cold": {
+                    "H": shifted["cold"]["H"],
+                    "T": shifted["cold"]["T"] - tmin / 2,
+                },
+            },
+            "grand_composite": {
+                "H": np.concatenate([[hot_utility], exit_h]),
+                "T": descending,
+            },
+        }
+
+    def tables(self, tmin):
+        """
+        The ``summary``, ``shifted_composite``, ``composite`` and
+        ``grand_composite`` tables at ``tmin``, with the columns of
+        ``thermalysis_pinch.export.result_tables``.
+        """
+        from thermalysis_pinch.export import curve_columns
+
+        result = self.solve(tmin)
+        gcc = result["grand_composite"]
+        return {
+            "summary": {
+                "tmin": np.array([result["tmin"]]),
+                "hot_utility": np.array([result["hot_utility"]]),
+                "cold_utility": np.array([result["cold_utility"]]),
+                "pinch_temperature": np.array([result["pinch_temperature"]]),
+            },
+            "shifted_composite": curve_columns(result["shifted_composite"]),
+            "composite": curve_columns(result["composite"]),
+            "grand_composite": {
+                "point": np.arange(len(gcc["H"]), dtype=np.int64),
+                "h": gcc["H"],
+                "t": gcc["T"],
+            },
+        }
+
+
+def solve_batch(cp, ts, tt, tmin):
+    """
+    Targets of many stream sets at once, one per row of ``(scenarios,
+    streams)`` arrays with ``tmin`` one value per scenario. Non-finite values
+    pad rows with fewer streams, and streams without a positive CP or with
+    equal supply and target are skipped. Returns ``{name: (scenarios,)
+    ndarray}`` of the hot and cold utility and pinch temperature, NaN for a
+    scenario without a valid stream.
+    """
+    cp = np.atleast_2d(np.asarray(cp, dtype=np.float64))
+    ts = np.atleast_2d(np.asarray(ts, dtype=np.float64))
+    tt = np.atleast_2d(np.asarray(tt, dtype=np.float64))
+    tmin = np.broadcast_to(np.asarray(tmin, dtype=np.float64), (len(cp),))
+
+    if backend() == "numba":
+        result = _jit().solve_batch(cp, ts, tt, np.ascontiguousarray(tmin))
+    else:
+        result = np.full((3, len(cp)), np.nan)
+        use = np.isfinite(cp) & np.isfinite(ts) & np.isfinite(tt)
+        use &= (cp > 0) & (ts != tt)
+        for i in range(len(cp)):
+            if not use[i].any() or not np.isfinite(tmin[i]):
+                continue
+            row = use[i]
+            streams = SortedStreams(cp[i, row], ts[i, row], tt[i, row])
+            result[:, i] = _cascade(*streams.problem_table(tmin[i]))[2:]
+    return {
+        "hot_utility": result[0],
+        "cold_utility": result[1],
+        "pinch_temperature": result[2],
+    }
@@ -0,0 +1,411 @@
+"""
+thermalysis_pinch.metrics
+
+In-process metrics exposed as Prometheus text on ``/metrics``.
+
+No client library or external service is needed: the collectors below keep
+their state in process memory and ``render_text`` formats it in the text
+exposition format, so a local Prometheus scraper or a plain ``curl`` can read
+it. When the app runs with several worker processes each worker reports its
+own numbers.
+"""
+
+import abc
+import bisect
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+import dash
+from flask import Response, g, request
+
+from thermalysis_pinch.config.main import CACHE_DIR
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# A client counts as an active session while it made a request within this
+# many seconds.
+SESSION_WINDOW = 300.0
+
+DASH_UPDATE_PATH = "_dash-update-component"
+
+# Stage records of solves run outside the web process (Dash background
+# callbacks), waiting for the next worker that serves /metrics to observe them
+STAGE_RECORDS_DIR = os.path.join(CACHE_DIR, "stage-records")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(
+            name, str(value).replace("\\", "\\\\").replace('"', '\\"')
+        )
+        for name, value in pairs
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value):
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                "{} expects labels {}, got {}".format(
+                    self.name, self.labelnames, tuple(labels)
+                )
+            )
+        return tuple(labels[name] for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self):
+        """``(suffix, label values, extra labels, value)`` per sample line."""
+
+    def render(self):
+        lines = [
+            "# HELP {} {}".format(self.name, self.documentation),
+            "# TYPE {} {}".format(self.name, self.kind),
+        ]
+        for suffix, labels, extra, value in self.samples():
+            lines.append(
+                "{}{}{} {}".format(
+                    self.name,
+                    suffix,
+                    _format_labels(self.labelnames, labels, extra),
+                    _format_value(value),
+                )
+            )
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", key, (), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", key, (), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(c), s)) for key, (c, s) in self._values.items())
+        samples = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                samples.append(("_bucket", key, (("le", le),), cumulative))
+            samples.append(("_sum", key, (), total))
+            samples.append(("_count", key, (), cumulative))
+        return samples
+
+
+callback_duration = Histogram(
+    "pinch_dash_callback_duration_seconds",
+    "Latency of Dash callback requests.",
+    ("callback",),
+)
+solver_stage_duration = Histogram(
+    "pinch_solver_stage_duration_seconds",
+    "Wall time of PyPinch solve, draw and csv stages.",
+    ("stage",),
+)
+cache_requests = Counter(
+    "pinch_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+cache_hit_ratio = Gauge(
+    "pinch_cache_hit_ratio",
+    "Fraction of cache lookups that were hits.",
+    ("cache",),
+)
+render_queue_depth = Gauge(
+    "pinch_render_queue_depth",
+    "Dash callback requests currently being processed.",
+)
+active_sessions = Gauge(
+    "pinch_active_sessions",
+    "Distinct clients seen within the session window.",
+)
+response_bytes = Counter(
+    "pinch_response_bytes_total",
+    "Bytes sent, by page.",
+    ("page",),
+)
+
+render_queue_depth.set(0)
+active_sessions.set(0)
+
+REGISTRY = [
+    callback_duration,
+    solver_stage_duration,
+    cache_requests,
+    cache_hit_ratio,
+    render_queue_depth,
+    active_sessions,
+    response_bytes,
+]
+
+_clients = {}
+_clients_lock = threading.Lock()
+_clients_pruned_at = 0.0
+
+
+def record_cache(cache, hit):
+    """
+    Count one lookup in the named cache.
+    """
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def observe_stage(pinch, record):
+    """
+    PyPinch stage hook feeding the solver stage histogram.
+    """
+    solver_stage_duration.observe(record["seconds"], stage=record["stage"])
+
+
+def save_stage_records(records, directory=None):
+    """
+    Keep the PyPinch stage records of a solve run in another process, for
+    ``collect_stage_records`` to observe in a web process.
+    """
+    if not records:
+        return
+    directory = directory or STAGE_RECORDS_DIR
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix="tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(
+            [{"stage": r["stage"], "seconds": r["seconds"]} for r in records], f
+        )
+    os.replace(tmp, os.path.join(directory, uuid.uuid4().hex + ".json"))
+
+
+def collect_stage_records(directory=None):
+    """
+    Observe the stage records saved by ``save_stage_records`` and delete them.
+    """
+    directory = directory or STAGE_RECORDS_DIR
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if not entry.name.endswith(".json"):
+            continue
+        # The rename claims the file, so only one worker observes it
+        claimed = "{}.{}".format(entry.path, os.getpid())
+        try:
+            os.rename(entry.path, claimed)
+        except FileNotFoundError:
+            continue
+        with open(claimed) as f:
+            records = json.load(f)
+        os.remove(claimed)
+        for record in records:
+            observe_stage(None, record)
+
+
+def _update_derived():
+    caches = {key[0] for key in cache_requests._values}
+    for cache in caches:
+        hits = cache_requests.value(cache=cache, result="hit")
+        misses = cache_requests.value(cache=cache, result="miss")
+        if hits + misses:
+            cache_hit_ratio.set(hits / (hits + misses), cache=cache)
+
+    with _clients_lock:
+        _prune_clients(time.monotonic())
+        active_sessions.set(len(_clients))
+
+
+def _prune_clients(now):
+    # Forget clients outside the session window; the caller holds the lock.
+    global _clients_pruned_at
+    cutoff = now - SESSION_WINDOW
+    for client in [c for c, seen in _clients.items() if seen < cutoff]:
+        del _clients[client]
+    _clients_pruned_at = now
+
+
+def _seen_client(now):
+    with _clients_lock:
+        _clients[_client_key()] = now
+        # Also pruned here, so a server nobody scrapes stays bounded
+        if now - _clients_pruned_at > SESSION_WINDOW / 10:
+            _prune_clients(now)
+
+
+def render_text():
+    """
+    Return every metric in the Prometheus text exposition format.
+    """
+    _update_derived()
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def _client_key():
+    cookie = request.cookies.get("session")
+    if cookie:
+        return cookie
+    agent = request.headers.get("User-Agent", "")
+    raw = "{}|{}".format(request.remote_addr, agent).encode()
+    return hashlib.sha1(raw).hexdigest()
+
+
+def _is_dash_update():
+    return request.path.endswith(DASH_UPDATE_PATH)
+
+
+def _page_label():
+    # Callback requests are attributed to the page they were fired from.
+    # Labels are Dash page paths or the server's URL rules, never the raw
+    # path, so download tokens and probes do not add a series each.
+    pages = {page["relative_path"] for page in dash.page_registry.values()}
+    if _is_dash_update():
+        path = urlparse(request.referrer).path if request.referrer else None
+        return path if path in pages else "other"
+    if request.path in pages:
+        return request.path
+    return request.url_rule.rule if request.url_rule else "other"
+
+
+def _callback_label():
+    body = request.get_json(silent=True) or {}
+    output = body.get("output", "unknown")
+    return output if isinstance(output, str) else str(output)
+
+
+def init_metrics(dash_app, path="/metrics"):
+    """
+    Instrument the Flask server behind ``dash_app`` and serve ``path``.
+    """
+    from thermalysis_pinch.PyPinch import PyPinch
+
+    server = dash_app.server
+
+    if observe_stage not in PyPinch.stageHooks:
+        PyPinch.stageHooks.append(observe_stage)
+
+    @server.before_request
+    def _metrics_before():
+        if request.path == path:
+            return
+        g.metrics_start = time.perf_counter()
+        _seen_client(time.monotonic())
+        if _is_dash_update():
+            g.metrics_in_queue = True
+            render_queue_depth.inc()
+
+    @server.after_request
+    def _metrics_after(response):
+        start = g.get("metrics_start")
+        if start is None:
+            return response
+        if _is_dash_update():
+            callback_duration.observe(
+                time.perf_counter() - start, callback=_callback_label()
+            )
+        if not response.direct_passthrough:
+            size = response.calculate_content_length()
+            if size:
+                response_bytes.inc(size, page=_page_label())
+        return response
+
+    @server.teardown_request
+    def _metrics_teardown(exc):
+        if g.pop("metrics_in_queue", False):
+            render_queue_depth.dec()
+
+    def metrics_view():
+        collect_stage_records()
+        return Response(render_text(), mimetype="text/plain; version=0.0.4")
+
+    server.add_url_rule(path, "metrics", metrics_view)
+    return server
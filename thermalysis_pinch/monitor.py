@@ -0,0 +1,350 @@
+"""
+thermalysis_pinch.monitor
+
+Rolling pinch targets from historian time series.
+
+Samples arrive as time-stamped rows of tag values, from a CSV or Parquet file
+or from a socket sending one JSON object per line:
+
+    {"timestamp": "2024-05-01T12:00:00Z", "FI101": 12.5, "TI101": 151.2, ...}
+
+A configuration maps tags onto the streams and the measured utilities:
+
+    {
+        "tmin": 10,
+        "window": 900,
+        "step": 60,
+        "streams": [
+            {"name": "reactor effluent", "flow": "FI101", "cp": 2.1,
+             "ts": "TI101", "tt": "TI102"},
+            {"name": "feed", "flow": "FI201", "cp": 4.18, "ts": 25, "tt": "TI202"}
+        ],
+        "hot_utility": "QI901",
+        "cold_utility": "QI902"
+    }
+
+``cp`` is the specific heat (kJ/kg°C) and ``flow`` a mass flow tag (kg/s),
+so CP = flow × cp in kW/°C; temperatures are tags or fixed values. Every
+``step`` seconds ``RollingMonitor`` averages the last ``window`` seconds of
+samples into stream data and emits the targets next to the measured
+utilities and the gap between them. The streams are only solved again when
+a CP has moved by more than ``cp_tolerance`` (relative) or a temperature by
+more than ``t_tolerance`` since the last solve; otherwise the previous
+targets are reused.
+
+    python -m thermalysis_pinch.monitor plant.json samples.parquet
+    python -m thermalysis_pinch.monitor plant.json tcp://historian:5555
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from thermalysis_pinch.kernels import SortedStreams
+
+BATCH_SIZE = 4096
+
+
+def _seconds(values):
+    # Epoch seconds from numbers or date-time strings
+    values = np.asarray(values)
+    if values.dtype.kind in "iuf":
+        return values.astype(np.float64)
+    import pandas as pd
+
+    stamps = pd.to_datetime(values, utc=True)
+    seconds = (stamps - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(1, "s")
+    return np.asarray(seconds, dtype=np.float64)
+
+
+def _batch(columns, timestamp):
+    batch = {name: np.asarray(values) for name, values in columns.items()}
+    batch[timestamp] = _seconds(batch[timestamp])
+    return batch
+
+
+def csv_batches(path, timestamp="timestamp", batch_size=BATCH_SIZE):
+    """
+    Yield ``{column: ndarray}`` batches of a samples CSV file.
+    """
+    import pandas as pd
+
+    for frame in pd.read_csv(path, chunksize=batch_size):
+        yield _batch({c: frame[c].to_numpy() for c in frame.columns}, timestamp)
+
+
+def parquet_batches(path, timestamp="timestamp", batch_size=BATCH_SIZE):
+    """
+    Yield ``{column: ndarray}`` batches of a samples Parquet file.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError(
+            "Reading Parquet samples requires pyarrow (pip install .[arrow]); "
+            "or use a CSV file"
+        )
+
+    for record_batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        columns = {
+            name: column.to_numpy(zero_copy_only=False)
+            for name, column in zip(record_batch.schema.names, record_batch.columns)
+        }
+        yield _batch(columns, timestamp)
+
+
+def socket_batches(host, port, timestamp="timestamp", batch_size=BATCH_SIZE):
+    """
+    Yield batches of the JSON lines sent by a TCP server, until it closes the
+    connection. A batch is sent on as soon as the socket has no more lines
+    ready, so a slow source is not held back waiting for a full batch.
+    """
+    import select
+    import socket
+
+    with socket.create_connection((host, port)) as connection:
+        reader = connection.makefile("r", encoding="utf-8")
+        rows = []
+        for line in reader:
+            if line.strip():
+                rows.append(json.loads(line))
+            waiting = select.select([connection], [], [], 0)[0]
+            if rows and (len(rows) >= batch_size or not waiting):
+                yield _rows_batch(rows, timestamp)
+                rows = []
+        if rows:
+            yield _rows_batch(rows, timestamp)
+
+
+def _rows_batch(rows, timestamp):
+    # Tags missing from a row become NaN
+    names = {name for row in rows for name in row}
+    columns = {
+        name: np.array([row.get(name) for row in rows], dtype=np.float64)
+        for name in names
+        if name != timestamp
+    }
+    columns[timestamp] = [row.get(timestamp) for row in rows]
+    return _batch(columns, timestamp)
+
+
+def open_source(source, timestamp="timestamp", batch_size=BATCH_SIZE):
+    """
+    Batches of a ``.csv`` or ``.parquet`` file, or of ``tcp://host:port``.
+    """
+    if source.startswith("tcp://"):
+        host, port = source[len("tcp://") :].rsplit(":", 1)
+        return socket_batches(host, int(port), timestamp, batch_size)
+    if source.endswith(".parquet"):
+        return parquet_batches(source, timestamp, batch_size)
+    return csv_batches(source, timestamp, batch_size)
+
+
+class RollingMonitor:
+    """
+    Rolling-window stream data, targets and utility gaps from tag samples.
+    """
+
+    def __init__(
+        self,
+        streams,
+        tmin,
+        window,
+        step=None,
+        hot_utility=None,
+        cold_utility=None,
+        cp_tolerance=0.02,
+        t_tolerance=0.5,
+        timestamp="timestamp",
+    ):
+        self.streams = streams
+        self.tmin = float(tmin)
+        self.window = float(window)
+        self.step = float(step or window)
+        self.cp_tolerance = cp_tolerance
+        self.t_tolerance = t_tolerance
+        self.timestamp = timestamp
+        self.solves = 0
+        self.samples = 0
+
+        # Every tag read, and where each stream value comes from: a column of
+        # the window means or a fixed number.
+        self._utility_tags = [hot_utility, cold_utility]
+        tags = [s[key] for s in streams for key in ("flow", "ts", "tt")]
+        tags += self._utility_tags
+        self.tags = sorted({tag for tag in tags if isinstance(tag, str)})
+        self._column = {tag: i for i, tag in enumerate(self.tags)}
+        self._specific_cp = np.array([s["cp"] for s in streams], dtype=np.float64)
+
+        self._times = np.empty(0)
+        self._values = np.empty((0, len(self.tags)))
+        self._next = None
+        self._solved = None
+        self._targets = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        A monitor from the JSON configuration described above.
+        """
+        options = {
+            key: config[key]
+            for key in (
+                "step",
+                "hot_utility",
+                "cold_utility",
+                "cp_tolerance",
+                "t_tolerance",
+                "timestamp",
+            )
+            if key in config
+        }
+        return cls(config["streams"], config["tmin"], config["window"], **options)
+
+    def _means(self, ends):
+        # Mean of every tag over (end - window, end] for each end, NaN where a
+        # tag has no sample, from cumulative sums over the buffer.
+        values = self._values
+        finite = np.isfinite(values)
+        zero = np.zeros((1, len(self.tags)))
+        sums = np.vstack([zero, np.cumsum(np.where(finite, values, 0.0), axis=0)])
+        counts = np.vstack([zero, np.cumsum(finite, axis=0)])
+        stop = np.searchsorted(self._times, ends, side="right")
+        start = np.searchsorted(self._times, ends - self.window, side="right")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sums[stop] - sums[start]) / (counts[stop] - counts[start])
+
+    def _value(self, means, tag):
+        if isinstance(tag, str):
+            return means[:, self._column[tag]]
+        if tag is None:
+            return np.full(len(means), np.nan)
+        return np.full(len(means), float(tag))
+
+    def _changed(self, cp, ts, tt):
+        if self._solved is None:
+            return True
+        cp0, ts0, tt0 = self._solved
+        valid = np.isfinite(cp) & np.isfinite(ts) & np.isfinite(tt)
+        valid0 = np.isfinite(cp0) & np.isfinite(ts0) & np.isfinite(tt0)
+        if np.any(valid != valid0):
+            return True
+        return bool(
+            np.any(np.abs(cp - cp0)[valid] > self.cp_tolerance * np.abs(cp0)[valid])
+            or np.any(np.abs(ts - ts0)[valid] > self.t_tolerance)
+            or np.any(np.abs(tt - tt0)[valid] > self.t_tolerance)
+        )
+
+    def _solve(self, cp, ts, tt):
+        use = np.isfinite(cp) & np.isfinite(ts) & np.isfinite(tt) & (cp > 0)
+        use &= ts != tt
+        self._solved = (cp, ts, tt)
+        self.solves += 1
+        if not use.any():
+            self._targets = (np.nan, np.nan, np.nan)
+            return
+        result = SortedStreams(cp[use], ts[use], tt[use]).solve(self.tmin)
+        self._targets = (
+            result["hot_utility"],
+            result["cold_utility"],
+            result["pinch_temperature"],
+        )
+
+    def update(self, batch):
+        """
+        Add a batch of samples, ``{tag: ndarray}`` with epoch seconds under
+        ``timestamp``, in time order. Returns a record for every ``step``
+        boundary the samples have passed.
+        """
+        times = np.asarray(batch[self.timestamp], dtype=np.float64)
+        if not len(times):
+            return []
+        columns = [
+            (
+                np.asarray(batch[tag], dtype=np.float64)
+                if tag in batch
+                else np.full(len(times), np.nan)
+            )
+            for tag in self.tags
+        ]
+        self._times = np.concatenate([self._times, times])
+        self._values = np.vstack([self._values, np.column_stack(columns)])
+        self.samples += len(times)
+        if self._next is None:
+            self._next = (np.floor(times[0] / self.step) + 1) * self.step
+
+        # A boundary is complete once a later sample has arrived.
+        last = self._times[-1]
+        count = 0
+        if last > self._next:
+            count = int(np.ceil((last - self._next) / self.step))
+        ends = self._next + self.step * np.arange(count)
+        records = []
+        if count:
+            means = self._means(ends)
+            flow, ts, tt = (
+                np.column_stack([self._value(means, s[key]) for s in self.streams])
+                for key in ("flow", "ts", "tt")
+            )
+            cp = flow * self._specific_cp
+            hot = self._value(means, self._utility_tags[0])
+            cold = self._value(means, self._utility_tags[1])
+
+            for i, end in enumerate(ends):
+                resolved = self._changed(cp[i], ts[i], tt[i])
+                if resolved:
+                    self._solve(cp[i], ts[i], tt[i])
+                hot_target, cold_target, pinch = self._targets
+                records.append(
+                    {
+                        "timestamp": float(end),
+                        "hot_utility_target": float(hot_target),
+                        "cold_utility_target": float(cold_target),
+                        "pinch_temperature": float(pinch),
+                        "hot_utility_actual": float(hot[i]),
+                        "cold_utility_actual": float(cold[i]),
+                        "hot_utility_gap": float(hot[i] - hot_target),
+                        "cold_utility_gap": float(cold[i] - cold_target),
+                        "resolved": resolved,
+                    }
+                )
+            self._next = ends[-1] + self.step
+
+        # Keep only the samples the next window still needs
+        keep = self._times > self._next - self.window
+        self._times = self._times[keep]
+        self._values = self._values[keep]
+        return records
+
+    def run(self, batches):
+        """
+        Yield the records of every batch as it is processed.
+        """
+        for batch in batches:
+            yield from self.update(batch)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pinch-monitor",
+        description="Rolling pinch targets and utility gaps from tag samples.",
+    )
+    parser.add_argument("config", help="JSON configuration of streams and tags")
+    parser.add_argument("source", help="samples .csv or .parquet, or tcp://host:port")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    with open(args.config) as f:
+        monitor = RollingMonitor.from_config(json.load(f))
+    batches = open_source(args.source, monitor.timestamp, args.batch_size)
+    for record in monitor.run(batches):
+        # A utility without a tag or samples has no actual value or gap
+        record = {k: None if v != v else v for k, v in record.items()}
+        print(json.dumps(record), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+thermalysis_pinch.network
+
+Cross-pinch audit of an existing heat exchanger network.
+
+A network is a set of exchanger columns, one entry per exchanger:
+
+    {
+        "hot": [1, 2, "HU", ...],        # hot stream number, or "HU"
+        "cold": [3, "CU", 4, ...],       # cold stream number, or "CU"
+        "duty": [...],                   # kW
+        "hot_in": [...], "hot_out": [...],
+        "cold_in": [...], "cold_out": [...],
+    }
+
+Stream numbers are those of the ``streams`` table of
+``thermalysis_pinch.export.result_tables``; "HU" and "CU" are the hot and cold
+utility, whose own temperatures are not needed. Temperatures are actual, not
+shifted, and every exchanger is taken as counter-current with constant CP.
+
+``audit_network`` splits every duty at the pinch: heat passed from a hot
+stream above the pinch to a cold stream below it, cold utility used above the
+pinch and hot utility used below it. Each of these adds its amount to both
+the hot and the cold utility of the network, so their sum per exchanger is
+its energy penalty. Numeric columns may also be ``(cases, exchangers)``
+arrays, with the pinch, ΔTmin and targets given per case, to audit many
+operating cases of the same network at once.
+"""
+
+import numpy as np
+
+HOT_UTILITY = "HU"
+COLD_UTILITY = "CU"
+
+TEMPERATURES = ["hot_in", "hot_out", "cold_in", "cold_out"]
+
+
+def _fraction_above(t_in, t_out, at):
+    # Share of a linear profile from t_in to t_out lying above ``at``.
+    span = t_in - t_out
+    flat = span == 0
+    share = np.divide(
+        np.maximum(t_in, t_out) - at,
+        np.abs(span),
+        out=np.zeros(np.broadcast(span, at).shape),
+        where=~flat,
+    )
+    share = np.where(flat, t_in > at, share)
+    return np.clip(share, 0.0, 1.0)
+
+
+def network_columns(exchangers):
+    """
+    Exchanger columns from a list of ``{column: value}`` rows, such as the
+    row data of an exchanger grid.
+    """
+    names = ["hot", "cold", "duty"] + TEMPERATURES
+    columns = {name: [row.get(name) for row in exchangers] for name in names}
+    columns["name"] = [
+        row.get("name", "E{}".format(i + 1)) for i, row in enumerate(exchangers)
+    ]
+    return columns
+
+
+def _stream_ids(values, utility):
+    ids = np.asarray(values, dtype=object)
+    is_utility = ids == utility
+    numbers = np.zeros(ids.shape, dtype=np.int64)
+    numbers[~is_utility] = ids[~is_utility].astype(np.int64)
+    return numbers, is_utility
+
+
+def audit_network(
+    exchangers,
+    pinch_temperature,
+    tmin,
+    hot_utility=None,
+    cold_utility=None,
+    stream_types=None,
+):
+    """
+    Audit ``exchangers`` against a pinch at the shifted temperature
+    ``pinch_temperature`` found with ``tmin``.
+
+    Returns ``{name: ndarray}`` with per exchanger ``cross_pinch``,
+    ``hot_utility_below`` and ``cold_utility_above`` (all kW) and their sum
+    ``penalty``, and per case the ``*_total`` of each, the utilities the
+    network uses and, when the minimum ``hot_utility`` and ``cold_utility``
+    of the heat cascade are given, how far the network is above them.
+
+    ``stream_types`` (the ``type`` column of the streams table) is used to
+    check that every exchanger takes its heat from a hot stream and gives it
+    to a cold one.
+    """
+    hot, hot_is_utility = _stream_ids(exchangers["hot"], HOT_UTILITY)
+    cold, cold_is_utility = _stream_ids(exchangers["cold"], COLD_UTILITY)
+    if np.any(hot_is_utility & cold_is_utility):
+        raise ValueError("an exchanger cannot have utilities on both sides")
+    if np.any(hot[~hot_is_utility] < 1) or np.any(cold[~cold_is_utility] < 1):
+        raise ValueError("stream numbers start at 1")
+    if stream_types is not None:
+        types = np.asarray(stream_types, dtype=object)
+        if np.any(hot[~hot_is_utility] > len(types)) or np.any(
+            cold[~cold_is_utility] > len(types)
+        ):
+            raise ValueError("exchanger refers to an unknown stream")
+        if np.any(types[hot[~hot_is_utility] - 1] != "HOT"):
+            raise ValueError("the hot side of an exchanger must be a hot stream")
+        if np.any(types[cold[~cold_is_utility] - 1] != "COLD"):
+            raise ValueError("the cold side of an exchanger must be a cold stream")
+
+    duty = np.asarray(exchangers["duty"], dtype=np.float64)
+    if np.any(duty < 0):
+        raise ValueError("exchanger duties must not be negative")
+    hot_in, hot_out, cold_in, cold_out = (
+        np.asarray(exchangers[name], dtype=np.float64) for name in TEMPERATURES
+    )
+
+    # Pinch, ΔTmin and targets are scalars or one per case; align them with
+    # the case axis of the exchanger columns.
+    pinch = np.asarray(pinch_temperature, dtype=np.float64)
+    tmin = np.asarray(tmin, dtype=np.float64)
+    if duty.ndim > 1:
+        pinch = pinch[..., np.newaxis]
+        tmin = tmin[..., np.newaxis]
+    hot_pinch = pinch + tmin / 2
+    cold_pinch = pinch - tmin / 2
+
+    # Counter-current, so the hot end of the hot stream meets the hot end of
+    # the cold stream: with q measured from that end, the hot stream is above
+    # its pinch for q < hot_above and the cold stream below its pinch for
+    # q > duty - cold_below. Heat in the overlap crosses the pinch.
+    hot_above = duty * _fraction_above(hot_in, hot_out, hot_pinch)
+    cold_below = duty * (1.0 - _fraction_above(cold_out, cold_in, cold_pinch))
+    process = ~hot_is_utility & ~cold_is_utility
+    result = {
+        "cross_pinch": np.where(
+            process, np.maximum(hot_above + cold_below - duty, 0.0), 0.0
+        ),
+        "hot_utility_below": np.where(hot_is_utility, cold_below, 0.0),
+        "cold_utility_above": np.where(cold_is_utility, hot_above, 0.0),
+    }
+    result["penalty"] = (
+        result["cross_pinch"]
+        + result["hot_utility_below"]
+        + result["cold_utility_above"]
+    )
+    for name in ["cross_pinch", "hot_utility_below", "cold_utility_above", "penalty"]:
+        result[name + "_total"] = result[name].sum(axis=-1)
+
+    result["hot_utility_used"] = np.where(hot_is_utility, duty, 0.0).sum(axis=-1)
+    result["cold_utility_used"] = np.where(cold_is_utility, duty, 0.0).sum(axis=-1)
+    if hot_utility is not None:
+        result["hot_utility_excess"] = result["hot_utility_used"] - np.asarray(
+            hot_utility, dtype=np.float64
+        )
+    if cold_utility is not None:
+        result["cold_utility_excess"] = result["cold_utility_used"] - np.asarray(
+            cold_utility, dtype=np.float64
+        )
+    return result
+
+
+def audit_solution(exchangers, summary, stream_types=None):
+    """
+    ``audit_network`` against the targets of a solution summary, such as
+    ``pinch_output["summary"]`` or ``solution_summary(pinch)``.
+    """
+    return audit_network(
+        exchangers,
+        summary["pinch_temperature"],
+        summary["tmin"],
+        hot_utility=summary["hot_utility"],
+        cold_utility=summary["cold_utility"],
+        stream_types=stream_types,
+    )
@@ -1,12 +1,12 @@
+import logging
 import os
 import dash
-import pandas as pd
 from dash import Dash, Input, Output, State, dcc, html, dash_table
 from dash.exceptions import PreventUpdate
 from collections import namedtuple
 from typing import Final
 import math
-from PyPinch import PyPinch
+from thermalysis_pinch.jobs import SOLVE_STAGES, solve_with_progress
 
 # Assumed imports of custom components
 from agility.components import (
@@ -16,12 +16,25 @@ from agility.components import (
 )
 
 from thermalysis_pinch.config.main import STORE_ID
+from thermalysis_pinch.schemas.streams import describe_cell, validate_stream_table
+from thermalysis_pinch.solution import (
+    encode_solution,
+    input_key,
+    solve_options,
+    stream_input,
+    stream_rows,
+)
 
 dash.register_page(__name__)
 app: Dash = dash.get_app()
 
+logger = logging.getLogger(__name__)
+
 PAGE_TITLE = "Data Collection"
 
+# Invalid stream values listed below the inputs at most
+MAX_CELL_ERRORS = 20
+
 
 class PageIDs:
     def __init__(self) -> None:
@@ -39,7 +52,10 @@ class PageIDs:
         self.collect_data: Final[str] = f"{prefix}_collect_data"
         self.delta_t_min: Final[str] = f"{prefix}_dt_min"
         self.output_data: Final[str] = f"{prefix}_output_data"
-        self.run_pinch: Final[str] = f"{prefix}_run_pinch"
+        self.solve_key: Final[str] = f"{prefix}_solve_key"
+        self.cancel_pinch: Final[str] = f"{prefix}_cancel_pinch"
+        self.progress: Final[str] = f"{prefix}_progress"
+        self.progress_label: Final[str] = f"{prefix}_progress_label"
         self.cp: Final[str] = "cp"
         self.supply_temp: Final[str] = "supply-temp"
         self.target_temp: Final[str] = "target-temp"
@@ -85,9 +101,18 @@ layout = html.Div(
         html.Div(
             id=ids.save_confirmation, style={"margin-top": "20px", "color": "green"}
         ),
-        ButtonCustom(label="Run Pinch Analysis", id=ids.run_pinch).layout,
+        # Key of the stream data waiting to be solved
+        dcc.Store(id=ids.solve_key),
+        ButtonCustom(label="Cancel", id=ids.cancel_pinch).layout,
+        html.Div(
+            [
+                html.Progress(id=ids.progress, value="0", max=str(len(SOLVE_STAGES))),
+                html.Span(id=ids.progress_label, style={"margin-left": "10px"}),
+            ],
+            style={"margin-top": "10px"},
+        ),
         dcc.Loading(
-            id="loading", children=[html.Div(id="output_data")], type="default"
+            id="loading", children=[html.Div(id=ids.output_data)], type="default"
         ),
     ]
 )
@@ -155,11 +180,12 @@ def create_stream_inputs(n_clicks, num_streams):
     return None
 
 
-# Callback to collect and display data and save it as CSV
+# Callback to collect and display data and save it in the project store
 @app.callback(
     [
         Output(ids.output_table, "children"),
         Output(ids.save_confirmation, "children"),
+        Output(STORE_ID, "data", allow_duplicate=True),
     ],
     [Input(ids.collect_data, "n_clicks")],
     [
@@ -167,30 +193,37 @@ def create_stream_inputs(n_clicks, num_streams):
         State({"type": ids.cp, "index": dash.dependencies.ALL}, "value"),
         State({"type": ids.supply_temp, "index": dash.dependencies.ALL}, "value"),
         State({"type": ids.target_temp, "index": dash.dependencies.ALL}, "value"),
+        State(STORE_ID, "data"),
     ],
+    prevent_initial_call=True,
 )
-def display_table(n_clicks, delta_t_min, cps, supply_temps, target_temps):
+def display_table(n_clicks, delta_t_min, cps, supply_temps, target_temps, store):
     if n_clicks and n_clicks > 0:
+        table, cells = validate_stream_table(
+            tmin=delta_t_min, cp=cps, ts=supply_temps, tt=target_temps
+        )
+        if table is None:
+            return (
+                None,
+                html.Div(
+                    [html.P(describe_cell(cell)) for cell in cells[:MAX_CELL_ERRORS]],
+                    style={"color": "red"},
+                ),
+                dash.no_update,
+            )
+
         data = {
             "Heat Capacity (Cp)": cps,
             "Supply Temperature (°C)": supply_temps,
             "Target Temperature (°C)": target_temps,
         }
-        df = pd.DataFrame(data)
+        import pandas as pd
 
-        # Create the CSV structure
-        csv_data = [
-            ["Tmin", delta_t_min],
-            ["CP", "TSUPPLY", "TTARGET"],
-        ]
-        for i in range(len(cps)):
-            csv_data.append([cps[i], supply_temps[i], target_temps[i]])
+        df = pd.DataFrame(data)
 
-        # Save to CSV
-        file_path = os.path.join(os.getcwd(), "pinch_analysis_data.csv")
-        with open(file_path, mode="w", newline="") as file:
-            for row in csv_data:
-                file.write(",".join(map(str, row)) + "\n")
+        # Saving the streams triggers the solve below
+        store = store or {}
+        store["pinch_input"] = stream_input(table.tmin, table.cp, table.ts, table.tt)
 
         return (
             html.Div(
@@ -204,59 +237,85 @@ def display_table(n_clicks, delta_t_min, cps, supply_temps, target_temps):
                     ),
                 ]
             ),
-            f"Data successfully saved to {file_path}",
+            "Data successfully saved to the project.",
+            store,
         )
 
-    return None, None
-
-
-@app.callback(Output("output_data", "children"), [Input("run_pinch", "n_clicks")])
-def run_pinch_analysis(n_clicks):
-    csv_file_path = os.path.join(os.getcwd(), "pinch_analysis_data.csv")
-
-    if n_clicks and os.path.exists(csv_file_path):
-        try:
-            # Run the PyPinch analysis
-            options = {"draw"}
-            pinch = PyPinch(csv_file_path, options)
-            pinch.solve(options)  # Ensure that this runs without error
-
-            # Define paths for the generated images
-        #  image_files = [
-        #       "ShiftT.png",
-        # ]
-        #  images_divs = []
-
-        # Convert each image to base64 and create img tags
-        #  for image_file in image_files:
-        #       image_path = os.path.join(os.getcwd(), image_file)
-
-        #      if os.path.exists(image_path):
-        #         with open(image_path, "rb") as img_file:
-        #            image_base64 = base64.b64encode(img_file.read()).decode("utf-8")
-        #           images_divs.append(
-        #              html.Div(
-        #                 [
-        #                    # html.H3(image_file.split(".")[0].replace("_", " ")),
-        #                   html.Img(
-        #                      src=f"data:image/png;base64,{image_base64}",
-        #                     style={"width": "50%", "height": "auto"},
-        #                ),
-        #           ]
-        #      )
-        # )
-        #            else:
-        #               print(f"Image file not found: {image_path}")
-
-        #      if not images_divs:
-        #         return html.Div([html.H3("No images were generated.")])
-
-        #    return html.Div(images_divs)
-
-        except Exception as e:
-            print(traceback.format_exc())  # Print the traceback for debugging
-            return html.Div(
-                [html.H3("An error occurred while running PyPinch:"), html.P(str(e))]
-            )
+    return None, None, dash.no_update
+
 
-    return html.Div("No analysis run yet or missing input file.")
+# Queue a solve whenever the stream data in the store has no current solution
+@app.callback(
+    Output(ids.solve_key, "data"),
+    Input(STORE_ID, "data"),
+)
+def queue_solve(data):
+    if not data or "pinch_input" not in data:
+        raise PreventUpdate
+    key = input_key(data["pinch_input"])
+    if data.get("pinch_output", {}).get("key") == key:
+        raise PreventUpdate
+    return key
+
+
+# The one place the streams are solved. Runs as a background callback so
+# large problems do not block a server worker; progress is reported per solve
+# stage and the run can be cancelled. Every analysis page renders the result
+# from the store.
+@app.callback(
+    Output(ids.output_data, "children"),
+    Output(STORE_ID, "data", allow_duplicate=True),
+    Input(ids.solve_key, "data"),
+    State(STORE_ID, "data"),
+    background=True,
+    running=[
+        (Output(ids.cancel_pinch, "disabled"), False, True),
+    ],
+    cancel=[Input(ids.cancel_pinch, "n_clicks")],
+    progress=[
+        Output(ids.progress, "value"),
+        Output(ids.progress, "max"),
+        Output(ids.progress_label, "children"),
+    ],
+    prevent_initial_call=True,
+)
+def run_pinch_analysis(set_progress, key, data):
+    # The streams may have changed again while this run was queued
+    if not key or not data or input_key(data.get("pinch_input", {})) != key:
+        raise PreventUpdate
+
+    try:
+        from thermalysis_pinch.PyPinch import PyPinch
+
+        # Run the PyPinch analysis; no figures or files are written here
+        pinch = PyPinch(stream_rows(data["pinch_input"]), solve_options(data))
+        solve_with_progress(pinch, set_progress)
+        stages = str(len(SOLVE_STAGES))
+        set_progress((stages, stages, "Done"))
+
+        # Hand the solution over to the session store
+        data["pinch_output"] = encode_solution(pinch, key)
+        return (
+            html.Div(
+                html.Pre(
+                    "Pinch Temperature: {pinch_temperature} °C\n"
+                    "Minimum Hot Utility: {hot_utility} kW\n"
+                    "Minimum Cold Utility: {cold_utility} kW".format(
+                        **data["pinch_output"]["summary"]
+                    )
+                )
+            ),
+            data,
+        )
+
+    except Exception as e:
+        logger.exception("PyPinch analysis failed")
+        return (
+            html.Div(
+                [
+                    html.H3("An error occurred while running PyPinch:"),
+                    html.P(str(e)),
+                ]
+            ),
+            dash.no_update,
+        )
@@ -1,11 +1,7 @@
 import os
 import dash
-import pandas as pd
 from dash import Dash, Input, Output, State, dcc, html
 from dash.exceptions import PreventUpdate
-from dash_ag_grid.AgGrid import AgGrid
-from plotly import graph_objects as go
-import plotly.express as px
 from collections import namedtuple
 from typing import Final
 
@@ -20,13 +16,11 @@ from agility.components import (
 )
 
 from thermalysis_pinch.config.main import STORE_ID, PROJECT_NAME, PROJECT_SLUG
-from pinch.project import page1
 
 
 dash.register_page(__name__)
 app: Dash = dash.get_app()
 
-from typing import Final
 
 
 class PageIDs:
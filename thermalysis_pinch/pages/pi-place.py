@@ -0,0 +1,106 @@
+import os
+import dash
+from dash import Dash, Input, Output, dcc, html, dash_table
+from dash.exceptions import PreventUpdate
+from typing import Final
+
+from thermalysis_pinch.config.main import STORE_ID
+from thermalysis_pinch.figures import placement_figure
+from thermalysis_pinch.placement import rank_placements, scan_placements
+from thermalysis_pinch.solution import NOT_SOLVED, current_solution, decode_tables
+
+
+dash.register_page(__name__)
+app: Dash = dash.get_app()
+
+
+PAGE_TITLE = "Heat Pump and Heat Engine Placement"
+
+PLACEMENT_COLUMNS = {
+    "kind": "Device",
+    "source": "Source S (°C)",
+    "sink": "Sink S (°C)",
+    "sink_duty": "Heat to process (kW)",
+    "source_duty": "Heat from process (kW)",
+    "power": "Power (kW)",
+    "hot_saving": "Hot utility saved (kW)",
+    "cold_saving": "Cold utility saved (kW)",
+    "net_saving": "Net saving (kW)",
+}
+
+
+class PageIDs:
+    def __init__(self) -> None:
+        # Get the base name of the file where this instance is created
+        filename = os.path.basename(__file__)
+        # Remove the file extension to use only the file name as the prefix
+        prefix: Final[str] = filename.replace(".py", "")
+        self.prefix: Final[str] = prefix
+        self.status: Final[str] = f"{prefix}_status"
+        self.efficiency: Final[str] = f"{prefix}_efficiency"
+        self.output_data7: Final[str] = f"{prefix}_output_data7"
+
+
+ids = PageIDs()
+
+
+layout = html.Div(
+    [
+        html.H1("pinch", className="app-title"),
+        html.H2(PAGE_TITLE, className="page-title"),
+        html.Hr(),
+        html.Div(
+            "A heat pump saves energy when it takes heat from below the pinch and delivers it above the pinch; a heat engine saves energy when it runs entirely above or entirely below the pinch. The map shows the net utility saving, less the power consumed (or plus the power produced), of a device taking heat from the process at the source temperature and delivering heat to it at the sink temperature, sized as large as the Grand Composite Curve allows."
+        ),
+        html.Br(),
+        html.Label("Fraction of Carnot performance achieved"),
+        dcc.Slider(
+            id=ids.efficiency,
+            min=0.1,
+            max=1,
+            step=0.05,
+            value=0.5,
+            tooltip={"placement": "bottom", "always_visible": True},
+        ),
+        html.Div(id=ids.output_data7),
+    ]
+)
+
+
+@app.callback(
+    Output(ids.output_data7, "children"),
+    Input(STORE_ID, "data"),
+    Input(ids.efficiency, "value"),
+)
+def show_placement(data, efficiency):
+    solution = current_solution(data)
+    if solution is None:
+        return html.Div(NOT_SOLVED)
+    if not efficiency:
+        raise PreventUpdate
+
+    gcc = decode_tables(solution, ["grand_composite"])["grand_composite"]
+    pinch = solution["summary"]["pinch_temperature"]
+    scan = scan_placements(gcc["h"], gcc["t"], pinch, efficiency=efficiency)
+    records = [
+        {
+            name: round(value, 2) if isinstance(value, float) else value
+            for name, value in record.items()
+        }
+        for record in rank_placements(scan)
+    ]
+    return html.Div(
+        [
+            dcc.Graph(figure=placement_figure(scan, pinch)),
+            html.H3("Best placements"),
+            dash_table.DataTable(
+                data=records,
+                columns=[
+                    {"name": label, "id": name}
+                    for name, label in PLACEMENT_COLUMNS.items()
+                ],
+                style_table={"overflowX": "auto"},
+                style_cell={"textAlign": "center"},
+            ),
+        ]
+    )
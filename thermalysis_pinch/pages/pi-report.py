@@ -1,17 +1,15 @@
 import os
-import tempfile
+import json
+import time
+import uuid
 import dash
-import pandas as pd
 from dash import Dash, Input, Output, State, dcc, html, dash_table
 from dash.exceptions import PreventUpdate
-from dash_ag_grid import AgGrid
-from plotly import graph_objects as go
-import plotly.express as px
 from collections import namedtuple
 from typing import Final
 import traceback
 import math
-from flask import Flask, send_from_directory  # Import Flask
+from flask import Flask, Response, abort, stream_with_context  # Import Flask
 
 from agility.components import (
     ButtonCustom,
@@ -23,17 +21,21 @@ from agility.components import (
     ContainerCustom,
 )
 
-from thermalysis_pinch.config.main import STORE_ID
-from pinch.project import Project as PRJ
-from pinch.project.report import generate_report
-from pinch.schemas.page2 import Page2Input, generate_table_record
+from thermalysis_pinch.config.main import CACHE_DIR, STORE_ID
+from thermalysis_pinch.project import Project as PRJ
+from thermalysis_pinch.project.report import ReportCache, content_key, stream_report
+from thermalysis_pinch.solution import solve_options, stream_rows
 
-from typing import Final
 
 dash.register_page(__name__)
 app: Dash = dash.get_app()
 
 PAGE_TITLE = "Report"
+REPORT_JOB_DIR = os.path.join(CACHE_DIR, "report-jobs")
+# Download links stop working once their job is this old (seconds)
+REPORT_JOB_TTL = 24 * 3600
+
+report_cache = ReportCache()
 
 
 class PageIDs:
@@ -112,6 +114,8 @@ def display_input(data):
     for step in steps_column:
         status_column.append(progress_levels[progress_dict[step]])
 
+    import pandas as pd
+
     df = pd.DataFrame({"Step": steps_column, "Status": status_column})
 
     progress_layout = html.Div(
@@ -158,8 +162,7 @@ def display_input(data):
 def show_run_button(data):
     if not data:
         return None
-    progress_dict = PRJ.get_progress(data)
-    if progress_dict["Page One"] == 2 and progress_dict["Page Two"] == 2:
+    if "pinch_input" in data:
         return html.Button(
             "Generate Report",
             id=ids.run_btn,
@@ -167,7 +170,18 @@ def show_run_button(data):
         )
 
 
-# callback to run the report generation and save the zipped folder in the store
+def _expire_jobs(now=None):
+    # Delete report jobs older than REPORT_JOB_TTL, including stray .tmp files
+    now = time.time() if now is None else now
+    for entry in os.scandir(REPORT_JOB_DIR):
+        try:
+            if now - entry.stat().st_mtime > REPORT_JOB_TTL:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # removed by another worker
+
+
+# callback to prepare the report; the zip itself is built while it downloads
 @app.callback(
     Output(ids.report_download, "children"),
     Output(ids.feedback_run, "children"),
@@ -180,14 +194,24 @@ def report_run(n_clicks, data):
     if n_clicks is None:
         raise PreventUpdate
 
-    memory_output = generate_report(data)
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as tmp:
-        tmp.write(memory_output.getvalue())
-        tmp_path = tmp.name
+    token = uuid.uuid4().hex
+    # Any worker may serve the download, so the job goes to the shared
+    # cache directory; the rename makes it visible only once complete.
+    os.makedirs(REPORT_JOB_DIR, exist_ok=True)
+    _expire_jobs()
+    job_path = os.path.join(REPORT_JOB_DIR, f"{token}.json")
+    with open(job_path + ".tmp", "w") as f:
+        job = {
+            "data": {"meta_input": data.get("meta_input", {})},
+            "streams": stream_rows(data["pinch_input"]),
+            "options": solve_options(data),
+        }
+        json.dump(job, f)
+    os.replace(job_path + ".tmp", job_path)
 
     report_link = html.A(
         "Click to Download Report",
-        href=f"/pinch/download/{os.path.basename(tmp_path)}",
+        href=f"/pinch/report/{token}.zip",
         target="_blank",
         style={"color": "blue", "textDecoration": "underline"},
     )
@@ -200,8 +224,30 @@ def report_run(n_clicks, data):
     return report_link, msg.layout, data
 
 
-# Serve the file from the temporary directory
-@app.server.route("/pinch/download/<filename>")
-def serve_file(filename):
-    directory = tempfile.gettempdir()
-    return send_from_directory(directory, filename, as_attachment=True)
+# Stream the report zip as it is built, artifact by artifact
+@app.server.route("/pinch/report/<token>.zip")
+def serve_report(token):
+    if not token.isalnum():
+        abort(404)
+    job_path = os.path.join(REPORT_JOB_DIR, f"{token}.json")
+    if not os.path.exists(job_path):
+        abort(404)
+    with open(job_path) as f:
+        job = json.load(f)
+
+    def solve():
+        from thermalysis_pinch.PyPinch import PyPinch
+
+        pinch = PyPinch(job["streams"], job["options"])
+        pinch.solve()
+        return pinch
+
+    # Artifacts whose inputs are unchanged since an earlier download are
+    # reused from the cache; the solve only runs if something is rebuilt.
+    solution_key = content_key(job["streams"], job["options"])
+    report = stream_report(job["data"], solve, report_cache, solution_key=solution_key)
+    return Response(
+        stream_with_context(report),
+        mimetype="application/zip",
+        headers={"Content-Disposition": "attachment; filename=report.zip"},
+    )
@@ -1,17 +1,9 @@
 import os
 import dash
-import pandas as pd
 from dash import Dash, Input, Output, State, dcc, html
 from dash.exceptions import PreventUpdate
-from dash_ag_grid.AgGrid import AgGrid
 from collections import namedtuple
 from typing import Final
-from PyPinch import PyPinch
-from io import BytesIO
-import matplotlib.pyplot as plt
-import base64
-
-import traceback
 import math
 
 from agility.components import (
@@ -25,10 +17,15 @@ from agility.components import (
 )
 
 from thermalysis_pinch.config.main import STORE_ID
-from pinch.project import page2
-from pinch.schemas.page2 import Page2Input, generate_table_record
+from thermalysis_pinch.figures import composite_figure, figure_patch
+from thermalysis_pinch.solution import (
+    NOT_SOLVED,
+    current_solution,
+    decode_tables,
+    format_targets,
+    sorted_streams,
+)
 
-from typing import Final
 
 dash.register_page(__name__)
 app: Dash = dash.get_app()
@@ -46,7 +43,10 @@ class PageIDs:
         self.prefix: Final[str] = prefix
         self.status: Final[str] = f"{prefix}_status"
         self.output_data5: Final[str] = f"{prefix}_output_data5"
-        self.run_pinch5: Final[str] = f"{prefix}_run_pinch5"
+        self.tmin: Final[str] = f"{prefix}_tmin"
+        self.streams: Final[str] = f"{prefix}_streams"
+        self.targets: Final[str] = f"{prefix}_targets"
+        self.graph: Final[str] = f"{prefix}_graph"
 
 
 ids = PageIDs()
@@ -61,63 +61,57 @@ layout = html.Div(
             "Based on the Shifted Composite diagram, the Actual Temperature-Enthalpy Composite Diagram can be constructed: the hot streams have their temperatures shifted up by \u0394Tₘᵢₙ/2 and the cold streams have their temperatures shifted down by \u0394Tₘᵢₙ/2. "
         ),
         # html.Div(id="pinch_results", style={"margin-top": "20px"}),
-        ButtonCustom(
-            label="Show The Temperature Interval Diagram", id="run_pinch5"
-        ).layout,
-        dcc.Loading(
-            id="loading", children=[html.Div(id="output_data5")], type="default"
-        ),
+        # Rendered from the store; no loading spinner so the ΔTmin slider
+        # can redraw the figure while it is dragged.
+        html.Div(id=ids.output_data5),
     ]
 )
 
 
-@app.callback(Output("output_data5", "children"), [Input("run_pinch5", "n_clicks")])
-def run_pinch_analysis(n_clicks):
-    csv_file_path = os.path.join(os.getcwd(), "pinch_analysis_data.csv")
-
-    if n_clicks and os.path.exists(csv_file_path):
-        try:
-            # Run the PyPinch analysis
-            #  options = {"draw"}
-            # pinch = PyPinch(csv_file_path, options)
-            # pinch.solve(options)  # Ensure that this runs without error
-
-            # Define paths for the generated images
-            image_files = [
-                "CompositeDiagram.png",
-            ]
-            images_divs = []
-
-            # Convert each image to base64 and create img tags
-            for image_file in image_files:
-                image_path = os.path.join(os.getcwd(), image_file)
-
-                if os.path.exists(image_path):
-                    with open(image_path, "rb") as img_file:
-                        image_base68 = base64.b64encode(img_file.read()).decode("utf-8")
-                        images_divs.append(
-                            html.Div(
-                                [
-                                    # html.H3(image_file.split(".")[0].replace("_", " ")),
-                                    html.Img(
-                                        src=f"data:image/png;base64,{image_base68}",
-                                        style={"width": "50%", "height": "auto"},
-                                    ),
-                                ]
-                            )
-                        )
-                else:
-                    print(f"Image file not found: {image_path}")
-
-            if not images_divs:
-                return html.Div([html.H3("No images were generated.")])
-
-            return html.Div(images_divs)
-
-        except Exception as e:
-            print(traceback.format_exc())  # Print the traceback for debugging
-            return html.Div(
-                [html.H3("An error occurred while running PyPinch:"), html.P(str(e))]
-            )
-
-    return html.Div("No analysis run yet or missing input file.")
+@app.callback(Output(ids.output_data5, "children"), [Input(STORE_ID, "data")])
+def show_composite(data):
+    solution = current_solution(data)
+    if solution is None:
+        return html.Div(NOT_SOLVED)
+
+    tables = decode_tables(solution, ["summary", "composite", "shifted_composite"])
+    tmin = data["pinch_input"]["tmin"]
+    return html.Div(
+        [
+            html.Label("\u0394Tmin (°C)"),
+            dcc.Slider(
+                id=ids.tmin,
+                min=0,
+                max=max(50, 4 * tmin),
+                step=0.5,
+                value=tmin,
+                updatemode="drag",
+                tooltip={"placement": "bottom", "always_visible": True},
+            ),
+            # The streams travel with the slider so any worker can re-target
+            dcc.Store(
+                id=ids.streams,
+                data={"input": data["pinch_input"]},
+            ),
+            html.Pre(format_targets(solution["summary"]), id=ids.targets),
+            dcc.Graph(id=ids.graph, figure=composite_figure(tables)),
+        ]
+    )
+
+
+# Re-target at the slider's ΔTmin from the cached sorted stream temperatures
+# and patch only the traces and shapes of the figure.
+@app.callback(
+    Output(ids.graph, "figure"),
+    Output(ids.targets, "children"),
+    Input(ids.tmin, "value"),
+    State(ids.streams, "data"),
+    prevent_initial_call=True,
+)
+def update_tmin(tmin, streams):
+    if tmin is None or not streams:
+        raise PreventUpdate
+
+    tables = sorted_streams(streams["input"]).tables(tmin)
+    summary = {name: values[0] for name, values in tables["summary"].items()}
+    return figure_patch(composite_figure(tables)), format_targets(summary)
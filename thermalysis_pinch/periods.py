@@ -0,0 +1,251 @@
+"""
+thermalysis_pinch.periods
+
+Multi-period targeting: one plant, several operating periods (summer, winter,
+turndown, ...), each with its own stream data.
+
+    python -m thermalysis_pinch.periods summer.csv winter.csv turndown.csv \\
+        --durations 4000 3760 1000 --output periods.json
+
+Every period is a ``pinch_input`` (``{"tmin", "cp", "ts", "tt"}``). Periods
+with identical stream data are solved once and share the result. For each
+period ``solve_periods`` reports the targets and the shift of the pinch from
+the reference period, compares every stream with the same stream of the
+reference period, and summarises the per-period targets over all periods:
+their maximum, duration-weighted mean and annual energy.
+
+Each period is targeted on its own in the summary, as if it had a network of
+its own. The ``combined`` target is for one network serving every period,
+using the time-average model: the streams of all periods are solved once,
+each with its CP weighted by the share of the year its period runs, at the
+largest ΔTmin of the periods. It is the target of that network with heat
+recovery between periods allowed (as through heat storage), so it is
+optimistic when heat cannot be carried over from one period to another.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from thermalysis_pinch.kernels import SortedStreams
+from thermalysis_pinch.solution import input_key, stream_input
+
+TARGETS = ["tmin", "hot_utility", "cold_utility", "pinch_temperature"]
+COMBINED_MODEL = "time-average"
+
+
+def read_period(path):
+    """
+    ``pinch_input`` of a streams data file.
+    """
+    from thermalysis_pinch.PyPinch import Streams
+
+    streams = Streams(path)
+    data = streams.streamsData
+    return stream_input(
+        streams.tmin,
+        [s["cp"] for s in data],
+        [s["ts"] for s in data],
+        [s["tt"] for s in data],
+    )
+
+
+def _stream_differences(names, periods, reference):
+    # One row per period and stream number, against the reference period.
+    base = periods[reference]
+    rows = {name: [] for name in ["period", "stream", "status", "d_cp", "d_ts", "d_tt"]}
+    for name in names:
+        current = periods[name]
+        count = max(len(current["cp"]), len(base["cp"]))
+        for i in range(count):
+            if i >= len(current["cp"]):
+                status, deltas = "removed", [np.nan] * 3
+            elif i >= len(base["cp"]):
+                status, deltas = "added", [np.nan] * 3
+            else:
+                deltas = [current[c][i] - base[c][i] for c in ("cp", "ts", "tt")]
+                status = "changed" if any(deltas) else "same"
+            rows["period"].append(name)
+            rows["stream"].append(i + 1)
+            rows["status"].append(status)
+            for column, delta in zip(("d_cp", "d_ts", "d_tt"), deltas):
+                rows[column].append(delta)
+
+    return {
+        "period": np.array(rows["period"], dtype=object),
+        "stream": np.array(rows["stream"], dtype=np.int64),
+        "status": np.array(rows["status"], dtype=object),
+        "d_cp": np.array(rows["d_cp"], dtype=np.float64),
+        "d_ts": np.array(rows["d_ts"], dtype=np.float64),
+        "d_tt": np.array(rows["d_tt"], dtype=np.float64),
+    }
+
+
+def solve_periods(periods, durations=None, reference=None):
+    """
+    Target every period of ``{name: pinch_input}``.
+
+    ``durations`` (hours, one per period, default equal) weight the average
+    utilities; ``reference`` names the period pinch shifts and stream
+    differences are measured from (default the first).
+
+    Returns ``{"periods": columns, "streams": columns, "summary": dict,
+    "combined": dict}``: the targets of every period with ``pinch_shift`` and
+    ``shared_with`` (the first period with the same stream data), the stream
+    differences, statistics of the per-period utility targets, and the
+    time-average target of one network serving all periods (see the module
+    docstring).
+    """
+    names = list(periods)
+    if not names:
+        raise ValueError("No periods given")
+    reference = names[0] if reference is None else reference
+    if reference not in periods:
+        raise ValueError("Unknown reference period {!r}".format(reference))
+    durations = np.ones(len(names)) if durations is None else durations
+    durations = np.asarray(durations, dtype=np.float64)
+    if (
+        durations.shape != (len(names),)
+        or np.any(durations < 0)
+        or not durations.sum() > 0
+    ):
+        raise ValueError("Give one non-negative duration per period, not all 0")
+
+    # Identical stream sets are solved once
+    solved = {}
+    first = {}
+    keys = []
+    for name in names:
+        key = input_key(periods[name])
+        keys.append(key)
+        if key not in solved:
+            period = periods[name]
+            streams = SortedStreams(period["cp"], period["ts"], period["tt"])
+            solved[key] = streams.solve(period["tmin"])
+            first[key] = name
+
+    table = {
+        "period": np.array(names, dtype=object),
+        "duration": durations,
+        "shared_with": np.array([first[key] for key in keys], dtype=object),
+    }
+    for target in TARGETS:
+        table[target] = np.array([solved[key][target] for key in keys])
+    pinch = table["pinch_temperature"]
+    table["pinch_shift"] = pinch - pinch[names.index(reference)]
+
+    weights = durations / durations.sum()
+    summary = {
+        "periods": len(names),
+        "solved": len(solved),
+        "hot_utility_max": float(table["hot_utility"].max()),
+        "cold_utility_max": float(table["cold_utility"].max()),
+        "hot_utility_weighted_mean": float(weights @ table["hot_utility"]),
+        "cold_utility_weighted_mean": float(weights @ table["cold_utility"]),
+        "hot_utility_energy": float(durations @ table["hot_utility"]),
+        "cold_utility_energy": float(durations @ table["cold_utility"]),
+        "pinch_range": [float(pinch.min()), float(pinch.max())],
+    }
+    combined = _time_average_target([periods[name] for name in names], weights)
+    combined["hot_utility_energy"] = combined["hot_utility"] * durations.sum()
+    combined["cold_utility_energy"] = combined["cold_utility"] * durations.sum()
+    return {
+        "periods": table,
+        "streams": _stream_differences(names, periods, reference),
+        "summary": summary,
+        "combined": combined,
+    }
+
+
+def _time_average_target(periods, weights):
+    # Every stream of every period, its CP scaled by the period's weight: the
+    # composite curves are the duration-weighted average of the periods'.
+    cp, ts, tt = [], [], []
+    for period, weight in zip(periods, weights):
+        if weight > 0:
+            cp.extend(weight * np.asarray(period["cp"], dtype=np.float64))
+            ts.extend(period["ts"])
+            tt.extend(period["tt"])
+    tmin = max(period["tmin"] for period in periods)
+    result = SortedStreams(cp, ts, tt).solve(tmin)
+    combined = {"model": COMBINED_MODEL}
+    combined.update((target, float(result[target])) for target in TARGETS)
+    return combined
+
+
+def _json_columns(columns):
+    # NaN (no such stream in a period) is written as null
+    return {
+        name: [None if v != v else v for v in values.tolist()]
+        for name, values in columns.items()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pinch-periods",
+        description="Target several operating periods of one plant.",
+    )
+    parser.add_argument("inputs", nargs="+", help="one streams CSV per period")
+    parser.add_argument(
+        "--durations", nargs="+", type=float, help="hours per period (default equal)"
+    )
+    parser.add_argument("--reference", help="reference period (default: the first)")
+    parser.add_argument("--output", "-o", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    # Periods are named after their files, so the file names must differ
+    periods = {}
+    paths = {}
+    for path in args.inputs:
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in paths:
+            parser.error(
+                "{} and {} both give period {!r}; rename one of them".format(
+                    paths[name], path, name
+                )
+            )
+        paths[name] = path
+        periods[name] = read_period(path)
+    result = solve_periods(periods, args.durations, args.reference)
+
+    table = result["periods"]
+    for i, name in enumerate(table["period"]):
+        shared = table["shared_with"][i]
+        print(
+            "{:<16} hot {:>12.6g} kW  cold {:>12.6g} kW  pinch {:>8.6g} °C "
+            "({:+.6g})  {}".format(
+                name,
+                table["hot_utility"][i],
+                table["cold_utility"][i],
+                table["pinch_temperature"][i],
+                table["pinch_shift"][i],
+                "" if shared == name else "same streams as " + shared,
+            )
+        )
+    print(json.dumps(result["summary"], indent=2))
+    print(
+        "combined ({model}): hot {hot_utility:.6g} kW  cold {cold_utility:.6g} kW  "
+        "pinch {pinch_temperature:.6g} °C".format(**result["combined"])
+    )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "periods": _json_columns(table),
+                    "streams": _json_columns(result["streams"]),
+                    "summary": result["summary"],
+                    "combined": result["combined"],
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
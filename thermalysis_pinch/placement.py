@@ -0,0 +1,212 @@
+"""
+thermalysis_pinch.placement
+
+Heat pump and heat engine placement against the grand composite curve.
+
+A device takes heat from the process at a source temperature and gives heat
+to the process at a sink temperature, both shifted temperatures on the GCC.
+With the sink hotter than the source it is a heat pump and consumes power;
+with the source hotter it is a heat engine and produces power. Either way,
+the utilities change by the usual rules of appropriate placement: heat given
+to the process above the pinch saves hot utility and below it adds cold
+utility; heat taken from the process below the pinch saves cold utility and
+above it adds hot utility. So a heat pump pays off across the pinch, and a
+heat engine above or below it.
+
+How much heat can be given or taken at a temperature without breaking the
+heat cascade is the smallest GCC heat flow between that temperature and the
+pinch side of it: above the pinch the minimum over all hotter levels, below
+the pinch over all colder levels. Pockets of the GCC therefore limit the
+duty as they should.
+
+``scan_placements`` evaluates every pair of a source and a sink temperature
+grid in one pass and caches the result per GCC, so a 200×200 map is only
+computed once per worker.
+"""
+
+import hashlib
+import threading
+
+import numpy as np
+
+from thermalysis_pinch.curves import Curve
+
+KELVIN = 273.15
+
+# Per-worker cache of placement scans, keyed by the GCC and scan settings
+SCAN_CACHE_SIZE = 16
+_scans = {}
+# Threads of one worker share the cache; evicting is check-then-pop
+_scans_lock = threading.Lock()
+
+RESULTS = [
+    "sink_duty",
+    "source_duty",
+    "power",
+    "hot_saving",
+    "cold_saving",
+    "net_saving",
+]
+
+
+def heat_limits(h, t, temperatures, pinch_temperature):
+    """
+    Return ``(sink_limit, source_limit)`` at ``temperatures``: the most heat
+    that can be given to the process there (above the pinch) and taken from
+    it (below the pinch) without breaking the cascade. Zero on the other side
+    of the pinch and outside the GCC.
+    """
+    h = np.asarray(h, dtype=np.float64)
+    t = np.asarray(t, dtype=np.float64)
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+
+    order = np.argsort(t, kind="stable")
+    t_up, h_up = t[order], h[order]
+    at = np.nan_to_num(Curve(h, t).enthalpy(temperatures, highest=False))
+
+    # Minimum heat flow over all vertices at or above / at or below each query
+    above = np.minimum.accumulate(h_up[::-1])[::-1]
+    below = np.minimum.accumulate(h_up)
+    i = np.searchsorted(t_up, temperatures, side="left")
+    j = np.searchsorted(t_up, temperatures, side="right") - 1
+    sink = np.minimum(at, above[np.minimum(i, len(h) - 1)])
+    source = np.minimum(at, below[np.maximum(j, 0)])
+    sink = np.where((temperatures >= pinch_temperature) & (i < len(h)), sink, 0.0)
+    source = np.where((temperatures <= pinch_temperature) & (j >= 0), source, 0.0)
+    return np.maximum(sink, 0.0), np.maximum(source, 0.0)
+
+
+def placement_grid(
+    h,
+    t,
+    pinch_temperature,
+    sources,
+    sinks,
+    efficiency=0.5,
+    power_weight=1.0,
+):
+    """
+    Evaluate a device at every ``(source, sink)`` pair of the two temperature
+    grids (°C, shifted).
+
+    ``efficiency`` is the fraction of the Carnot COP of a heat pump, or of
+    the Carnot efficiency of a heat engine, that is achieved. The device duty
+    is the largest the GCC allows on whichever side saves utility. Returns
+    ``{name: (sources, sinks) ndarray}`` with ``sink_duty``, ``source_duty``,
+    ``power`` (kW, consumed if positive), ``hot_saving``, ``cold_saving`` and
+    ``net_saving`` (both savings less ``power_weight`` times the power), plus
+    the ``sources`` and ``sinks`` grids.
+    """
+    sources = np.asarray(sources, dtype=np.float64)
+    sinks = np.asarray(sinks, dtype=np.float64)
+    sink_limit, _ = heat_limits(h, t, sinks, pinch_temperature)
+    _, source_limit = heat_limits(h, t, sources, pinch_temperature)
+
+    hot = sources[:, np.newaxis] + KELVIN
+    cold = sinks[np.newaxis, :] + KELVIN
+    pump = cold > hot
+    engine = hot > cold
+
+    # Heat taken at the source per unit of heat given at the sink: 1 - 1/COP
+    # for a heat pump, 1 / (1 - eta) for a heat engine of efficiency eta.
+    lift = np.abs(cold - hot)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cop = efficiency * cold / lift
+        eta = efficiency * lift / hot
+        ratio = np.where(
+            pump, 1.0 - 1.0 / cop, np.where(engine, 1.0 / (1.0 - eta), 1.0)
+        )
+    ratio = np.where(np.isfinite(ratio) & (ratio > 0), ratio, 0.0)
+
+    # The duty is set by whichever side saves utility; a pair where neither
+    # does has no useful duty.
+    sink_above = sinks[np.newaxis, :] > pinch_temperature
+    source_below = sources[:, np.newaxis] < pinch_temperature
+    cap = np.minimum(
+        np.where(sink_above, sink_limit[np.newaxis, :], np.inf),
+        np.where(
+            source_below & (ratio > 0),
+            np.divide(
+                source_limit[:, np.newaxis],
+                ratio,
+                out=np.full(ratio.shape, np.inf),
+                where=ratio > 0,
+            ),
+            np.inf,
+        ),
+    )
+    sink_duty = np.where((pump | engine) & np.isfinite(cap), cap, 0.0)
+    source_duty = ratio * sink_duty
+    power = sink_duty - source_duty
+
+    hot_saving = np.where(sink_above, sink_duty, 0.0) - np.where(
+        source_below, 0.0, source_duty
+    )
+    cold_saving = np.where(source_below, source_duty, 0.0) - np.where(
+        sink_above, 0.0, sink_duty
+    )
+    return {
+        "sources": sources,
+        "sinks": sinks,
+        "sink_duty": sink_duty,
+        "source_duty": source_duty,
+        "power": power,
+        "hot_saving": hot_saving,
+        "cold_saving": cold_saving,
+        "net_saving": hot_saving + cold_saving - power_weight * power,
+    }
+
+
+def scan_placements(
+    h,
+    t,
+    pinch_temperature,
+    size=200,
+    efficiency=0.5,
+    power_weight=1.0,
+):
+    """
+    ``placement_grid`` over ``size`` source and ``size`` sink temperatures
+    spanning the GCC, cached per worker by the GCC and settings. The arrays
+    are shared between callers and must not be modified.
+    """
+    h = np.ascontiguousarray(h, dtype=np.float64)
+    t = np.ascontiguousarray(t, dtype=np.float64)
+    digest = hashlib.sha256(h.tobytes())
+    digest.update(t.tobytes())
+    digest.update(repr((pinch_temperature, size, efficiency, power_weight)).encode())
+    key = digest.hexdigest()
+
+    scan = _scans.get(key)
+    if scan is None:
+        grid = np.linspace(t.min(), t.max(), size) if len(t) else np.empty(0)
+        scan = placement_grid(
+            h, t, pinch_temperature, grid, grid, efficiency, power_weight
+        )
+        with _scans_lock:
+            if key not in _scans and len(_scans) >= SCAN_CACHE_SIZE:
+                _scans.pop(next(iter(_scans)))
+            _scans[key] = scan
+    return scan
+
+
+def rank_placements(scan, top=10):
+    """
+    The ``top`` placements of a scan by net saving, best first, as records.
+    """
+    net = scan["net_saving"]
+    count = min(top, net.size)
+    best = np.argpartition(-net.ravel(), count - 1)[:count] if count else []
+    best = sorted(best, key=lambda index: -net.ravel()[index])
+    records = []
+    for index in best:
+        i, j = np.unravel_index(index, net.shape)
+        source, sink = float(scan["sources"][i]), float(scan["sinks"][j])
+        record = {
+            "kind": "heat pump" if sink > source else "heat engine",
+            "source": source,
+            "sink": sink,
+        }
+        record.update({name: float(scan[name][i, j]) for name in RESULTS})
+        records.append(record)
+    return records
@@ -0,0 +1,171 @@
+"""
+Versioned binary project files.
+
+A project file is a compressed NumPy ``.npz`` archive holding
+
+- ``header``: format name and version,
+- ``store``: the project store dict (meta, page inputs and outputs) as JSON,
+- ``streams/*``: ΔTmin and the CP, supply and target temperature columns,
+- ``options``: the ``PyPinch`` solve options of the results, as JSON,
+- ``results/<table>/<column>``: the solved tables from
+  ``thermalysis_pinch.export.result_tables``,
+- ``figures/<name>``: rendered figures (e.g. PNG bytes).
+
+Members are only decompressed when accessed, so opening a saved project reads
+the results and figures back without solving or rendering again.
+"""
+
+import json
+
+import numpy as np
+
+FORMAT_NAME = "thermalysis-pinch-project"
+FORMAT_VERSION = 1
+
+
+def _bytes_array(raw):
+    return np.frombuffer(raw, dtype=np.uint8)
+
+
+def _json_array(value):
+    return _bytes_array(json.dumps(value).encode("utf-8"))
+
+
+def _read_json(array):
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def _stream_columns(pinch):
+    streams = pinch.streams.streamsData
+    return {
+        "tmin": np.array([pinch.tmin], dtype=np.float64),
+        "cp": np.array([s["cp"] for s in streams], dtype=np.float64),
+        "ts": np.array([s["ts"] for s in streams], dtype=np.float64),
+        "tt": np.array([s["tt"] for s in streams], dtype=np.float64),
+    }
+
+
+def save_project(path, data=None, pinch=None, figures=None):
+    """
+    Write the project store, the streams and results of a solved ``pinch``
+    and any rendered ``figures`` ({name: bytes}) to ``path``.
+    """
+    from thermalysis_pinch.export import result_tables
+    from thermalysis_pinch.solution import SOLVE_OPTIONS
+
+    members = {
+        "header": _json_array({"format": FORMAT_NAME, "version": FORMAT_VERSION}),
+        "store": _json_array(data or {}),
+    }
+
+    if pinch is not None:
+        # Only the options that shape the results; PyPinch treats the mere
+        # presence of "debug", "draw", ... as switching them on.
+        options = {name: pinch._options[name] for name in SOLVE_OPTIONS}
+        members["options"] = _json_array(options)
+        for column, values in _stream_columns(pinch).items():
+            members["streams/" + column] = values
+        for table, columns in result_tables(pinch).items():
+            for column, values in columns.items():
+                if values.dtype == object:
+                    values = values.astype(str)
+                members["results/{}/{}".format(table, column)] = values
+
+    for name, raw in (figures or {}).items():
+        members["figures/" + name] = _bytes_array(raw)
+
+    with open(path, "wb") as f:
+        np.savez_compressed(f, **members)
+
+
+class ProjectArchive:
+    """
+    An opened project file. Arrays are read from the archive on first access.
+    """
+
+    def __init__(self, path):
+        self._npz = np.load(path, allow_pickle=False)
+        names = self._npz.files
+        if "header" not in names:
+            self._npz.close()
+            raise ValueError("{} is not a pinch project file".format(path))
+
+        self.header = _read_json(self._npz["header"])
+        if (
+            self.header.get("format") != FORMAT_NAME
+            or self.header.get("version", 0) > FORMAT_VERSION
+        ):
+            self._npz.close()
+            raise ValueError(
+                "Unsupported project file {} (format {!r}, version {!r})".format(
+                    path, self.header.get("format"), self.header.get("version")
+                )
+            )
+
+        self._names = names
+        self._store = None
+
+    def _group(self, prefix):
+        return [name[len(prefix) :] for name in self._names if name.startswith(prefix)]
+
+    @property
+    def data(self):
+        """The project store dict."""
+        if self._store is None:
+            self._store = _read_json(self._npz["store"])
+        return self._store
+
+    @property
+    def has_results(self):
+        return any(name.startswith("results/") for name in self._names)
+
+    def options(self):
+        """
+        The ``PyPinch`` options the stored results were solved with; ``{}``
+        (the defaults) for files saved without them.
+        """
+        if "options" not in self._names:
+            return {}
+        return _read_json(self._npz["options"])
+
+    def streams(self):
+        """``{"tmin", "cp", "ts", "tt": ndarray}`` or ``None``."""
+        columns = self._group("streams/")
+        if not columns:
+            return None
+        return {column: self._npz["streams/" + column] for column in columns}
+
+    def table(self, name):
+        """One results table as ``{column: ndarray}``."""
+        prefix = "results/{}/".format(name)
+        columns = self._group(prefix)
+        if not columns:
+            raise KeyError(name)
+        return {column: self._npz[prefix + column] for column in columns}
+
+    def tables(self):
+        names = {column.split("/", 1)[0] for column in self._group("results/")}
+        return {name: self.table(name) for name in sorted(names)}
+
+    def figure_names(self):
+        return self._group("figures/")
+
+    def figure(self, name):
+        """The raw bytes of a stored figure."""
+        return self._npz["figures/" + name].tobytes()
+
+    def close(self):
+        self._npz.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_project(path):
+    """
+    Open a project file written by ``save_project``.
+    """
+    return ProjectArchive(path)
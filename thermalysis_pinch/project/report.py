@@ -1,78 +1,383 @@
-import tempfile
-import os
+"""functions for building the project report zip."""
+
 import csv
+import hashlib
 import io
+import json
+import os
+import tempfile
 import zipfile
-import pandas as pd
-from pinch.project import page1
-from pinch.project import page2
-
-
-def generate_report(data):
-    files = []
-    with tempfile.TemporaryDirectory() as tempdir:
-        # Create a temporary directory to store the files
-        # Generate the report files
-
-        # save project info as csv file in the tempdir
-        meta_input = data.get("meta_input", {})
-        meta_input_path = os.path.join(tempdir, "meta_input.csv")
-        with open(meta_input_path, "w") as f:
-            w = csv.DictWriter(f, meta_input.keys())
-            w.writeheader()
-            w.writerow(meta_input)
-
-        # save page1_input as csv file in the tempdir
-        page1_input = data.get("page1_input", {})
-        page1_input_path = os.path.join(tempdir, "page1_input.csv")
-        with open(page1_input_path, "w") as f:
-            w = csv.DictWriter(f, page1_input.keys())
-            w.writeheader()
-            w.writerow(page1_input)
-
-        # save page2_input as csv file in the tempdir
-        page2_input = data.get("page2_input", {})
-        page2_input_path = os.path.join(tempdir, "page2_input.csv")
-        with open(page2_input_path, "w") as f:
-            w = csv.DictWriter(f, page2_input.keys())
-            w.writeheader()
-            w.writerow(page2_input)
-
-        # save page1_output as csv file in the tempdir
-        page1_output = data.get("page1_output", {})
-        page1_output_path = os.path.join(tempdir, "page1_output.csv")
-        with open(page1_output_path, "w") as f:
-            w = csv.DictWriter(f, page1_output.keys())
-            w.writeheader()
-            w.writerow(page1_output)
-
-        # save page2_output as csv file in the tempdir
-        page2_output = data.get("page2_output", {})
-        table = page2_output.get("table", [])
-        table_df = pd.DataFrame(table)
-        table_df_path = os.path.join(tempdir, "table.csv")
-        table_df.to_csv(table_df_path)
-
-        fig = page2.plot_results(data)
-        if fig:
-            fig_path = os.path.join(tempdir, "plot_results.png")
-            fig.write_image(fig_path)
-
-        # After each file is saved, read it into memory and add it to the files list
-        for root, dirs, file_names in os.walk(tempdir):
-            for file_name in file_names:
-                file_path = os.path.join(root, file_name)
-                with open(file_path, "rb") as f:
-                    data = f.read()
-                files.append((file_name, data))
 
-    in_memory_output = io.BytesIO()
-    with zipfile.ZipFile(in_memory_output, "w", zipfile.ZIP_DEFLATED) as zf:
-        for file_name, data in files:
-            data = data.encode() if isinstance(data, str) else data
-            data = io.BytesIO(data)
-            zf.writestr(file_name, data.getvalue())
+from thermalysis_pinch.config.main import CACHE_DIR, REPORT_CACHE_MB
+from thermalysis_pinch.export import result_tables
+
+# Bump when the content of any artifact changes for the same inputs, so that
+# cached artifacts from older versions are not reused.
+REPORT_VERSION = 3
+
+REPORT_TABLES = [
+    "summary",
+    "streams",
+    "problem_table",
+    "heat_cascade",
+    "shifted_composite",
+    "composite",
+    "grand_composite",
+]
+
+# File name, PyPinch draw method and the result tables the figure is drawn
+# from. A figure is rebuilt only when one of its tables changes.
+REPORT_FIGURES = [
+    ("temperature_interval.png", "drawTemperatureInterval", ["streams", "summary"]),
+    ("problem_table.png", "drawProblemTable", ["problem_table"]),
+    ("heat_cascade.png", "drawHeatCascade", ["heat_cascade", "summary"]),
+    (
+        "shifted_composite.png",
+        "drawShiftedCompositeDiagram",
+        ["shifted_composite", "summary"],
+    ),
+    (
+        "composite.png",
+        "drawCompositeDiagram",
+        ["composite", "shifted_composite", "summary"],
+    ),
+    ("grand_composite.png", "drawGrandCompositeCurve", ["grand_composite", "summary"]),
+]
+
+# PyPinch options that change how a figure is drawn from the same tables
+RENDER_OPTIONS = ["maxPoints"]
+
+MANIFEST_NAME = "manifest.json"
+
+DEFAULT_CACHE_DIR = os.path.join(CACHE_DIR, "report")
+
+
+class ReportCache:
+    """
+    Report artifacts on disk, keyed by the content hash of their inputs.
+
+    Entries are written to a temporary file and renamed into place, so
+    several processes can share one cache directory. Reading an entry marks
+    it as used (its mtime); once ``max_bytes`` is exceeded, ``put`` deletes
+    the least recently used entries.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=REPORT_CACHE_MB << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Bytes written since the last scan of the directory; None before the
+        # first scan, so a process starting on a full cache prunes at once.
+        self._written = None
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return raw
+
+    def put(self, key, raw):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix="tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+
+        # Scanning the directory costs a stat per entry, so it is done again
+        # only after a tenth of the limit has been written.
+        if self._written is not None:
+            self._written += len(raw)
+        if self._written is None or self._written > self.max_bytes // 10:
+            self.prune()
+
+    def prune(self):
+        """
+        Delete the least recently used entries until the cache holds at most
+        ``max_bytes``.
+        """
+        self._written = 0
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                # Keys are hex digests; "tmp" files are writes in progress
+                if entry.name.startswith("tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # removed by another process
+            total -= size
+
+    def get_json(self, key):
+        raw = self.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def put_json(self, key, value):
+        self.put(key, json.dumps(value).encode("utf-8"))
+
+
+def content_key(*parts):
+    """
+    Hash JSON-serialisable parts into a cache key.
+    """
+    digest = hashlib.sha256(str(REPORT_VERSION).encode())
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _columns_digest(columns):
+    digest = hashlib.sha256()
+    for name, values in columns.items():
+        digest.update(name.encode())
+        digest.update(str(values.dtype).encode())
+        if values.dtype == object:
+            digest.update("\x1f".join(map(str, values.tolist())).encode("utf-8"))
+        else:
+            digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def _csv_writer(write_rows):
+    def write(fh):
+        text = io.TextIOWrapper(fh, encoding="utf-8", newline="")
+        write_rows(csv.writer(text))
+        text.flush()
+        text.detach()
+
+    return write
+
+
+def _meta_artifact(meta_input):
+    def rows(writer):
+        writer.writerow(meta_input.keys())
+        writer.writerow(meta_input.values())
+
+    return _csv_writer(rows)
+
+
+def _table_artifact(columns):
+    def rows(writer):
+        writer.writerow(columns.keys())
+        # Rows are produced one at a time from the column arrays so no
+        # second copy of the table is built.
+        writer.writerows(zip(*(values.tolist() for values in columns.values())))
+
+    return _csv_writer(rows)
 
-    in_memory_output.seek(0)
 
+def _figure_artifact(pinch, method):
+    def write(fh):
+        getattr(pinch, method)(fh)
+
+    return write
+
+
+def _bytes_artifact(raw):
+    def write(fh):
+        fh.write(raw)
+
+    return write
+
+
+def _record_cache(hit):
+    try:
+        from thermalysis_pinch.metrics import record_cache
+    except ImportError:
+        return
+    record_cache("report", hit)
+
+
+def _solved(pinch):
+    # ``pinch`` may be a zero-argument callable so that the solve only runs
+    # when an artifact actually has to be rebuilt.
+    return pinch() if callable(pinch) else pinch
+
+
+def _result_artifacts(pinch):
+    tables = result_tables(pinch)
+    digests = {name: _columns_digest(columns) for name, columns in tables.items()}
+    render = {name: pinch._options[name] for name in RENDER_OPTIONS}
+    for name in REPORT_TABLES:
+        key = content_key(name, digests[name])
+        yield name + ".csv", key, _table_artifact(tables[name])
+    for file_name, method, sources in REPORT_FIGURES:
+        key = content_key(file_name, method, [digests[s] for s in sources], render)
+        yield file_name, key, _figure_artifact(pinch, method)
+
+
+def _cached_result_artifacts(pinch, cache, solution_key, manifest):
+    index = cache.get_json("solution-" + solution_key) if solution_key else None
+    if index is not None:
+        cached = {name: cache.get(key) for name, key in index.items()}
+        if all(raw is not None for raw in cached.values()):
+            for name, raw in cached.items():
+                _record_cache(True)
+                manifest.append({"file": name, "key": index[name], "status": "reused"})
+                yield name, _bytes_artifact(raw)
+            return
+
+    index = {}
+    for name, key, write in _result_artifacts(_solved(pinch)):
+        raw = cache.get(key)
+        _record_cache(raw is not None)
+        if raw is None:
+            buffer = io.BytesIO()
+            write(buffer)
+            raw = buffer.getvalue()
+            cache.put(key, raw)
+            manifest.append({"file": name, "key": key, "status": "built"})
+        else:
+            manifest.append({"file": name, "key": key, "status": "reused"})
+        index[name] = key
+        yield name, _bytes_artifact(raw)
+
+    if solution_key:
+        cache.put_json("solution-" + solution_key, index)
+
+
+def report_artifacts(data, pinch=None, cache=None, solution_key=None, manifest=None):
+    """
+    Yield ``(file_name, write)`` for every report artifact, where
+    ``write(fh)`` streams the artifact into a binary file handle.
+
+    Result tables and figures are only included when ``pinch`` (a solved
+    PyPinch, or a callable returning one) is given.
+
+    With a ``cache``, every artifact is looked up by the hash of the data it
+    is built from and only rebuilt on a miss. ``solution_key`` identifies the
+    stream data; when all artifacts of a known solution are cached the solve
+    is skipped entirely. What was reused or built is appended to ``manifest``
+    and, with a cache, written to the zip as ``manifest.json``.
+    """
+    if manifest is None:
+        manifest = []
+
+    meta_input = data.get("meta_input", {})
+    if cache is None:
+        yield "meta_input.csv", _meta_artifact(meta_input)
+    else:
+        key = content_key("meta_input.csv", meta_input)
+        raw = cache.get(key)
+        hit = raw is not None
+        _record_cache(hit)
+        if not hit:
+            buffer = io.BytesIO()
+            _meta_artifact(meta_input)(buffer)
+            raw = buffer.getvalue()
+            cache.put(key, raw)
+        manifest.append(
+            {
+                "file": "meta_input.csv",
+                "key": key,
+                "status": "reused" if hit else "built",
+            }
+        )
+        yield "meta_input.csv", _bytes_artifact(raw)
+
+    if pinch is not None:
+        if cache is None:
+            for name, _, write in _result_artifacts(_solved(pinch)):
+                manifest.append({"file": name, "key": None, "status": "built"})
+                yield name, write
+        else:
+            yield from _cached_result_artifacts(pinch, cache, solution_key, manifest)
+
+    if cache is not None:
+        summary = {
+            "version": REPORT_VERSION,
+            "solution": solution_key,
+            "reused": sum(1 for entry in manifest if entry["status"] == "reused"),
+            "built": sum(1 for entry in manifest if entry["status"] == "built"),
+            "artifacts": manifest,
+        }
+        yield MANIFEST_NAME, _bytes_artifact(
+            json.dumps(summary, indent=2).encode("utf-8")
+        )
+
+
+def _zip_info(zf, file_name):
+    info = zipfile.ZipInfo(file_name)
+    # PNGs are already compressed; deflating them again only costs time.
+    info.compress_type = (
+        zipfile.ZIP_STORED if file_name.endswith(".png") else zf.compression
+    )
+    return info
+
+
+def write_report(data, fileobj, pinch=None, cache=None, solution_key=None):
+    """
+    Write the report zip into ``fileobj``, one artifact at a time.
+    """
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as zf:
+        for file_name, write in report_artifacts(data, pinch, cache, solution_key):
+            with zf.open(_zip_info(zf, file_name), "w") as fh:
+                write(fh)
+
+
+class _ChunkSink(io.RawIOBase):
+    # Unseekable sink: zipfile then writes data descriptors instead of
+    # seeking back, so the archive can be sent while it is being built.
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        chunk = b"".join(self._chunks)
+        self._chunks = []
+        return chunk
+
+
+def stream_report(data, pinch=None, cache=None, solution_key=None):
+    """
+    Generate the report zip as byte chunks, one or more per artifact, for a
+    chunked HTTP response. Only the compressed output of the artifact being
+    written is held in memory.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+        for file_name, write in report_artifacts(data, pinch, cache, solution_key):
+            with zf.open(_zip_info(zf, file_name), "w") as fh:
+                write(fh)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def generate_report(data, pinch=None, cache=None, solution_key=None):
+    """
+    Return the report zip in a BytesIO.
+    """
+    in_memory_output = io.BytesIO()
+    write_report(data, in_memory_output, pinch, cache, solution_key)
+    in_memory_output.seek(0)
     return in_memory_output
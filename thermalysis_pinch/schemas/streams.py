@@ -0,0 +1,179 @@
+"""
+thermalysis_pinch.schemas.streams
+
+Pydantic schema of the pinch stream table.
+
+The table is validated as columns, one list per field, rather than as one
+model per stream: pydantic checks the types of each list, and the per-stream
+rules run once over NumPy arrays. Every problem is reported as a grid cell,
+``{"row": i, "column": name, "message": text}``, whether it is a bad type
+found by pydantic or a broken rule found here. ``validate_stream_table``
+reports both at once: when some cells have a bad type, the rules still run on
+the rows whose cells all have a good one.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from pydantic_core import PydanticCustomError
+
+COLUMN_LABELS = {
+    "tmin": "ΔTmin",
+    "cp": "CP",
+    "ts": "Supply Temperature",
+    "tt": "Target Temperature",
+    "film_coefficient": "Film Coefficient",
+    "dt_contribution": "ΔT Contribution",
+}
+
+
+def _column(values, size):
+    # NumPy reads missing entries (None) as NaN; a missing optional column is
+    # all NaN.
+    if values is None:
+        return np.full(size, np.nan)
+    return np.array(values, dtype=np.float64)
+
+
+def _cells(mask, column, message):
+    return [
+        {"row": int(row), "column": column, "message": message}
+        for row in np.flatnonzero(mask)
+    ]
+
+
+class StreamTable(BaseModel):
+    """
+    ΔTmin and the stream columns: CP (kW/°C), supply and target temperature
+    (°C), and optionally a film coefficient (kW/m²°C) and an individual ΔT
+    contribution (°C) per stream.
+    """
+
+    tmin: float = Field(ge=0)
+    # Missing values are allowed through the type check so that they are
+    # reported together with every other invalid cell.
+    cp: List[Optional[float]]
+    ts: List[Optional[float]]
+    tt: List[Optional[float]]
+    film_coefficient: Optional[List[Optional[float]]] = None
+    dt_contribution: Optional[List[Optional[float]]] = None
+
+    @model_validator(mode="after")
+    def validate_streams(self):
+        size = len(self.cp)
+        for name in ("ts", "tt", "film_coefficient", "dt_contribution"):
+            values = getattr(self, name)
+            if values is not None and len(values) != size:
+                raise ValueError(
+                    "{} has {} entries for {} streams".format(name, len(values), size)
+                )
+
+        cp, ts, tt, film, contribution = (
+            _column(getattr(self, name), size)
+            for name in ("cp", "ts", "tt", "film_coefficient", "dt_contribution")
+        )
+
+        cells = []
+        for name, values in (("cp", cp), ("ts", ts), ("tt", tt)):
+            cells += _cells(np.isnan(values), name, "is required")
+            cells += _cells(np.isinf(values), name, "must be finite")
+        cells += (
+            _cells(cp <= 0, "cp", "must be greater than 0")
+            + _cells(ts == tt, "tt", "must differ from the supply temperature")
+            + _cells(film <= 0, "film_coefficient", "must be greater than 0")
+            + _cells(contribution < 0, "dt_contribution", "must not be negative")
+        )
+        if cells:
+            cells.sort(key=lambda cell: cell["row"])
+            raise PydanticCustomError(
+                "stream_table",
+                "{count} invalid stream values",
+                {"count": len(cells), "cells": cells},
+            )
+        return self
+
+
+def cell_errors(error):
+    """
+    The grid cells of a ``ValidationError`` raised by ``StreamTable``, each
+    ``{"row": i or None, "column": name or None, "message": text}``.
+    """
+    cells = []
+    for detail in error.errors(include_url=False):
+        if detail["type"] == "stream_table":
+            cells.extend(detail["ctx"]["cells"])
+            continue
+        loc = detail["loc"]
+        cells.append(
+            {
+                "row": loc[1] if len(loc) > 1 and isinstance(loc[1], int) else None,
+                "column": loc[0] if loc else None,
+                "message": detail["msg"],
+            }
+        )
+    return cells
+
+
+def _rule_cells(columns, error):
+    # The rule errors of the rows that passed the type check, numbered as in
+    # the full table; none when a type error is not confined to a row (a
+    # column missing or not a list).
+    bad_rows = set()
+    tmin_valid = True
+    for detail in error.errors(include_url=False):
+        loc = detail["loc"]
+        if detail["type"] == "stream_table" or not loc:
+            return []
+        if loc[0] == "tmin":
+            tmin_valid = False
+        elif len(loc) < 2 or not isinstance(loc[1], int):
+            return []
+        else:
+            bad_rows.add(loc[1])
+
+    # ΔTmin takes part in no per-stream rule, so any valid number will do
+    reduced = dict(columns, tmin=columns["tmin"] if tmin_valid else 0.0)
+    size = 0
+    for name, values in columns.items():
+        if name != "tmin" and isinstance(values, list):
+            reduced[name] = [v for i, v in enumerate(values) if i not in bad_rows]
+            size = max(size, len(values))
+    rows = [i for i in range(size) if i not in bad_rows]
+    try:
+        StreamTable(**reduced)
+    except ValidationError as e:
+        cells = cell_errors(e)
+    else:
+        return []
+    if bad_rows:
+        # Errors without a row (column lengths) would describe the reduced
+        # table, not the one entered
+        cells = [cell for cell in cells if cell["row"] is not None]
+    return [
+        cell if cell["row"] is None else dict(cell, row=rows[cell["row"]])
+        for cell in cells
+    ]
+
+
+def validate_stream_table(**columns):
+    """
+    Validate the stream columns; return ``(StreamTable, [])`` or
+    ``(None, cells)``.
+    """
+    try:
+        return StreamTable(**columns), []
+    except ValidationError as e:
+        cells = cell_errors(e) + _rule_cells(columns, e)
+    cells.sort(key=lambda cell: -1 if cell["row"] is None else cell["row"])
+    return None, cells
+
+
+def describe_cell(cell):
+    """
+    A one-line description of a cell error for the data entry page.
+    """
+    label = COLUMN_LABELS.get(cell["column"], cell["column"] or "Streams")
+    if cell["row"] is None:
+        return "{}: {}".format(label, cell["message"])
+    return "Stream {} {}: {}".format(cell["row"] + 1, label, cell["message"])
@@ -0,0 +1,199 @@
+"""
+thermalysis_pinch.solution
+
+The pinch problem and its solution as they are kept in the session store.
+
+The Data Collection page writes the streams to ``data["pinch_input"]``:
+
+    {"tmin": 10.0, "cp": [...], "ts": [...], "tt": [...]}
+
+and one background solve turns them into ``data["pinch_output"]``: the
+headline targets plus every table of ``thermalysis_pinch.export.result_tables``
+with numeric columns packed as base64 little-endian arrays. ``key`` is the
+hash of the input it was solved from, so a page can tell a current solution
+from a stale one. The analysis pages decode and render ``pinch_output``; none
+of them solves or reads files.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+from thermalysis_pinch.export import result_tables
+from thermalysis_pinch.kernels import SortedStreams
+
+NOT_SOLVED = "No analysis run yet. Enter the stream data on the Data Collection page."
+
+# Per-worker cache of sorted stream sets for the ΔTmin sliders
+SORTED_STREAMS_CACHE_SIZE = 32
+_sorted_streams = {}
+# Threads of one worker share the cache; evicting is check-then-pop
+_sorted_streams_lock = threading.Lock()
+
+# PyPinch options that change the solution or its figures; a session may set
+# them in data["pinch_options"]
+SOLVE_OPTIONS = ["tolerance", "maxPoints"]
+
+# Bump when the layout of pinch_output changes, so stored solutions are
+# solved again instead of decoded wrongly.
+SOLUTION_VERSION = 1
+
+
+def stream_input(tmin, cp, ts, tt):
+    """
+    Build ``pinch_input`` from ΔTmin and the CP, supply and target columns.
+    """
+    return {
+        "tmin": float(tmin),
+        "cp": [float(value) for value in cp],
+        "ts": [float(value) for value in ts],
+        "tt": [float(value) for value in tt],
+    }
+
+
+def stream_rows(pinch_input):
+    """
+    The streams data file rows of ``pinch_input``, as read by ``PyPinch``.
+    """
+    rows = [["Tmin", pinch_input["tmin"]], ["CP", "TSUPPLY", "TTARGET"]]
+    rows.extend(
+        [cp, ts, tt]
+        for cp, ts, tt in zip(pinch_input["cp"], pinch_input["ts"], pinch_input["tt"])
+    )
+    return rows
+
+
+def solve_options(data):
+    """
+    The PyPinch options of the session, ``{}`` for the defaults.
+    """
+    options = (data or {}).get("pinch_options") or {}
+    return {name: options[name] for name in SOLVE_OPTIONS if name in options}
+
+
+def input_key(pinch_input):
+    """
+    Hash of ``pinch_input``; equal inputs give equal solutions.
+    """
+    digest = hashlib.sha256(str(SOLUTION_VERSION).encode())
+    digest.update(json.dumps(pinch_input, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def solution_summary(pinch):
+    """
+    The headline targets of a solved PyPinch.
+    """
+    return {
+        "tmin": pinch.tmin,
+        "streams": pinch.streams.numberOf,
+        "intervals": len(pinch.temperatureInterval),
+        "hot_utility": pinch.hotUtility,
+        "cold_utility": pinch.coldUtility,
+        "pinch_temperature": pinch.pinchTemperature,
+    }
+
+
+def format_targets(summary):
+    """
+    One line with the minimum utilities and the pinch temperature.
+    """
+    return (
+        "Minimum Hot Utility: {hot_utility:g} kW   "
+        "Minimum Cold Utility: {cold_utility:g} kW   "
+        "Pinch Temperature: {pinch_temperature:g} °C".format(**summary)
+    )
+
+
+def _encode(values):
+    if values.dtype == object:
+        return values.tolist()
+    values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+    return {
+        "dtype": values.dtype.str,
+        "data": base64.b64encode(values.tobytes()).decode("ascii"),
+    }
+
+
+def _decode(value):
+    if isinstance(value, list):
+        return np.array(value, dtype=object)
+    return np.frombuffer(base64.b64decode(value["data"]), dtype=value["dtype"])
+
+
+def encode_solution(pinch, key):
+    """
+    Serialise a solved PyPinch into ``pinch_output``.
+    """
+    return {
+        "version": SOLUTION_VERSION,
+        "key": key,
+        "summary": solution_summary(pinch),
+        "tables": {
+            table: {column: _encode(values) for column, values in columns.items()}
+            for table, columns in result_tables(pinch).items()
+        },
+    }
+
+
+def decode_tables(pinch_output, tables=None):
+    """
+    ``{table: {column: ndarray}}`` from ``pinch_output``, optionally only the
+    named ``tables``.
+    """
+    return {
+        table: {column: _decode(value) for column, value in columns.items()}
+        for table, columns in pinch_output["tables"].items()
+        if tables is None or table in tables
+    }
+
+
+def current_solution(data):
+    """
+    ``data["pinch_output"]`` if it was solved from the current
+    ``data["pinch_input"]``, otherwise ``None``.
+    """
+    if not data or "pinch_input" not in data or "pinch_output" not in data:
+        return None
+    output = data["pinch_output"]
+    if output.get("version") != SOLUTION_VERSION:
+        return None
+    if output.get("key") != input_key(data["pinch_input"]):
+        return None
+    return output
+
+
+def table_records(columns):
+    """
+    Rows of a decoded table as dicts, for ``dash_table.DataTable``.
+    """
+    names = list(columns)
+    return [
+        dict(zip(names, row))
+        for row in zip(*(columns[name].tolist() for name in names))
+    ]
+
+
+def sorted_streams(pinch_input):
+    """
+    ``SortedStreams`` for ``pinch_input``.
+
+    Kept per worker so that dragging a ΔTmin slider only re-targets the
+    cached arrays; a worker that has not seen the streams sorts them once.
+    The cache key is hashed here from the streams themselves, never taken
+    from the client, so a tampered or stale key cannot return the wrong
+    streams.
+    """
+    key = input_key(pinch_input)
+    streams = _sorted_streams.get(key)
+    if streams is None:
+        streams = SortedStreams(pinch_input["cp"], pinch_input["ts"], pinch_input["tt"])
+        with _sorted_streams_lock:
+            if key not in _sorted_streams:
+                if len(_sorted_streams) >= SORTED_STREAMS_CACHE_SIZE:
+                    _sorted_streams.pop(next(iter(_sorted_streams)))
+                _sorted_streams[key] = streams
+    return streams
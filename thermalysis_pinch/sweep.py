@@ -0,0 +1,207 @@
+"""
+thermalysis_pinch.sweep
+
+Out-of-core scenario sweeps: target millions of stream sets that do not fit
+in memory.
+
+The inputs of a sweep are a directory of arrays with one row per scenario:
+``cp``, ``ts`` and ``tt`` of shape ``(scenarios, streams)`` and optionally
+``tmin`` of shape ``(scenarios,)``. Each is a ``.npy`` file, opened
+memory-mapped, or a ``.zarr`` array when the ``zarr`` package is installed.
+Scenarios with fewer streams pad their rows with NaN.
+
+    python -m thermalysis_pinch.sweep scenarios/ results/ --chunk-size 50000
+
+``run_sweep`` reads the inputs one chunk of scenarios at a time and writes
+the targets into memory-mapped ``.npy`` outputs, so memory use is bounded by
+the chunk size whatever the size of the sweep. After every chunk the outputs
+are flushed and ``progress.json`` records how many chunks are complete; an
+interrupted sweep started again with the same output directory carries on
+from the next chunk.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from thermalysis_pinch.kernels import solve_batch
+
+INPUTS = ["cp", "ts", "tt", "tmin"]
+RESULTS = ["hot_utility", "cold_utility", "pinch_temperature"]
+CHUNK_SIZE = 10000
+PROGRESS = "progress.json"
+
+
+def _open_array(directory, name):
+    # Memory-mapped .npy, or a lazily read Zarr array; None if neither exists.
+    path = os.path.join(directory, name + ".npy")
+    if os.path.exists(path):
+        return np.load(path, mmap_mode="r")
+    path = os.path.join(directory, name + ".zarr")
+    if os.path.exists(path):
+        try:
+            import zarr
+        except ImportError:
+            raise ImportError(
+                "Reading {} requires zarr; install it or save the array "
+                "as .npy".format(path)
+            )
+        return zarr.open(path, mode="r")
+    return None
+
+
+def open_inputs(directory):
+    """
+    The scenario arrays of ``directory`` as ``{name: array}``, without reading
+    them into memory. ``tmin`` is left out when there is no ``tmin`` array.
+    """
+    arrays = {}
+    for name in INPUTS:
+        array = _open_array(directory, name)
+        if array is not None:
+            arrays[name] = array
+    missing = [name for name in INPUTS[:3] if name not in arrays]
+    if missing:
+        raise FileNotFoundError(
+            "No {} array (.npy or .zarr) in {}".format(", ".join(missing), directory)
+        )
+    return arrays
+
+
+def _load_progress(path, plan):
+    # Completed chunks of a previous run of the same sweep, else 0
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        progress = json.load(f)
+    if progress["plan"] != plan:
+        raise ValueError(
+            "{} belongs to a different sweep; use a new output directory".format(path)
+        )
+    return progress["chunks_done"]
+
+
+def _save_progress(path, plan, chunks_done):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"plan": plan, "chunks_done": chunks_done}, f)
+    os.replace(tmp, path)
+
+
+def run_sweep(inputs, output, tmin=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Target every scenario of ``inputs`` (a directory, or ``{name: array}``
+    of sliceable arrays such as memory maps) into memory-mapped
+    ``<output>/<result>.npy`` arrays, resuming from ``progress.json``.
+
+    ``tmin`` is used for every scenario when the inputs have no ``tmin``
+    array. Returns a summary dict with counts and throughput.
+    """
+    source = inputs if isinstance(inputs, str) else None
+    arrays = open_inputs(inputs) if source else dict(inputs)
+    count, width = arrays["cp"].shape
+    for name in ("ts", "tt"):
+        if arrays[name].shape != (count, width):
+            raise ValueError(
+                "{} has shape {}, expected {}".format(
+                    name, arrays[name].shape, (count, width)
+                )
+            )
+    if "tmin" in arrays:
+        if arrays["tmin"].shape != (count,):
+            raise ValueError("tmin must hold one value per scenario")
+    elif tmin is None:
+        raise ValueError("No tmin array in the inputs and no tmin given")
+
+    os.makedirs(output, exist_ok=True)
+    plan = {
+        "inputs": os.path.abspath(source) if source else None,
+        "scenarios": count,
+        "streams": width,
+        "tmin": None if "tmin" in arrays else float(tmin),
+        "chunk_size": chunk_size,
+    }
+    progress_path = os.path.join(output, PROGRESS)
+    done = _load_progress(progress_path, plan)
+
+    # Fresh outputs start as NaN so unfinished scenarios are recognisable
+    paths = {name: os.path.join(output, name + ".npy") for name in RESULTS}
+    if not all(os.path.exists(path) for path in paths.values()):
+        done = 0
+    results = {}
+    for name, path in paths.items():
+        if done:
+            results[name] = np.load(path, mmap_mode="r+")
+        else:
+            results[name] = np.lib.format.open_memmap(
+                path, mode="w+", dtype=np.float64, shape=(count,)
+            )
+            results[name][:] = np.nan
+
+    chunks = -(-count // chunk_size)
+    summary = {"scenarios": count, "chunks": chunks, "resumed_at": done}
+    start = time.perf_counter()
+    for chunk in range(done, chunks):
+        rows = slice(chunk * chunk_size, min((chunk + 1) * chunk_size, count))
+        cp, ts, tt = (
+            np.asarray(arrays[name][rows], dtype=np.float64)
+            for name in ("cp", "ts", "tt")
+        )
+        if "tmin" in arrays:
+            tmins = np.asarray(arrays["tmin"][rows], dtype=np.float64)
+        else:
+            tmins = np.full(len(cp), float(tmin))
+
+        targets = solve_batch(cp, ts, tt, tmins)
+        for name in RESULTS:
+            results[name][rows] = targets[name]
+            results[name].flush()
+        _save_progress(progress_path, plan, chunk + 1)
+        if progress:
+            progress(chunk + 1, chunks)
+
+    summary["seconds"] = time.perf_counter() - start
+    solved = count - min(count, done * chunk_size)
+    summary["scenarios_per_second"] = (
+        solved / summary["seconds"] if summary["seconds"] > 0 else 0.0
+    )
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pinch-sweep",
+        description="Target a directory of scenario arrays chunk by chunk.",
+    )
+    parser.add_argument("inputs", help="directory of cp, ts, tt (and tmin) arrays")
+    parser.add_argument("output", help="directory of the result arrays")
+    parser.add_argument(
+        "--tmin", type=float, help="ΔTmin of every scenario if there is no tmin array"
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    def progress(done, chunks):
+        print("{} / {} chunks".format(done, chunks), file=sys.stderr)
+
+    try:
+        summary = run_sweep(
+            args.inputs, args.output, args.tmin, args.chunk_size, progress=progress
+        )
+    except (ValueError, FileNotFoundError) as e:
+        parser.error(str(e))
+    print(
+        "{scenarios} scenarios in {chunks} chunks (resumed at chunk {resumed_at}) "
+        "in {seconds:.2f} s: {scenarios_per_second:.0f} scenarios/s -> {output}".format(
+            output=args.output, **summary
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
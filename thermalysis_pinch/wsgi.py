@@ -0,0 +1,39 @@
+"""
+thermalysis_pinch.wsgi
+
+WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py "thermalysis_pinch.wsgi:create_app()"
+    waitress-serve --threads 8 --port 8000 --call thermalysis_pinch.wsgi:create_app
+
+Every worker process calls ``create_app`` and gets its own Flask server and
+Dash app. State shared between workers lives in ``CACHE_DIR`` (see
+``thermalysis_pinch.config.main``), never in process memory.
+"""
+
+from flask import Flask
+
+from thermalysis_pinch.app import init_app
+from thermalysis_pinch.config.main import PROJECT_NAME, PROJECT_SLUG
+
+
+def create_app(project_slug=PROJECT_SLUG, app_title=PROJECT_NAME):
+    """
+    Build the Flask server with the Dash app mounted on it.
+
+    Flask settings can be supplied as ``PINCH_*`` environment variables,
+    e.g. ``PINCH_SECRET_KEY``.
+    """
+    server = Flask(__name__)
+    server.config.from_prefixed_env("PINCH")
+
+    @server.route("/healthz")
+    def healthz():
+        return "ok"
+
+    init_app(
+        server=server,
+        project_slug=project_slug,
+        app_title=app_title,
+    )
+    return server